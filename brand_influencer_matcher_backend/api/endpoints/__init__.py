@@ -1,5 +1,6 @@
 from .brand import router as brand_router
 from .influencer import router as influencer_router
+from .jobs import router as jobs_router
 from .match import router as match_router
 
-__all__ = ["brand_router", "influencer_router", "match_router"]
+__all__ = ["brand_router", "influencer_router", "jobs_router", "match_router"]
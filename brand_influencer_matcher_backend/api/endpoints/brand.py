@@ -1,49 +1,57 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from brand_influencer_matcher_backend.services.brand_service import search_Brand, brand_collection
+from brand_influencer_matcher_backend.services.brand_service import get_brand_analysis
+from brand_influencer_matcher_backend.services.brand_directory import get_brand_directory
 from brand_influencer_matcher_backend.models.brand import BrandAnalysis
-from brand_influencer_matcher_backend.models.influencer import collection as influencer_collection
+from brand_influencer_matcher_backend.database import get_db, normalize_name
+from brand_influencer_matcher_backend.config import BRAND_COLLECTION, INFLUENCER_COLLECTION
 
 router = APIRouter(prefix="/api/v1", tags=["brands"])
 
 class BrandRequest(BaseModel):
     brand_name: str
+    force_refresh: bool = False
 
 @router.post("/analyze-brand", response_model=BrandAnalysis)
 async def analyze_brand(request: BrandRequest):
     """
     Analyze a brand and return the analysis results.
+    A fresh stored analysis is returned directly; set force_refresh to re-run it.
+    Concurrent requests for the same brand share a single analysis run.
     """
     try:
-        result = await search_Brand(request.brand_name)
+        result = await get_brand_analysis(request.brand_name, request.force_refresh)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/brands", response_model=List[Dict[str, str]])
-async def list_brands():
+async def list_brands(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    prefix: str = Query("", description="Autocomplete: only brands whose name starts with this (case-insensitive, '@' optional)"),
+):
     """
-    List all brands in the database.
+    List brands in normalized-name order, one page at a time.
+    When more brands follow, the X-Next-Cursor response header holds the
+    `after` value for the next page.
     """
     try:
-        # Get all brands from the brand collection
-        cursor = brand_collection.find({}, {"brand_name": 1, "_id": 0}).sort("brand_name", 1)  # Sort by brand_name
-        brands = await cursor.to_list(length=100)  # Limit to 100 brands
-        # Return unique brand names
-        unique_brands = {}
-        for b in brands:
-            if "brand_name" in b and b["brand_name"]:
-                unique_brands[b["brand_name"]] = {"name": b["brand_name"]}
-        return list(unique_brands.values())
+        names, next_cursor = await get_brand_directory().page(limit, after=after, prefix=prefix)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [{"name": name} for name in names]
 
 class InfluencerRequest(BaseModel):
     influencer_name: str
 
 @router.get("/influencer-analysis/{influencer_name}")
-async def get_influencer_analysis(influencer_name: str):
+async def get_influencer_analysis(influencer_name: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Retrieve influencer analysis data from MongoDB by influencer name.
     
@@ -54,9 +62,9 @@ async def get_influencer_analysis(influencer_name: str):
         Dict containing the influencer's analysis data (only the analysis part)
     """
     try:
-        # Find the influencer by name (case insensitive search)
-        influencer_data = await influencer_collection.find_one(
-            {"influencer": {"$regex": f"^{influencer_name}$", "$options": "i"}},
+        # Find the influencer by normalized name (case insensitive, '@' optional)
+        influencer_data = await db[INFLUENCER_COLLECTION].find_one(
+            {"name_key": normalize_name(influencer_name)},
             {"_id": 0, "analysis": 1}  # Only return the analysis field
         )
         
@@ -67,7 +75,9 @@ async def get_influencer_analysis(influencer_name: str):
             )
             
         return influencer_data["analysis"]
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
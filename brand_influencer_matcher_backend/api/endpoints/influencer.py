@@ -1,20 +1,86 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from brand_influencer_matcher_backend.services.influencer_service import search_influ_analysis
+import asyncio
+import logging
+from brand_influencer_matcher_backend.config import BULK_RUN_RETENTION_SECONDS
+from brand_influencer_matcher_backend.services.influencer_service import get_influ_analysis
+from brand_influencer_matcher_backend.bulk_onboard import (
+    BulkOnboardRunner, normalize_handles, make_run_id, get_run_progress
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["influencers"])
 
+# Keep references to bulk jobs so they are not garbage collected; finished ones
+# are dropped after BULK_RUN_RETENTION_SECONDS
+_bulk_runs: Dict[str, Any] = {}  # run_id -> (runner, task)
+
+def _bulk_run_done(run_id: str, task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Bulk onboarding run failed", extra={"run_id": run_id, "error": str(task.exception())})
+    asyncio.get_running_loop().call_later(BULK_RUN_RETENTION_SECONDS, _evict_bulk_run, run_id, task)
+
+def _evict_bulk_run(run_id: str, task: asyncio.Task):
+    # Unless the run was restarted since
+    running = _bulk_runs.get(run_id)
+    if running is not None and running[1] is task:
+        del _bulk_runs[run_id]
+
 class InfluencerRequest(BaseModel):
     influencer_name: str
+    force_refresh: bool = False
+
+class BulkInfluencerRequest(BaseModel):
+    influencer_names: List[str]
+    run_id: Optional[str] = None
 
 @router.post("/analyze-influencer")
 async def analyze_influencer(request: InfluencerRequest):
     """
     Analyze an influencer and return the analysis results.
+    A fresh stored analysis is returned directly; set force_refresh to re-run it.
+    Concurrent requests for the same influencer share a single analysis run.
     """
     try:
-        result = await search_influ_analysis(request.influencer_name)
+        result = await get_influ_analysis(request.influencer_name, request.force_refresh)
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/analyze-influencers/bulk", status_code=202)
+async def analyze_influencers_bulk(request: BulkInfluencerRequest):
+    """
+    Start (or resume) onboarding a list of influencers in the background.
+    """
+    handles = normalize_handles(request.influencer_names)
+    if not handles:
+        raise HTTPException(status_code=400, detail="No influencer names given")
+    run_id = request.run_id or make_run_id(handles)
+
+    running = _bulk_runs.get(run_id)
+    if running is None or running[1].done():
+        runner = BulkOnboardRunner(run_id, handles)
+        task = asyncio.create_task(runner.run())
+        task.add_done_callback(lambda task: _bulk_run_done(run_id, task))
+        _bulk_runs[run_id] = (runner, task)
+    return {"run_id": run_id, "handles": len(handles)}
+
+@router.get("/analyze-influencers/bulk/{run_id}")
+async def get_bulk_progress(run_id: str):
+    """
+    Per-status handle counts for a bulk onboarding run.
+    """
+    try:
+        progress = await get_run_progress(run_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not progress["total"]:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {run_id}")
+    running = _bulk_runs.get(run_id)
+    progress["running"] = bool(running and not running[1].done())
+    if running:
+        # Live throughput / ETA from the in-process runner (final numbers once it finished)
+        progress["live"] = running[0].progress()
+    return progress
@@ -0,0 +1,89 @@
+import json
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from brand_influencer_matcher_backend.services.job_queue import get_job_queue, public_job
+
+router = APIRouter(prefix="/api/v1", tags=["jobs"])
+
+class JobOptions(BaseModel):
+    force_refresh: bool = False
+    # Higher runs first; submitting a name that is already queued raises its job to this
+    priority: int = Field(0, ge=-10, le=10)
+
+class InfluencerJobRequest(JobOptions):
+    influencer_name: str
+
+class BrandJobRequest(JobOptions):
+    brand_name: str
+
+async def submit(response: Response, kind: str, name: str, options: JobOptions) -> dict:
+    try:
+        job, deduplicated = await get_job_queue().submit(kind, name, options.force_refresh, options.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    response.headers["Location"] = f"/api/v1/jobs/{job['_id']}"
+    return {"job_id": job["_id"], "status": job["status"], "deduplicated": deduplicated}
+
+@router.post("/jobs/analyze-influencer", status_code=202)
+async def submit_influencer_analysis(request: InfluencerJobRequest, response: Response):
+    """
+    Queue an influencer analysis and return its job id immediately.
+    If the influencer already has a queued or running job, that job is returned.
+    """
+    return await submit(response, "influencer", request.influencer_name, request)
+
+@router.post("/jobs/analyze-brand", status_code=202)
+async def submit_brand_analysis(request: BrandJobRequest, response: Response):
+    """
+    Queue a brand analysis and return its job id immediately.
+    If the brand already has a queued or running job, that job is returned.
+    """
+    return await submit(response, "brand", request.brand_name, request)
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Job status; `result` holds the analysis once the status is "succeeded",
+    `error` the last failure (the job is retried until it is "failed").
+    """
+    try:
+        job = await get_job_queue().get(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return public_job(job)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str, http_request: Request):
+    """
+    Job status as server-sent events: one "status" event per change (the same
+    body as GET /jobs/{job_id}), ending after "succeeded" or "failed".
+    """
+    queue = get_job_queue()
+    if await queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+    def sse(event: str, data) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def events():
+        updates = queue.watch(job_id)
+        try:
+            async for job in updates:
+                if await http_request.is_disconnected():
+                    break
+                yield sse("status", public_job(job))
+        except Exception as e:
+            yield sse("error", {"detail": str(e)})
+        finally:
+            await updates.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
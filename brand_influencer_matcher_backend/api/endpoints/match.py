@@ -1,15 +1,41 @@
 import json
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import logging
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
-from brand_influencer_matcher_backend.services.match_service import rank_top3_influencers_by_brand
-from brand_influencer_matcher_backend.services.match_analysis import analyze_influencer_brand_match
+from brand_influencer_matcher_backend.services.match_service import (
+    rank_influencers_by_brand, rank_influencers_for_brands, key_to_namespace
+)
+from brand_influencer_matcher_backend.config import MATCH_CANDIDATE_POOL_SIZE, MATCH_TOP_K
+from brand_influencer_matcher_backend.services.match_analysis import (
+    analyze_influencer_brand_match, load_match_inputs, stream_influencer_brand_match
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["matches"])
 
-class MatchRequest(BaseModel):
+class RankingParams(BaseModel):
+    k: int = Field(MATCH_TOP_K, ge=1, le=100)
+    # Per brand field weight, e.g. {"target_group": 2.0}; missing fields weigh 1.0
+    weights: Optional[Dict[str, float]] = None
+    candidate_pool: int = Field(MATCH_CANDIDATE_POOL_SIZE, ge=1, le=1000)
+
+    @field_validator("weights")
+    @classmethod
+    def known_fields(cls, weights):
+        unknown = set(weights or {}) - set(key_to_namespace)
+        if unknown:
+            raise ValueError(f"unknown fields {sorted(unknown)}, expected {list(key_to_namespace)}")
+        return weights
+
+class MatchRequest(RankingParams):
     brand_name: str
 
+class BatchMatchRequest(RankingParams):
+    brand_names: List[str] = Field(..., min_length=1, max_length=500)
+
 class MatchAnalysisRequest(BaseModel):
     influencer_name: str
     brand_name: str
@@ -17,10 +43,14 @@ class MatchAnalysisRequest(BaseModel):
 @router.post("/match-influencers")
 async def match_influencers(request: MatchRequest):
     """
-    Find the top 3 influencers that best match the given brand.
+    Find the top k influencers that best match the given brand.
+    Candidates are the best `candidate_pool` hits of each field; every
+    candidate is then scored on all fields and combined with `weights`.
     """
     try:
-        result = await rank_top3_influencers_by_brand(request.brand_name)
+        result = await rank_influencers_by_brand(
+            request.brand_name, request.k, request.weights, request.candidate_pool
+        )
         # Parse the JSON string to a Python object before returning
         return {"matches": json.loads(result)}
     except ValueError as e:
@@ -28,12 +58,34 @@ async def match_influencers(request: MatchRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/match-influencers/batch")
+async def match_influencers_batch(request: BatchMatchRequest):
+    """
+    Rank influencers for many brands in one request.
+
+    Streams NDJSON, one line per brand as soon as it is ready (not in request
+    order): {"brand_name": ..., "matches": [...]} or {"brand_name": ..., "error": ...}.
+    A failure outside a brand's ranking ends the stream with {"error": ...}.
+    """
+    async def lines():
+        try:
+            async for result in rank_influencers_for_brands(
+                request.brand_names, request.k, request.weights, request.candidate_pool
+            ):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # The 200 status is already sent: report the failure in the stream
+            logger.exception("Batch match failed", extra={"brands": len(request.brand_names)})
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @router.post("/analyze-match")
 async def analyze_match(request: MatchAnalysisRequest):
     """
     Perform a detailed analysis of the match between an influencer and a brand.
     """
-    print(f"Received analyze-match request for influencer: {request.influencer_name}, brand: {request.brand_name}")
+    logger.debug("analyze-match request", extra={"influencer": request.influencer_name, "brand": request.brand_name})
     try:
         result = await analyze_influencer_brand_match(
             request.influencer_name,
@@ -44,3 +96,44 @@ async def analyze_match(request: MatchAnalysisRequest):
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/analyze-match/stream")
+async def analyze_match_stream(request: MatchAnalysisRequest, http_request: Request):
+    """
+    Streaming variant of /analyze-match (server-sent events).
+
+    Events: "start" immediately, one "section" ({"field", "text"}) per
+    analysis field as soon as it is generated, then "result" with the full
+    analysis, or "error". The LLM call is cancelled when the client disconnects.
+    """
+    try:
+        influencer_data, brand_data = await load_match_inputs(request.influencer_name, request.brand_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    def sse(event: str, data) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def events():
+        yield sse("start", {"influencer_name": request.influencer_name, "brand_name": request.brand_name})
+        stream = stream_influencer_brand_match(
+            request.influencer_name, request.brand_name, influencer_data, brand_data
+        )
+        try:
+            async for event, data in stream:
+                if await http_request.is_disconnected():
+                    logger.info("Client disconnected, cancelling analyze-match",
+                                extra={"influencer": request.influencer_name, "brand": request.brand_name})
+                    break
+                yield sse(event, data)
+        except Exception as e:
+            yield sse("error", {"detail": str(e)})
+        finally:
+            # Closes the upstream LLM stream if we stopped early
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
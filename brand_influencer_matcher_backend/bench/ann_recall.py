@@ -0,0 +1,152 @@
+"""
+Recall@k and latency of the quantized IVF backend against exact search.
+
+Builds a clustered synthetic namespace (`--vectors` unit vectors around
+`--clusters` centroids) in the on-disk format of the local vector store,
+opens it with QuantizedVectorStore (float vectors memory-mapped, IVF index
+trained on load), and answers the same queries exactly (full float32 scan,
+as the "local" backend does) and approximately for every nprobe x
+rerank-factor combination.
+
+Usage:
+    python -m brand_influencer_matcher_backend.bench.ann_recall [--vectors 200000] [--dim 1024]
+        [--nprobe 4,8,16,32] [--rerank 5,10,20] [--min-recall 0.95]
+
+With --min-recall, exits with status 1 when the configured defaults
+(ANN_NPROBE, ANN_RERANK_FACTOR) fall below it.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from brand_influencer_matcher_backend.bench.load import percentile
+from brand_influencer_matcher_backend.config import ANN_NPROBE, ANN_RERANK_FACTOR
+
+
+def clustered_vectors(count: int, dim: int, clusters: int, spread: float, seed: int, stream: int) -> np.ndarray:
+    """Unit vectors scattered around `clusters` random centroids (same centroids for every stream)."""
+    centroids = np.random.default_rng([seed, 0]).standard_normal((clusters, dim), dtype=np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    rng = np.random.default_rng([seed, stream])
+    out = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 65536):
+        stop = min(start + 65536, count)
+        block = centroids[rng.integers(0, clusters, stop - start)]
+        block += spread / np.sqrt(dim) * rng.standard_normal((stop - start, dim), dtype=np.float32)
+        out[start:stop] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return out
+
+
+def write_namespace(path: Path, namespace: str, vectors: np.ndarray):
+    """The files LocalVectorStore.save would write for `vectors`."""
+    np.save(path / f"{namespace}.npy", vectors)
+    ids = [f"v{i}" for i in range(len(vectors))]
+    with open(path / f"{namespace}.json", "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "influencers": ids, "texts": [""] * len(ids)}, f)
+
+
+def exact_top(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    truth = []
+    for start in range(0, len(queries), 64):
+        scores = queries[start:start + 64] @ vectors.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        truth.extend({f"v{i}" for i in row} for row in top)
+    return truth
+
+
+def timed(fn, queries: np.ndarray, k: int):
+    """(results, per-query latencies) answering the queries one at a time."""
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(fn(query, k))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return results, latencies
+
+
+def run(args) -> bool:
+    from brand_influencer_matcher_backend.services.ann_store import QuantizedVectorStore
+    from brand_influencer_matcher_backend.services.vector_store import _Namespace
+
+    namespace = "bench"
+    started = time.perf_counter()
+    corpus = clustered_vectors(args.vectors, args.dim, args.clusters, args.spread, args.seed, 1)
+    queries = clustered_vectors(args.queries, args.dim, args.clusters, args.spread, args.seed, 2)
+    print(f"{args.vectors} x {args.dim} vectors around {args.clusters} clusters generated in {time.perf_counter() - started:.1f}s")
+
+    # Exact baseline: the local backend's full float32 scan
+    exact = _Namespace(args.dim, capacity=len(corpus))
+    exact.vectors[:] = corpus
+    exact.size = len(corpus)
+    exact.ids = [f"v{i}" for i in range(len(corpus))]
+    exact.influencers = exact.ids
+    _, exact_latencies = timed(exact.search, queries, args.k)
+    truth = exact_top(corpus, queries, args.k)
+    float_bytes = corpus.nbytes
+    del exact
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp)
+        write_namespace(path, namespace, corpus)
+        del corpus
+        started = time.perf_counter()
+        store = QuantizedVectorStore(str(path), dimension=args.dim, lists=args.lists, min_train_size=1)
+        store.save()
+        build_seconds = time.perf_counter() - started
+        stats = store.stats()
+        print(f"IVF index built in {build_seconds:.1f}s: {stats['lists']} lists, "
+              f"index {stats['index_bytes'] / 2**20:.1f} MiB in memory vs {float_bytes / 2**20:.1f} MiB of float32 "
+              f"({float_bytes / max(stats['index_bytes'], 1):.1f}x less; floats memory-mapped for re-ranking)")
+        print(f"exact scan: p50 {percentile(exact_latencies, 50) * 1000:.2f} ms, p99 {percentile(exact_latencies, 99) * 1000:.2f} ms")
+        print(f"{'nprobe':>6} {'rerank':>6} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p99 ms':>8}")
+
+        default_recall = None
+        for nprobe in args.nprobe:
+            for rerank in args.rerank:
+                store.configure(nprobe=nprobe, rerank_factor=rerank)
+                results, latencies = timed(lambda q, k: store.query(q, k, namespace), queries, args.k)
+                recall = float(np.mean([len({m.id for m in found} & expected) / args.k
+                                        for found, expected in zip(results, truth)]))
+                if (nprobe, rerank) == (ANN_NPROBE, ANN_RERANK_FACTOR):
+                    default_recall = recall
+                print(f"{nprobe:>6} {rerank:>6} {recall:>9.3f} {percentile(latencies, 50) * 1000:>8.2f} "
+                      f"{percentile(latencies, 99) * 1000:>8.2f}")
+
+    if args.min_recall is None:
+        return True
+    if default_recall is None:
+        print(f"FAIL: the defaults (nprobe {ANN_NPROBE}, rerank {ANN_RERANK_FACTOR}) were not part of the sweep")
+        return False
+    if default_recall < args.min_recall:
+        print(f"FAIL: recall@{args.k} {default_recall:.3f} at the defaults is below {args.min_recall}")
+        return False
+    print("OK")
+    return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--clusters", type=int, default=1000, help="Centroids the vectors are scattered around")
+    parser.add_argument("--spread", type=float, default=1.0, help="Noise around the centroids (higher = less clustered)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared (the matching path's candidate pool)")
+    parser.add_argument("--lists", type=int, default=0, help="Inverted lists (0 = about sqrt(vectors))")
+    parser.add_argument("--nprobe", type=lambda s: [int(x) for x in s.split(",")], default=[4, 8, 16, 32])
+    parser.add_argument("--rerank", type=lambda s: [int(x) for x in s.split(",")], default=[5, 10, 20])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-recall", type=float, default=None)
+    args = parser.parse_args(argv)
+    return 0 if run(args) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Synthetic corpora for the benchmarks: N influencers (vectors in all five
+namespaces of the fake Pinecone index, documents in the fake Mongo) and M
+analyzed brands, generated deterministically from a seed.
+
+Every field text carries a topic tag (`t<n>`) and every vector sits near
+that topic's centroid, so brand queries find related influencers the way
+real data does. Memory is dominated by the vectors: influencers x 5 x dim x
+4 bytes (1M influencers at the default 1024 dimensions is ~20 GB; use
+`dim=128` for corpora that large).
+"""
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from brand_influencer_matcher_backend.config import BRAND_COLLECTION, INFLUENCER_COLLECTION
+from brand_influencer_matcher_backend.database import normalize_name
+from brand_influencer_matcher_backend.bench.fakes import FakeServices, WORDS
+from brand_influencer_matcher_backend.services.brand_embeddings import (
+    BRAND_EMBEDDING_FIELDS, embedding_tag, text_hash
+)
+from brand_influencer_matcher_backend.services.match_service import key_to_namespace
+from brand_influencer_matcher_backend.services.vector_store import NAMESPACES, vector_id
+
+
+class SyntheticCorpus:
+    def __init__(
+        self,
+        influencers: int = 1000,
+        brands: int = 100,
+        documents: Optional[int] = None,
+        brand_embeddings: bool = True,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            influencers: Influencers in the vector index
+            brands: Analyzed brands in Mongo
+            documents: Influencers that also get a Mongo document (default all, at most 10k)
+            brand_embeddings: Store field embeddings on the brand documents; without
+                them the first match of each brand embeds its fields
+            seed: Seed for topics, texts and vectors
+        """
+        self.influencers = influencers
+        self.brands = brands
+        self.documents = min(influencers, 10_000) if documents is None else min(documents, influencers)
+        self.brand_embeddings = brand_embeddings
+        self.seed = seed
+
+    @staticmethod
+    def influencer_name(i: int) -> str:
+        return f"bench_inf_{i:07d}"
+
+    @staticmethod
+    def brand_name(j: int) -> str:
+        return f"Bench Brand {j:05d}"
+
+    def _topics(self, services: FakeServices, count: int, stream: int) -> np.ndarray:
+        """Topic of every field of `count` items: shape (fields, count)."""
+        rng = np.random.default_rng([self.seed, stream])
+        return rng.integers(0, services.embedder.topics, size=(len(NAMESPACES), count))
+
+    @staticmethod
+    def _text(topic: int, label: str, rng: np.random.Generator, words: int = 16) -> str:
+        return f"t{topic} {label}: " + " ".join(WORDS[w] for w in rng.integers(0, len(WORDS), size=words))
+
+    # ------------------------------
+    # Influencers
+    # ------------------------------
+    def influencer_vectors(self, services: FakeServices, chunk: int = 100_000) -> Iterator[tuple]:
+        """(namespace, ids, vectors, names) chunks for the whole corpus."""
+        embedder = services.embedder
+        topics = self._topics(services, self.influencers, 1)
+        rng = np.random.default_rng([self.seed, 2])
+        scale = embedder.noise / np.sqrt(embedder.dimension)
+        for f, namespace in enumerate(NAMESPACES):
+            for start in range(0, self.influencers, chunk):
+                stop = min(start + chunk, self.influencers)
+                noise = rng.standard_normal((stop - start, embedder.dimension), dtype=np.float32)
+                vectors = embedder.centroids[topics[f, start:stop]] + scale * noise
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                names = [self.influencer_name(i) for i in range(start, stop)]
+                yield namespace, [vector_id(name, namespace) for name in names], vectors, names
+
+    def influencer_docs(self, services: FakeServices) -> List[dict]:
+        topics = self._topics(services, self.influencers, 1)
+        rng = np.random.default_rng([self.seed, 3])
+        now = datetime.now().isoformat()
+        docs = []
+        for i in range(self.documents):
+            name = self.influencer_name(i)
+            analysis = {ns: self._text(int(topics[f, i]), ns, rng) for f, ns in enumerate(NAMESPACES)}
+            videos = [
+                {"video_id": f"{i}{v}", "caption": self._text(int(topics[0, i]), "caption", rng, 8),
+                 "summary": self._text(int(topics[0, i]), "summary", rng, 20)}
+                for v in range(3)
+            ]
+            docs.append({
+                "influencer": name,
+                "name_key": normalize_name(name),
+                "search_result": self._text(int(topics[0, i]), "search", rng, 120),
+                "tiktok_result": str({"username": name, "videos_processed": len(videos), "videos": videos}),
+                "analysis": analysis,
+                "version": 1,
+                "last_updated": now,
+            })
+        return docs
+
+    # ------------------------------
+    # Brands
+    # ------------------------------
+    def brand_docs(self, services: FakeServices) -> List[dict]:
+        topics = self._topics(services, self.brands, 4)
+        rng = np.random.default_rng([self.seed, 5])
+        now = datetime.now().isoformat()
+        fields = list(key_to_namespace)
+        docs = []
+        for j in range(self.brands):
+            name = self.brand_name(j)
+            data = {key: self._text(int(topics[f, j]), key, rng) for f, key in enumerate(fields)}
+            doc = {"brand_name": name, "name_key": normalize_name(name), **data, "version": 1, "last_updated": now}
+            if self.brand_embeddings:
+                doc["embeddings"] = {
+                    key: {"vector": services.embedder.embed_one(data[key]).tolist(), "text_hash": text_hash(data[key])}
+                    for key in BRAND_EMBEDDING_FIELDS
+                }
+                doc["embedding_tag"] = embedding_tag()
+            docs.append(doc)
+        return docs
+
+    # ------------------------------
+    # Loading
+    # ------------------------------
+    def load(self, services: FakeServices):
+        """Seed the fake index and Mongo (no simulated latency)."""
+        for namespace, ids, vectors, names in self.influencer_vectors(services):
+            services.index.load(namespace, ids, vectors, names)
+        services.db[INFLUENCER_COLLECTION].load(self.influencer_docs(services))
+        services.db[BRAND_COLLECTION].load(self.brand_docs(services))
+
+    def describe(self) -> dict:
+        return {
+            "influencers": self.influencers,
+            "brands": self.brands,
+            "documents": self.documents,
+            "brand_embeddings": self.brand_embeddings,
+            "seed": self.seed,
+        }
@@ -0,0 +1,34 @@
+"""
+Stand-in for `yt-dlp <profile url> -j --flat-playlist --playlist-end N`.
+
+Prints N flat-playlist JSON lines, one at a time, after BENCH_YTDLP_STARTUP
+seconds and then BENCH_YTDLP_ENTRY seconds per entry. Run as a separate
+process (through the `yt-dlp` wrapper fakes.install_fake_ytdlp puts on
+PATH), so the benchmark pays real subprocess costs.
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+
+
+def main(argv):
+    url = next((arg for arg in argv if arg.startswith("http")), "https://www.tiktok.com/@unknown")
+    username = url.rstrip("/").rsplit("@", 1)[-1]
+    limit = int(argv[argv.index("--playlist-end") + 1]) if "--playlist-end" in argv else 3
+
+    time.sleep(float(os.environ.get("BENCH_YTDLP_STARTUP", "0")))
+    entry_delay = float(os.environ.get("BENCH_YTDLP_ENTRY", "0"))
+    for position in range(limit):
+        time.sleep(entry_delay)
+        video_id = str(int(hashlib.sha1(f"{username}/{position}".encode()).hexdigest()[:15], 16))
+        print(json.dumps({
+            "id": video_id,
+            "title": f"t{int(video_id) % 64} clip {position} by {username}: review unboxing tutorial",
+            "url": f"https://www.tiktok.com/@{username}/video/{video_id}",
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
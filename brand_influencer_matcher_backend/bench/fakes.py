@@ -0,0 +1,855 @@
+"""
+Local stand-ins for every external service, with configurable latency.
+
+- OpenAI (`responses.parse`, `responses.stream`, `chat.completions.create`)
+  and `agents.Runner.run`: async, answer with synthetic pydantic outputs
+- Cohere `co.embed` and the Pinecone index: *blocking* sleeps, like the
+  synchronous SDKs they replace, so calls made on the event loop show up as
+  loop stalls exactly as they would in production
+- Motor: an in-memory client covering the query/update subset the backend
+  uses (equality, `$in`, `$exists`; `$set`, `$inc`, `$setOnInsert`, `$unset`)
+  with hash indexes on the fields passed to `create_index`
+- yt-dlp: `fake_ytdlp.py`, put first on PATH as `yt-dlp`
+
+`install()` swaps all of them in for the whole backend and returns the
+`FakeServices` handle (`uninstall()` restores the real accessors).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import random
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from brand_influencer_matcher_backend.config import PINECONE_DIMENSION
+
+
+# ------------------------------
+# Latency
+# ------------------------------
+class Latency(NamedTuple):
+    mean: float = 0.0     # seconds
+    jitter: float = 0.25  # +/- fraction of mean, uniform
+
+    def sample(self) -> float:
+        if self.mean <= 0:
+            return 0.0
+        return max(0.0, self.mean * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def wait(self):
+        delay = self.sample()
+        # Always yield, like a real network round trip
+        await asyncio.sleep(delay)
+
+    def block(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+
+@dataclass
+class LatencyProfile:
+    openai: Latency = Latency(0.8)            # responses.parse / chat.completions (whole call)
+    openai_stream_chunks: int = 20            # deltas a streamed response is split into
+    agent: Latency = Latency(3.0)             # agents Runner.run (web search)
+    embed: Latency = Latency(0.12)            # co.embed, per call
+    pinecone_query: Latency = Latency(0.04)
+    pinecone_fetch: Latency = Latency(0.03)
+    pinecone_write: Latency = Latency(0.05)   # upsert / delete
+    mongo: Latency = Latency(0.002)           # per command (a cursor counts once)
+    ytdlp_startup: Latency = Latency(1.0)
+    ytdlp_entry: Latency = Latency(0.2)
+
+    def scaled(self, factor: float) -> "LatencyProfile":
+        values = {
+            name: Latency(value.mean * factor, value.jitter) if isinstance(value, Latency) else value
+            for name, value in vars(self).items()
+        }
+        return LatencyProfile(**values)
+
+
+PROFILES: Dict[str, LatencyProfile] = {
+    # Typical production round trips
+    "realistic": LatencyProfile(),
+    # No simulated latency: what is left is the backend's own CPU and event-loop overhead
+    "zero": LatencyProfile().scaled(0),
+    # Slow blocking providers, for event-loop stall checks
+    "slow-blocking": LatencyProfile(
+        openai=Latency(0.05), agent=Latency(0.05), embed=Latency(0.5, 0), pinecone_query=Latency(0.2, 0),
+        pinecone_fetch=Latency(0.2, 0), pinecone_write=Latency(0.2, 0), mongo=Latency(0.001),
+        ytdlp_startup=Latency(0.05), ytdlp_entry=Latency(0.01),
+    ),
+}
+
+
+# ------------------------------
+# Synthetic content
+# ------------------------------
+WORDS = (
+    "beauty skincare fashion streetwear gaming esports food street-food travel budget luxury fitness "
+    "running yoga parenting pets cats dogs tech gadgets finance investing comedy music dance cooking "
+    "students office-workers teens gen-z millennials premium affordable playful calm bold authentic "
+    "educational sustainable local thai bangkok review unboxing tutorial vlog challenge"
+).split()
+
+TOPIC_TAG = re.compile(r"\bt(\d+)\b")
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+
+
+def synthetic_text(label: str, seed: str, topics: int = 64, words: int = 24) -> str:
+    """Deterministic filler tagged with a topic (`t<n>`) that the fake embedder understands."""
+    rng = random.Random(f"{label}|{seed}")
+    return f"t{rng.randrange(topics)} {label}: " + " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def synthetic_model(model_cls, seed: str, topics: int = 64):
+    """An instance of a pydantic model with every (string) field filled in."""
+    return model_cls(**{name: synthetic_text(name, seed, topics) for name in model_cls.model_fields})
+
+
+class TopicEmbedder:
+    """
+    Deterministic embeddings: a text tagged `t<n>` lands near topic centroid n,
+    anything else on a hash-seeded random direction. Synthetic corpora use the
+    same centroids, so brand queries find related influencers.
+    """
+
+    def __init__(self, dimension: int = PINECONE_DIMENSION, topics: int = 64, noise: float = 0.6, seed: int = 0):
+        self.dimension = dimension
+        self.topics = topics
+        self.noise = noise
+        self.centroids = _unit(np.random.default_rng(seed).standard_normal((topics, dimension)).astype(np.float32))
+
+    def embed_one(self, text: str) -> np.ndarray:
+        noise = np.random.default_rng(_seed(text)).standard_normal(self.dimension).astype(np.float32)
+        tag = TOPIC_TAG.search(text)
+        if tag is None:
+            return _unit(noise[None, :])[0]
+        base = self.centroids[int(tag.group(1)) % self.topics]
+        return _unit((base + self.noise * noise / np.sqrt(self.dimension))[None, :])[0]
+
+    def embed(self, texts: Iterable[str]) -> List[List[float]]:
+        return [self.embed_one(text).tolist() for text in texts]
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def _usage(prompt: str, output: str) -> SimpleNamespace:
+    return SimpleNamespace(input_tokens=max(1, len(prompt) // 4), output_tokens=max(1, len(output) // 4))
+
+
+# ------------------------------
+# OpenAI / agents
+# ------------------------------
+class FakeOpenAI:
+    """Async OpenAI client: `responses.parse`, `responses.stream`, `chat.completions.create`."""
+
+    def __init__(self, profile: LatencyProfile, topics: int = 64):
+        self.profile = profile
+        self.topics = topics
+        self.calls = 0
+        self.responses = SimpleNamespace(parse=self._parse, stream=self._stream)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+
+    def _response(self, text_format, prompt: str):
+        parsed = synthetic_model(text_format, prompt, self.topics)
+        output = parsed.model_dump_json()
+        return SimpleNamespace(output_parsed=parsed, output_text=output, usage=_usage(prompt, output))
+
+    async def _parse(self, model: str, text_format, input: str, **kwargs):
+        self.calls += 1
+        await self.profile.openai.wait()
+        return self._response(text_format, input)
+
+    def _stream(self, model: str, text_format, input: str, **kwargs):
+        self.calls += 1
+        return _FakeResponseStream(self._response(text_format, input), self.profile)
+
+    async def _chat(self, model: str, messages: List[dict], **kwargs):
+        self.calls += 1
+        await self.profile.openai.wait()
+        prompt = messages[-1]["content"]
+        content = synthetic_text("summary", prompt, self.topics, words=16)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(content) // 4),
+        )
+
+
+class _FakeResponseStream:
+    def __init__(self, response, profile: LatencyProfile):
+        self.response = response
+        self.profile = profile
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        text = self.response.output_text
+        chunks = max(1, self.profile.openai_stream_chunks)
+        size = -(-len(text) // chunks)
+        per_chunk = Latency(self.profile.openai.mean / chunks, self.profile.openai.jitter)
+        for start in range(0, len(text), size):
+            await per_chunk.wait()
+            yield SimpleNamespace(type="response.output_text.delta", delta=text[start:start + size])
+
+    async def get_final_response(self):
+        return self.response
+
+
+class FakeRunner:
+    """Stands in for `agents.Runner`: typed agents get a synthetic output_type instance, others a string."""
+
+    def __init__(self, profile: LatencyProfile, topics: int = 64):
+        self.profile = profile
+        self.topics = topics
+        self.calls = 0
+
+    async def run(self, agent, prompt: str, **kwargs):
+        self.calls += 1
+        await self.profile.agent.wait()
+        output_type = getattr(agent, "output_type", None)
+        if isinstance(output_type, type) and hasattr(output_type, "model_fields"):
+            return SimpleNamespace(final_output=synthetic_model(output_type, prompt, self.topics))
+        return SimpleNamespace(final_output=synthetic_text("search", prompt, self.topics, words=80))
+
+
+# ------------------------------
+# Cohere
+# ------------------------------
+class FakeCohere:
+    """Synchronous `co.embed` (blocks the calling thread for the configured latency)."""
+
+    def __init__(self, profile: LatencyProfile, embedder: TopicEmbedder):
+        self.profile = profile
+        self.embedder = embedder
+        self.calls = 0
+        self.texts = 0
+
+    def embed(self, model: str, texts: List[str], input_type: str = "classification", **kwargs):
+        self.calls += 1
+        self.texts += len(texts)
+        self.profile.embed.block()
+        return SimpleNamespace(embeddings=self.embedder.embed(texts))
+
+
+# ------------------------------
+# Pinecone
+# ------------------------------
+class FakePineconeIndex:
+    """
+    Synchronous Pinecone index (query/fetch/upsert/delete/list) over the local
+    store's exact in-memory namespaces. `load()` bulk-loads a synthetic
+    corpus without per-vector overhead.
+    """
+
+    def __init__(self, profile: LatencyProfile, dimension: int = PINECONE_DIMENSION):
+        from brand_influencer_matcher_backend.services.vector_store import _Namespace
+
+        self._namespace_cls = _Namespace
+        self.profile = profile
+        self.dimension = dimension
+        self.namespaces: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.calls = {"query": 0, "fetch": 0, "upsert": 0, "delete": 0}
+
+    def _ns(self, namespace: str):
+        ns = self.namespaces.get(namespace)
+        if ns is None:
+            ns = self.namespaces[namespace] = self._namespace_cls(self.dimension)
+        return ns
+
+    def load(self, namespace: str, ids: List[str], vectors: np.ndarray, influencers: List[str]):
+        """Append row-normalized `vectors` (float32) with their ids and influencer names."""
+        with self._lock:
+            ns = self._ns(namespace)
+            ns._reserve(len(ids))
+            ns.vectors[ns.size:ns.size + len(ids)] = vectors
+            for offset, (vector_id, influencer) in enumerate(zip(ids, influencers)):
+                ns.id_to_row[vector_id] = ns.size + offset
+            ns.ids.extend(ids)
+            ns.influencers.extend(influencers)
+            ns.texts.extend([""] * len(ids))
+            ns.size += len(ids)
+
+    def query(self, vector, top_k: int, namespace: str, include_metadata: bool = True, **kwargs):
+        self.calls["query"] += 1
+        self.profile.pinecone_query.block()
+        query = _unit(np.asarray(vector, dtype=np.float32)[None, :])
+        with self._lock:
+            ns = self.namespaces.get(namespace)
+            hits = ns.search_many(query, top_k)[0] if ns else []
+        return SimpleNamespace(matches=[
+            SimpleNamespace(id=hit.id, score=hit.score, metadata={"influencer": hit.influencer}) for hit in hits
+        ])
+
+    def fetch(self, ids: List[str], namespace: str, **kwargs):
+        self.calls["fetch"] += 1
+        self.profile.pinecone_fetch.block()
+        with self._lock:
+            ns = self.namespaces.get(namespace)
+            found = ns.fetch(ids) if ns else {}
+        return SimpleNamespace(vectors={
+            vector_id: SimpleNamespace(id=vector_id, values=values.tolist(), metadata={})
+            for vector_id, values in found.items()
+        })
+
+    def upsert(self, vectors: List[dict], namespace: str, **kwargs):
+        self.calls["upsert"] += 1
+        self.profile.pinecone_write.block()
+        with self._lock:
+            self._ns(namespace).upsert(vectors)
+
+    def delete(self, ids: List[str], namespace: str, **kwargs):
+        self.calls["delete"] += 1
+        self.profile.pinecone_write.block()
+        with self._lock:
+            if namespace in self.namespaces:
+                self.namespaces[namespace].delete(ids)
+
+    def list(self, namespace: str, limit: int = 100):
+        ns = self.namespaces.get(namespace)
+        ids = list(ns.ids) if ns else []
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+
+# ------------------------------
+# Motor
+# ------------------------------
+def _get_path(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_path(doc: dict, path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset_path(doc: dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+_MISSING = object()
+
+
+def _clone(value):
+    # Documents are handed out as copies, like decoded BSON; pickle is far cheaper than deepcopy
+    return pickle.loads(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _matches(doc: dict, query: Optional[dict]) -> bool:
+    for key, condition in (query or {}).items():
+        value = _get_path(doc, key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            for op, arg in condition.items():
+                if op == "$in":
+                    if value is _MISSING or value not in arg:
+                        return False
+                elif op == "$exists":
+                    if (value is not _MISSING) != bool(arg):
+                        return False
+                elif op == "$ne":
+                    if value is not _MISSING and value == arg:
+                        return False
+                elif op in ("$gt", "$gte", "$lt", "$lte"):
+                    if value is _MISSING or value is None:
+                        return False
+                    if not {"$gt": value > arg, "$gte": value >= arg, "$lt": value < arg, "$lte": value <= arg}[op]:
+                        return False
+                else:
+                    raise NotImplementedError(f"FakeCollection does not support {op}")
+        elif value is _MISSING or value != condition:
+            return False
+    return True
+
+
+def _project(doc: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return _clone(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        result = {k: _clone(doc[k]) for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {k: _clone(v) for k, v in doc.items() if projection.get(k, 1)}
+
+
+def _apply_update(doc: dict, update: dict, inserting: bool):
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == "$set":
+                _set_path(doc, path, _clone(value))
+            elif op == "$setOnInsert":
+                if inserting:
+                    _set_path(doc, path, _clone(value))
+            elif op == "$inc":
+                current = _get_path(doc, path)
+                _set_path(doc, path, (0 if current is _MISSING else current) + value)
+            elif op == "$unset":
+                _unset_path(doc, path)
+            elif op == "$max":
+                current = _get_path(doc, path)
+                if current is _MISSING or value > current:
+                    _set_path(doc, path, value)
+            else:
+                raise NotImplementedError(f"FakeCollection does not support {op}")
+
+
+def _sort_key(value):
+    # Missing/None sort first, like MongoDB; mixed types are ordered by type name
+    if value is _MISSING or value is None:
+        return (0, "", 0)
+    return (1, type(value).__name__, value)
+
+
+class FakeCursor:
+    def __init__(self, collection: "FakeCollection", query: Optional[dict], projection: Optional[dict]):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort: List[tuple] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1):
+        self._sort = list(key) if isinstance(key, list) else [(key, direction)]
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    async def _results(self) -> List[dict]:
+        await self.collection.latency.wait()
+        docs = self.collection._select(self.query)
+        for key, direction in reversed(self._sort):
+            docs.sort(key=lambda d: _sort_key(_get_path(d, key)), reverse=direction < 0)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(doc, self.projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        docs = await self._results()
+        return docs[:length] if length else docs
+
+    async def __aiter__(self):
+        for doc in await self._results():
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, name: str, latency: Latency):
+        self.name = name
+        self.latency = latency
+        self._docs: Dict[Any, dict] = {}
+        # field -> value -> {_id}
+        self._indexes: Dict[str, Dict[Any, set]] = {}
+        # index name -> index_information() entry
+        self._index_info: Dict[str, dict] = {"_id_": {"key": [("_id", 1)]}}
+        self.commands = 0
+
+    # --- indexes ---
+    def _index_add(self, doc: dict):
+        for path, index in self._indexes.items():
+            value = _get_path(doc, path)
+            if value is not _MISSING:
+                index.setdefault(_hashable(value), set()).add(doc["_id"])
+
+    def _index_remove(self, doc: dict):
+        for path, index in self._indexes.items():
+            value = _get_path(doc, path)
+            if value is not _MISSING:
+                ids = index.get(_hashable(value))
+                if ids:
+                    ids.discard(doc["_id"])
+
+    def _select(self, query: Optional[dict]) -> List[dict]:
+        self.commands += 1
+        query = query or {}
+        candidates = None
+        if "_id" in query and not isinstance(query["_id"], dict):
+            candidates = [query["_id"]]
+        else:
+            for path, condition in query.items():
+                index = self._indexes.get(path)
+                if index is None:
+                    continue
+                if isinstance(condition, dict) and "$in" in condition:
+                    candidates = set().union(*(index.get(_hashable(v), set()) for v in condition["$in"]))
+                    break
+                if not isinstance(condition, dict):
+                    candidates = index.get(_hashable(condition), set())
+                    break
+        if candidates is None:
+            docs = self._docs.values()
+        else:
+            docs = (self._docs[_id] for _id in candidates if _id in self._docs)
+        return [doc for doc in docs if _matches(doc, query)]
+
+    def load(self, docs: Iterable[dict]):
+        """Insert documents directly (no latency, no copy); for seeding corpora."""
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+            self._docs[doc["_id"]] = doc
+            self._index_add(doc)
+
+    # --- commands ---
+    async def create_index(self, keys, **kwargs) -> str:
+        await self.latency.wait()
+        path = keys if isinstance(keys, str) else keys[0][0]
+        if path not in self._indexes:
+            self._indexes[path] = {}
+            index_docs = list(self._docs.values())
+            for doc in index_docs:
+                value = _get_path(doc, path)
+                if value is not _MISSING:
+                    self._indexes[path].setdefault(_hashable(value), set()).add(doc["_id"])
+        name = kwargs.get("name") or f"{path}_1"
+        self._index_info[name] = {"key": [(keys, 1)] if isinstance(keys, str) else list(keys), **kwargs}
+        return name
+
+    async def index_information(self) -> Dict[str, dict]:
+        await self.latency.wait()
+        return dict(self._index_info)
+
+    def find(self, query: Optional[dict] = None, projection: Optional[dict] = None, **kwargs) -> FakeCursor:
+        return FakeCursor(self, query, projection)
+
+    async def find_one(self, query: Optional[dict] = None, projection: Optional[dict] = None, **kwargs):
+        await self.latency.wait()
+        docs = self._select(query)
+        return _project(docs[0], projection) if docs else None
+
+    async def count_documents(self, query: Optional[dict] = None, **kwargs) -> int:
+        await self.latency.wait()
+        return len(self._select(query))
+
+    async def insert_one(self, doc: dict, **kwargs):
+        await self.latency.wait()
+        doc = _clone(doc)
+        self.load([doc])
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    def _update(self, query: dict, update: dict, upsert: bool, replace: bool = False):
+        docs = self._select(query)
+        if docs:
+            doc = docs[0]
+            self._index_remove(doc)
+            if replace:
+                kept_id = doc["_id"]
+                doc.clear()
+                doc.update(_clone(update))
+                doc["_id"] = kept_id
+            else:
+                _apply_update(doc, update, inserting=False)
+            self._index_add(doc)
+            return doc, None
+        if not upsert:
+            return None, None
+        doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+        if replace:
+            doc.update(_clone(update))
+        else:
+            _apply_update(doc, update, inserting=True)
+        doc.setdefault("_id", ObjectId())
+        self.load([doc])
+        return doc, doc["_id"]
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False, **kwargs):
+        await self.latency.wait()
+        doc, upserted_id = self._update(query, update, upsert)
+        matched = int(doc is not None and upserted_id is None)
+        return SimpleNamespace(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    async def replace_one(self, query: dict, replacement: dict, upsert: bool = False, **kwargs):
+        await self.latency.wait()
+        doc, upserted_id = self._update(query, replacement, upsert, replace=True)
+        matched = int(doc is not None and upserted_id is None)
+        return SimpleNamespace(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    async def find_one_and_update(
+        self, query: dict, update: dict, projection: Optional[dict] = None, upsert: bool = False,
+        return_document=ReturnDocument.BEFORE, **kwargs
+    ):
+        await self.latency.wait()
+        matched = self._select(query)
+        for key, direction in reversed(kwargs.get("sort") or []):
+            matched.sort(key=lambda d: _sort_key(_get_path(d, key)), reverse=direction < 0)
+        before = _clone(matched[0]) if matched else None
+        doc, _ = self._update({"_id": matched[0]["_id"]} if matched else query, update, upsert)
+        result = doc if return_document == ReturnDocument.AFTER else before
+        return _project(result, projection) if result is not None else None
+
+    async def update_many(self, query: dict, update: dict, **kwargs):
+        await self.latency.wait()
+        docs = self._select(query)
+        for doc in docs:
+            self._index_remove(doc)
+            _apply_update(doc, update, inserting=False)
+            self._index_add(doc)
+        return SimpleNamespace(matched_count=len(docs), modified_count=len(docs), upserted_id=None)
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs):
+        await self.latency.wait()
+        for op in requests:
+            kind = type(op).__name__
+            if kind == "UpdateOne":
+                self._update(op._filter, op._doc, op._upsert)
+            elif kind == "ReplaceOne":
+                self._update(op._filter, op._doc, op._upsert, replace=True)
+            elif kind == "InsertOne":
+                self.load([_clone(op._doc)])
+            else:
+                raise NotImplementedError(f"FakeCollection.bulk_write does not support {kind}")
+        return SimpleNamespace(acknowledged=True)
+
+    async def delete_one(self, query: dict, **kwargs):
+        await self.latency.wait()
+        docs = self._select(query)
+        if docs:
+            self._index_remove(docs[0])
+            del self._docs[docs[0]["_id"]]
+        return SimpleNamespace(deleted_count=len(docs[:1]))
+
+    async def delete_many(self, query: dict, **kwargs):
+        await self.latency.wait()
+        docs = self._select(query)
+        for doc in docs:
+            self._index_remove(doc)
+            del self._docs[doc["_id"]]
+        return SimpleNamespace(deleted_count=len(docs))
+
+    async def aggregate(self, pipeline: List[dict], **kwargs):
+        """
+        `$match` and `$group` on one field, with `$sum` of a constant and `$push`
+        of `{name: "$field"}` documents (what the progress endpoint and the
+        duplicate-key migration use).
+        """
+        await self.latency.wait()
+        docs = list(self._docs.values())
+        for stage in pipeline:
+            if "$match" in stage:
+                docs = [doc for doc in docs if _matches(doc, stage["$match"])]
+            elif "$group" in stage:
+                spec = stage["$group"]
+                key_path = spec["_id"].lstrip("$")
+                groups: Dict[Any, dict] = {}
+                for doc in docs:
+                    key = _get_path(doc, key_path)
+                    row = groups.setdefault(key, {"_id": None if key is _MISSING else key})
+                    for name, acc in spec.items():
+                        if name == "_id":
+                            continue
+                        if "$push" in acc:
+                            row.setdefault(name, []).append({
+                                field: _get_path(doc, ref.lstrip("$")) for field, ref in acc["$push"].items()
+                                if _get_path(doc, ref.lstrip("$")) is not _MISSING
+                            })
+                        else:
+                            row[name] = row.get(name, 0) + acc["$sum"]
+                docs = list(groups.values())
+            else:
+                raise NotImplementedError(f"FakeCollection.aggregate does not support {list(stage)}")
+        for doc in docs:
+            yield doc
+
+
+def _hashable(value):
+    return json.dumps(value, sort_keys=True, default=str) if isinstance(value, (dict, list)) else value
+
+
+class FakeDatabase:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = FakeCollection(name, self.latency)
+        return collection
+
+    def stats(self) -> dict:
+        return {name: c.commands for name, c in self._collections.items()}
+
+
+class FakeMongoClient:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self._databases: Dict[str, FakeDatabase] = {}
+        self.admin = SimpleNamespace(command=self._command)
+
+    async def _command(self, name: str, **kwargs):
+        await self.latency.wait()
+        return {"ok": 1.0}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        db = self._databases.get(name)
+        if db is None:
+            db = self._databases[name] = FakeDatabase(self.latency)
+        return db
+
+    def close(self):
+        pass
+
+
+# ------------------------------
+# yt-dlp
+# ------------------------------
+def install_fake_ytdlp(profile: LatencyProfile) -> str:
+    """Put a `yt-dlp` executable running fake_ytdlp.py first on PATH; returns its directory."""
+    directory = tempfile.mkdtemp(prefix="bench-ytdlp-")
+    script = Path(directory) / "yt-dlp"
+    script.write_text(
+        f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).with_name("fake_ytdlp.py")}" "$@"\n'
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = directory + os.pathsep + os.environ.get("PATH", "")
+    os.environ["BENCH_YTDLP_STARTUP"] = str(profile.ytdlp_startup.mean)
+    os.environ["BENCH_YTDLP_ENTRY"] = str(profile.ytdlp_entry.mean)
+    return directory
+
+
+# ------------------------------
+# Installation
+# ------------------------------
+@dataclass
+class FakeServices:
+    profile: LatencyProfile
+    embedder: TopicEmbedder
+    openai: FakeOpenAI
+    runner: FakeRunner
+    cohere: FakeCohere
+    index: FakePineconeIndex
+    mongo: FakeMongoClient
+    ytdlp_dir: str
+    _restore: List[Callable[[], None]] = field(default_factory=list)
+
+    @property
+    def db(self) -> FakeDatabase:
+        from brand_influencer_matcher_backend.database import database
+        return self.mongo[database.name]
+
+    def stats(self) -> dict:
+        return {
+            "openai_calls": self.openai.calls,
+            "agent_runs": self.runner.calls,
+            "embed_calls": self.cohere.calls,
+            "embedded_texts": self.cohere.texts,
+            **{f"pinecone_{name}": count for name, count in self.index.calls.items()},
+            "mongo_commands": sum(self.db.stats().values()),
+        }
+
+    def uninstall(self):
+        while self._restore:
+            self._restore.pop()()
+
+
+def _replace_everywhere(original, replacement, restore: List[Callable[[], None]]):
+    """Rebind every backend module attribute that refers to `original` (from-imports included)."""
+    for name, module in list(sys.modules.items()):
+        if module is None or not name.startswith("brand_influencer_matcher_backend"):
+            continue
+        for attr, value in list(vars(module).items()):
+            if value is original:
+                setattr(module, attr, replacement)
+                restore.append(lambda m=module, a=attr, v=value: setattr(m, a, v))
+
+
+def install(
+    profile: LatencyProfile = PROFILES["realistic"],
+    dimension: int = PINECONE_DIMENSION,
+    topics: int = 64,
+) -> FakeServices:
+    """
+    Swap every external dependency of the backend for a fake. Call after the
+    app is imported (so every from-import is rebound) and before its lifespan
+    starts.
+    """
+    import agents
+    # Import the whole app first so every from-import exists and gets rebound below
+    import brand_influencer_matcher_backend.main  # noqa: F401
+    from brand_influencer_matcher_backend import clients, database as database_module
+    from brand_influencer_matcher_backend.services import embedding_service, vector_store
+
+    embedder = TopicEmbedder(dimension, topics)
+    services = FakeServices(
+        profile=profile,
+        embedder=embedder,
+        openai=FakeOpenAI(profile, topics),
+        runner=FakeRunner(profile, topics),
+        cohere=FakeCohere(profile, embedder),
+        index=FakePineconeIndex(profile, dimension),
+        mongo=FakeMongoClient(profile.mongo),
+        ytdlp_dir=install_fake_ytdlp(profile),
+    )
+    restore = services._restore
+
+    _replace_everywhere(clients.get_openai_client, lambda: services.openai, restore)
+    _replace_everywhere(clients.get_cohere_client, lambda: services.cohere, restore)
+    _replace_everywhere(clients.get_pinecone_index, lambda: services.index, restore)
+
+    real_runner = agents.Runner
+    agents.Runner = services.runner
+    restore.append(lambda: setattr(agents, "Runner", real_runner))
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    db = database_module.database
+    real_client = db._client
+    db._client = services.mongo
+    restore.append(lambda: setattr(db, "_client", real_client))
+
+    real_store = vector_store._store
+    vector_store._store = vector_store.PineconeVectorStore(services.index)
+    restore.append(lambda: setattr(vector_store, "_store", real_store))
+
+    # A fresh batcher so its provider is the fake (the embedding cache is left as configured)
+    real_batcher = embedding_service._batcher
+    embedding_service._batcher = None
+    restore.append(lambda: setattr(embedding_service, "_batcher", real_batcher))
+
+    real_path = os.environ["PATH"].split(os.pathsep, 1)[-1]
+    restore.append(lambda: os.environ.__setitem__("PATH", real_path))
+    return services
@@ -0,0 +1,328 @@
+"""
+Offline load test: every API route and the main service entry points against
+local fakes of OpenAI, the agents Runner, Cohere, Pinecone, MongoDB and
+yt-dlp (see fakes.py), on a synthetic corpus (see corpus.py).
+
+Each scenario runs `--concurrency` workers for `--duration` seconds (or
+`--requests` calls) and reports throughput and p50/p95/p99 latency, plus the
+upstream calls it caused. Requests go through httpx's in-process ASGI
+transport, so client and server share one event loop: compare numbers only
+against baselines recorded on the same machine.
+
+Caches (match results, match analyses, embeddings) are off unless --caches
+is given, so repeated requests measure the work itself.
+
+Usage:
+    python -m brand_influencer_matcher_backend.bench.load [--profile realistic] [--influencers 1000]
+        [--scenarios api.match,service.rank] [--save NAME] [--compare NAME] [--tolerance 0.25]
+
+Baselines are stored as bench/baselines/<NAME>.json; --compare exits with
+status 1 when a scenario's p95 rose or its throughput fell by more than
+--tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+BASELINE_DIR = Path(__file__).with_name("baselines")
+
+
+def configure_environment(caches: bool = False, quiet: bool = True):
+    """
+    Settings the backend reads at import time; call before importing it.
+
+    Args:
+        caches: Keep the match/analysis/embedding caches on (the embedding
+            cache then writes to a throwaway file, not data/)
+        quiet: Log at WARNING; False keeps the configured level, so every
+            log call runs as it does in production
+    """
+    if quiet:
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+    for key in ("OPENAI_API_KEY", "COHERE_API_KEY", "PINECONE_API_KEY"):
+        os.environ.setdefault(key, "bench")
+    if caches:
+        os.environ.setdefault("EMBED_CACHE_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "embedding_cache.sqlite3"))
+    else:
+        os.environ["MATCH_CACHE_BACKEND"] = "none"
+        os.environ["MATCH_ANALYSIS_CACHE_ENABLED"] = "false"
+        os.environ["EMBED_CACHE_ENABLED"] = "false"
+
+
+# ------------------------------
+# Scenarios
+# ------------------------------
+class BenchContext:
+    def __init__(self, client, corpus, seed: int = 0):
+        self.client = client
+        self.corpus = corpus
+        self.rng = random.Random(seed)
+        self._serial = 0
+
+    def brand(self) -> str:
+        return self.corpus.brand_name(self.rng.randrange(self.corpus.brands))
+
+    def brands(self, count: int) -> List[str]:
+        return [self.corpus.brand_name(j) for j in self.rng.sample(range(self.corpus.brands), min(count, self.corpus.brands))]
+
+    def influencer(self) -> str:
+        """An influencer that has a stored document."""
+        return self.corpus.influencer_name(self.rng.randrange(self.corpus.documents))
+
+    def returning_influencer(self) -> str:
+        """One of a few stored influencers, so most refreshes find nothing new."""
+        return self.corpus.influencer_name(self.rng.randrange(min(16, self.corpus.documents)))
+
+    def new_influencer(self) -> str:
+        self._serial += 1
+        return f"bench_new_{self._serial:07d}"
+
+
+class Scenario(NamedTuple):
+    name: str
+    call: Callable[[BenchContext], Awaitable[None]]
+
+
+def _check(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+async def _get(ctx: BenchContext, path: str):
+    _check(await ctx.client.get(path))
+
+
+async def _post(ctx: BenchContext, path: str, payload: dict):
+    response = await ctx.client.post(path, json=payload)
+    _check(response)
+    return response
+
+
+async def _service_rank_batch(ctx: BenchContext):
+    from brand_influencer_matcher_backend.services.match_service import rank_influencers_for_brands
+
+    async for result in rank_influencers_for_brands(ctx.brands(16)):
+        if "error" in result:
+            raise RuntimeError(result["error"])
+
+
+async def _service(name: str, *args):
+    from brand_influencer_matcher_backend.services import brand_service, influencer_service, match_service
+
+    functions = {
+        "rank": match_service.rank_influencers_by_brand,
+        "brand_pipeline": brand_service.search_Brand,
+        "influencer_pipeline": influencer_service.search_influ_analysis,
+    }
+    await functions[name](*args)
+
+
+SCENARIOS = [
+    Scenario("api.health", lambda ctx: _get(ctx, "/health")),
+    Scenario("api.list_brands", lambda ctx: _get(ctx, "/api/v1/brands")),
+    Scenario("api.influencer_analysis", lambda ctx: _get(ctx, f"/api/v1/influencer-analysis/{ctx.influencer()}")),
+    Scenario("api.match", lambda ctx: _post(ctx, "/api/v1/match-influencers", {"brand_name": ctx.brand()})),
+    Scenario("api.match_batch", lambda ctx: _post(ctx, "/api/v1/match-influencers/batch", {"brand_names": ctx.brands(8)})),
+    Scenario("api.analyze_match", lambda ctx: _post(
+        ctx, "/api/v1/analyze-match", {"influencer_name": ctx.influencer(), "brand_name": ctx.brand()})),
+    Scenario("api.analyze_match_stream", lambda ctx: _post(
+        ctx, "/api/v1/analyze-match/stream", {"influencer_name": ctx.influencer(), "brand_name": ctx.brand()})),
+    Scenario("api.analyze_brand", lambda ctx: _post(
+        ctx, "/api/v1/analyze-brand", {"brand_name": ctx.brand(), "force_refresh": True})),
+    Scenario("api.analyze_influencer", lambda ctx: _post(
+        ctx, "/api/v1/analyze-influencer", {"influencer_name": ctx.new_influencer(), "force_refresh": True})),
+    Scenario("service.rank", lambda ctx: _service("rank", ctx.brand())),
+    Scenario("service.rank_batch", _service_rank_batch),
+    Scenario("service.brand_pipeline", lambda ctx: _service("brand_pipeline", ctx.brand())),
+    Scenario("service.influencer_pipeline", lambda ctx: _service("influencer_pipeline", ctx.new_influencer())),
+    Scenario("service.influencer_refresh", lambda ctx: _service("influencer_pipeline", ctx.returning_influencer())),
+]
+
+
+# ------------------------------
+# Runner
+# ------------------------------
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+    }
+
+
+async def run_scenario(
+    scenario: Scenario, ctx: BenchContext, concurrency: int, duration: float, requests: Optional[int] = None
+) -> dict:
+    """Closed-loop load: `concurrency` workers issue calls back to back until the time or request budget is used."""
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    deadline = started + duration
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while (issued < requests) if requests else (time.perf_counter() < deadline):
+            issued += 1
+            call_started = time.perf_counter()
+            try:
+                await scenario.call(ctx)
+                latencies.append(time.perf_counter() - call_started)
+            except Exception as e:
+                errors.append(str(e))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, len(errors), time.perf_counter() - started)
+    if errors:
+        result["first_error"] = errors[0][:300]
+    return result
+
+
+async def run(args) -> dict:
+    from httpx import ASGITransport, AsyncClient
+
+    from brand_influencer_matcher_backend.main import app
+    from brand_influencer_matcher_backend.bench.corpus import SyntheticCorpus
+    from brand_influencer_matcher_backend.bench.fakes import PROFILES, install
+
+    profile = PROFILES[args.profile].scaled(args.latency_scale)
+    services = install(profile, dimension=args.dim)
+    corpus = SyntheticCorpus(args.influencers, args.brands, args.documents, seed=args.seed)
+    loading = time.perf_counter()
+    corpus.load(services)
+    print(f"corpus loaded in {time.perf_counter() - loading:.1f}s: {corpus.describe()}", file=sys.stderr)
+
+    selected = [s for s in SCENARIOS if not args.scenarios or any(s.name.startswith(p) for p in args.scenarios)]
+    results = {}
+    try:
+        async with app.router.lifespan_context(app):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+                ctx = BenchContext(client, corpus, args.seed)
+                for scenario in selected:
+                    before = services.stats()
+                    result = await run_scenario(scenario, ctx, args.concurrency, args.duration, args.requests)
+                    after = services.stats()
+                    calls = {name: after[name] - before[name] for name in after if after[name] != before[name]}
+                    result["upstream_per_request"] = {
+                        name: round(count / max(result["requests"], 1), 2) for name, count in calls.items()
+                    }
+                    results[scenario.name] = result
+                    print(format_row(scenario.name, result), file=sys.stderr)
+    finally:
+        services.uninstall()
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "profile": args.profile,
+            "latency_scale": args.latency_scale,
+            "dim": args.dim,
+            "corpus": corpus.describe(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "requests": args.requests,
+            "caches": args.caches,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+# ------------------------------
+# Reporting and baselines
+# ------------------------------
+HEADER = f"{'scenario':<30} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+
+
+def format_row(name: str, r: dict) -> str:
+    return (f"{name:<30} {r['requests']:>6} {r['errors']:>4} {r['throughput']:>8.1f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Lines describing each scenario against the baseline; regressions are prefixed with 'REGRESSION'."""
+    lines = []
+    for key in ("profile", "latency_scale", "dim", "corpus", "concurrency", "caches"):
+        if report["meta"].get(key) != baseline["meta"].get(key):
+            lines.append(f"warning: {key} differs from the baseline "
+                         f"({report['meta'].get(key)} vs {baseline['meta'].get(key)})")
+    for name, current in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            lines.append(f"{name:<30} (no baseline)")
+            continue
+        p95 = current["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps = current["throughput"] / base["throughput"] - 1 if base["throughput"] else 0.0
+        regressed = p95 > tolerance or rps < -tolerance or (current["errors"] and not base["errors"])
+        lines.append(f"{'REGRESSION ' if regressed else ''}{name:<30} p95 {p95:+.0%}  req/s {rps:+.0%}"
+                     + (f"  errors {current['errors']}" if current["errors"] else ""))
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", default="realistic", help="Latency profile of the fakes (see fakes.PROFILES)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply every fake latency")
+    parser.add_argument("--influencers", type=int, default=1000)
+    parser.add_argument("--brands", type=int, default=100)
+    parser.add_argument("--documents", type=int, default=None, help="Influencers with a Mongo document")
+    parser.add_argument("--dim", type=int, default=1024, help="Embedding dimension (use 128 for 1M influencers)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--requests", type=int, default=None, help="Calls per scenario (overrides --duration)")
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=None,
+                        help="Comma-separated scenario names or prefixes (api., service.)")
+    parser.add_argument("--caches", action="store_true", help="Keep the match/analysis/embedding caches on")
+    parser.add_argument("--save", metavar="NAME", help="Store the report as a baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    configure_environment(args.caches)
+    print(HEADER, file=sys.stderr)
+    report = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    if args.save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        (BASELINE_DIR / f"{args.save}.json").write_text(json.dumps(report, indent=2) + "\n")
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f"{args.compare}.json").read_text())
+        lines = compare(report, baseline, args.tolerance)
+        print("\n".join(lines))
+        if any(line.startswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
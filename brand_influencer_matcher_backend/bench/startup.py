@@ -0,0 +1,67 @@
+"""
+Cold-start benchmark.
+
+- import time: a fresh interpreter importing the app module, repeated N times
+- time to first request: spawn uvicorn and poll /health until it answers
+
+Usage:
+    python -m brand_influencer_matcher_backend.bench.startup [--runs 5] [--port 8765]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+APP_MODULE = "brand_influencer_matcher_backend.main"
+
+
+def measure_import(runs: int) -> list:
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {APP_MODULE}; "
+        "print(time.perf_counter() - t)"
+    )
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def measure_first_request(port: int, timeout: float = 60.0) -> float:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited during startup:\n{proc.stderr.read().decode(errors='replace')}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"/health did not answer within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(name: str, timings: list) -> str:
+    return (f"{name}: median {statistics.median(timings) * 1000:.0f} ms, "
+            f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms (n={len(timings)})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(summarize("import", measure_import(args.runs)))
+    print(summarize("time to first request", [measure_first_request(args.port) for _ in range(args.runs)]))
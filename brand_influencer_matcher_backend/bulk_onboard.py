@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+from brand_influencer_matcher_backend.config import (
+    INFLUENCER_COLLECTION, ONBOARDING_COLLECTION, BULK_SEARCH_CONCURRENCY, BULK_TIKTOK_CONCURRENCY,
+    BULK_LLM_CONCURRENCY, BULK_WRITE_BATCH_SIZE
+)
+from brand_influencer_matcher_backend.database import get_collection
+from brand_influencer_matcher_backend.services.influencer_service import (
+    search_influ, process_tiktok_user_async, analyze_influ, build_influencer_doc
+)
+from brand_influencer_matcher_backend.services.vector_writer import get_vector_writer
+
+logger = logging.getLogger(__name__)
+
+def normalize_handles(handles: List[str]) -> List[str]:
+    """Strip whitespace and '@', drop blanks and duplicates (order preserved)."""
+    cleaned = (h.strip().lstrip("@") for h in handles)
+    return list(dict.fromkeys(h for h in cleaned if h))
+
+
+def make_run_id(handles: List[str]) -> str:
+    """Same handle list -> same run id, so resubmitting a list resumes it."""
+    return hashlib.sha1("\n".join(sorted(handles)).encode("utf-8")).hexdigest()[:16]
+
+
+class BulkOnboardRunner:
+    """
+    Runs the influencer analysis pipeline over many handles.
+
+    Each stage (web search, yt-dlp, LLM) has its own concurrency limit.
+    Per-handle progress lives in the onboarding collection, keyed by
+    (run_id, handle), so an interrupted run picks up where it stopped.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        handles: List[str],
+        search_concurrency: int = BULK_SEARCH_CONCURRENCY,
+        tiktok_concurrency: int = BULK_TIKTOK_CONCURRENCY,
+        llm_concurrency: int = BULK_LLM_CONCURRENCY,
+        write_batch_size: int = BULK_WRITE_BATCH_SIZE,
+        report_interval: float = 10.0,
+    ):
+        self.run_id = run_id
+        self.handles = normalize_handles(handles)
+        self.search_sem = asyncio.Semaphore(search_concurrency)
+        self.tiktok_sem = asyncio.Semaphore(tiktok_concurrency)
+        self.llm_sem = asyncio.Semaphore(llm_concurrency)
+        self.workers = search_concurrency + tiktok_concurrency + llm_concurrency
+        self.write_batch_size = write_batch_size
+        self.report_interval = report_interval
+        self._results: List[dict] = []
+        self._progress_ops: List[UpdateOne] = []
+        self._write_lock = asyncio.Lock()
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self._started = None
+
+    # ------------------------------
+    # Progress bookkeeping
+    # ------------------------------
+    async def _register(self) -> List[str]:
+        """Record every handle as pending (once) and return those not finished yet."""
+        now = datetime.now().isoformat()
+        ops = [
+            UpdateOne(
+                {"_id": f"{self.run_id}:{handle}"},
+                {"$setOnInsert": {"run_id": self.run_id, "handle": handle, "status": "pending", "updated_at": now}},
+                upsert=True
+            )
+            for handle in self.handles
+        ]
+        for start in range(0, len(ops), 1000):
+            await get_collection(ONBOARDING_COLLECTION).bulk_write(ops[start:start + 1000], ordered=False)
+
+        finished = set()
+        async for doc in get_collection(ONBOARDING_COLLECTION).find({"run_id": self.run_id, "status": "done"}, {"handle": 1}):
+            finished.add(doc["handle"])
+        return [h for h in self.handles if h not in finished]
+
+    def _mark(self, handle: str, status: str, error: Optional[str] = None):
+        self._progress_ops.append(UpdateOne(
+            {"_id": f"{self.run_id}:{handle}"},
+            {"$set": {"status": status, "error": error, "updated_at": datetime.now().isoformat()}}
+        ))
+
+    async def _flush(self, force: bool = False):
+        async with self._write_lock:
+            if not force and len(self._results) + len(self._progress_ops) < self.write_batch_size:
+                return
+            results, self._results = self._results, []
+            progress_ops, self._progress_ops = self._progress_ops, []
+            # Influencer documents first: a handle is only "done" once its analysis is stored
+            if results:
+                await get_collection(INFLUENCER_COLLECTION).bulk_write([
+                    UpdateOne({"name_key": doc["name_key"]}, {"$set": doc, "$inc": {"version": 1}}, upsert=True)
+                    for doc in results
+                ], ordered=False)
+            if progress_ops:
+                await get_collection(ONBOARDING_COLLECTION).bulk_write(progress_ops, ordered=False)
+
+    # ------------------------------
+    # Pipeline
+    # ------------------------------
+    async def _process(self, handle: str):
+        async with self.search_sem:
+            search_result = await search_influ(handle)
+        async with self.tiktok_sem:
+            tiktok_result = await process_tiktok_user_async(handle, 2)
+        tiktok_result_str = str(tiktok_result) if tiktok_result else "No TikTok data available"
+        async with self.llm_sem:
+            analysis = await analyze_influ(handle, search_result, tiktok_result_str)
+
+        # Stored with its videos and input hash, so later refreshes are incremental
+        videos = tiktok_result.get("videos", []) if tiktok_result else []
+        self._results.append(build_influencer_doc(handle, search_result, tiktok_result_str, analysis, videos=videos))
+        await get_vector_writer().submit_analysis(handle, analysis)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            handle = await queue.get()
+            try:
+                try:
+                    await self._process(handle)
+                    self._mark(handle, "done")
+                    self.done += 1
+                except Exception as e:
+                    logger.warning("Error onboarding influencer", extra={"run_id": self.run_id, "handle": handle, "error": str(e)})
+                    self._mark(handle, "failed", str(e))
+                    self.failed += 1
+                await self._flush()
+            except Exception as e:
+                # Handles in a failed flush stay "pending" and are retried on resume
+                logger.error("Error writing onboarding results", extra={"run_id": self.run_id, "error": str(e)})
+            finally:
+                queue.task_done()
+
+    def progress(self) -> dict:
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        processed = self.done + self.failed
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - processed
+        return {
+            "run_id": self.run_id,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "per_minute": round(rate * 60, 2),
+            "eta_seconds": round(remaining / rate) if rate > 0 else None,
+        }
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logger.info("Bulk onboarding progress", extra=self.progress())
+
+    async def run(self) -> dict:
+        todo = await self._register()
+        self.total = len(todo)
+        logger.info("Bulk onboarding started", extra={"run_id": self.run_id, "already_done": len(self.handles) - len(todo), "todo": len(todo)})
+        self._started = time.monotonic()
+
+        writer = get_vector_writer()
+        owns_writer = not writer.running
+        if owns_writer:
+            await writer.start()
+
+        queue = asyncio.Queue()
+        for handle in todo:
+            queue.put_nowait(handle)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(min(self.workers, len(todo)))]
+        reporter = asyncio.create_task(self._report())
+        try:
+            await queue.join()
+        finally:
+            for task in workers + [reporter]:
+                task.cancel()
+            await self._flush(force=True)
+            if owns_writer:
+                await writer.stop()
+
+        result = self.progress()
+        logger.info("Bulk onboarding finished", extra=result)
+        return result
+
+
+async def get_run_progress(run_id: str) -> dict:
+    """Per-status handle counts for a run, read from Mongo."""
+    counts = {}
+    async for row in get_collection(ONBOARDING_COLLECTION).aggregate([
+        {"$match": {"run_id": run_id}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ]):
+        counts[row["_id"]] = row["count"]
+    return {"run_id": run_id, "total": sum(counts.values()), **counts}
+
+
+# --- รัน script ---
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Onboard a list of TikTok handles")
+    parser.add_argument("handles_file", help="Text file with one TikTok handle per line")
+    parser.add_argument("--run-id", help="Resume key (defaults to a hash of the handle list)")
+    parser.add_argument("--search-concurrency", type=int, default=BULK_SEARCH_CONCURRENCY)
+    parser.add_argument("--tiktok-concurrency", type=int, default=BULK_TIKTOK_CONCURRENCY)
+    parser.add_argument("--llm-concurrency", type=int, default=BULK_LLM_CONCURRENCY)
+    args = parser.parse_args()
+
+    from brand_influencer_matcher_backend.logging_setup import configure_logging
+    configure_logging()
+
+    with open(args.handles_file, encoding="utf-8") as f:
+        handles = normalize_handles(f.read().splitlines())
+
+    runner = BulkOnboardRunner(
+        args.run_id or make_run_id(handles),
+        handles,
+        search_concurrency=args.search_concurrency,
+        tiktok_concurrency=args.tiktok_concurrency,
+        llm_concurrency=args.llm_concurrency,
+    )
+    asyncio.run(runner.run())
@@ -0,0 +1,103 @@
+"""
+Accessors for external API clients.
+
+Nothing here talks to the network (or even imports the SDK) until the
+accessor is first called, so importing the backend stays cheap and does not
+require every API key to be set. The app calls `preload_sdks()` at startup
+so that the first request does not pay for the imports.
+"""
+import importlib
+import logging
+from functools import lru_cache
+
+from brand_influencer_matcher_backend.config import (
+    OPENAI_API_KEY, COHERE_API_KEY, PINECONE_API_KEY, PINECONE_INDEX_NAME, require_keys
+)
+from brand_influencer_matcher_backend.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# SDKs the accessors below import on first use
+SDK_MODULES = ["openai", "cohere", "pinecone", "agents"]
+
+
+def preload_sdks():
+    """
+    Import the SDKs ahead of traffic (no keys or network needed). `agents`
+    alone takes seconds of pure-Python work, which would otherwise stall the
+    event loop inside the first analysis request.
+    """
+    for module in SDK_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning("SDK could not be imported", extra={"sdk": module, "error": str(e)})
+
+
+@lru_cache(maxsize=None)
+def get_openai_client():
+    from openai import AsyncOpenAI
+
+    require_keys("OPENAI_API_KEY")
+    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+
+@lru_cache(maxsize=None)
+def get_cohere_client():
+    import cohere
+
+    require_keys("COHERE_API_KEY")
+    return cohere.Client(COHERE_API_KEY)
+
+
+@lru_cache(maxsize=None)
+def get_pinecone_client():
+    from pinecone import Pinecone
+
+    require_keys("PINECONE_API_KEY")
+    return Pinecone(api_key=PINECONE_API_KEY)
+
+
+_index = None
+
+
+def get_pinecone_index():
+    """
+    Connect to the Pinecone index (created by `python -m
+    brand_influencer_matcher_backend.setup_index`). Returns None if it is
+    unreachable; the next call retries.
+    """
+    global _index
+    if _index is None:
+        try:
+            _index = get_pinecone_client().Index(PINECONE_INDEX_NAME)
+        except Exception as e:
+            logger.error("Error initializing Pinecone", extra={"error": str(e)})
+    return _index
+
+
+@lru_cache(maxsize=None)
+def get_web_search_agent():
+    from agents import Agent, WebSearchTool
+
+    return Agent(name="Assistant", tools=[WebSearchTool()])
+
+
+@lru_cache(maxsize=None)
+def get_brand_agent():
+    from agents import Agent, WebSearchTool
+    from brand_influencer_matcher_backend.models.brand import BrandAnalysis
+
+    return Agent(
+        name="Brand Researcher",
+        tools=[WebSearchTool()],
+        output_type=BrandAnalysis,
+    )
+
+
+async def run_agent(agent, prompt: str):
+    from agents import Runner
+
+    require_keys("OPENAI_API_KEY")
+    with span("agent", agent.name):
+        return await Runner.run(agent, prompt)
@@ -12,6 +12,11 @@ PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 # Database Configuration
 MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "brand_influencer_db")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
 
 # Pinecone Configuration
 PINECONE_INDEX_NAME = "influencer-analysis"
@@ -22,12 +27,133 @@ PINECONE_SPEC = {
     "region": "us-east-1"
 }
 
-# Validation
+# Embeddings (Cohere)
+COHERE_EMBED_MODEL = os.getenv("COHERE_EMBED_MODEL", "embed-multilingual-v3.0")
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "96"))  # Cohere accepts up to 96 texts per call
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+
+# Embedding cache (in-memory LRU + on-disk SQLite)
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true"
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/embedding_cache.sqlite3")
+EMBED_CACHE_MAX_BYTES = int(os.getenv("EMBED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Vector store backend: "pinecone" (remote), "local" (in-process NumPy index),
+# "ivf" (in-process approximate index with binary codes, same files as "local")
+# or "snapshot" (memory-mapped corpus snapshot, see CORPUS_SNAPSHOT_PATH)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+LOCAL_VECTOR_STORE_PATH = os.getenv("LOCAL_VECTOR_STORE_PATH", "data/vector_store")
+# "local"/"ivf": how often changed namespaces are written to disk (also at shutdown),
+# i.e. the most a crash can lose
+LOCAL_VECTOR_STORE_SAVE_SECONDS = float(os.getenv("LOCAL_VECTOR_STORE_SAVE_SECONDS", "30"))
+
+# "ivf" backend: inverted lists probed per query and the exact re-rank shortlist
+# (top_k x factor); raising either trades latency for recall. The defaults reach
+# recall@10 >= 0.99 on bench.ann_recall (see the README for measured trade-offs)
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "96"))
+ANN_RERANK_FACTOR = int(os.getenv("ANN_RERANK_FACTOR", "320"))
+# Inverted lists per namespace (0 = about sqrt(vectors)); smaller namespaces are scanned exactly
+ANN_LISTS = int(os.getenv("ANN_LISTS", "0"))
+ANN_MIN_TRAIN_SIZE = int(os.getenv("ANN_MIN_TRAIN_SIZE", "20000"))
+
+# "snapshot" backend: directory written by `corpus_snapshot export`, and how often
+# influencers updated since the export are re-embedded from Mongo into memory
+CORPUS_SNAPSHOT_PATH = os.getenv("CORPUS_SNAPSHOT_PATH", "data/corpus_snapshot")
+SNAPSHOT_CATCH_UP_SECONDS = float(os.getenv("SNAPSHOT_CATCH_UP_SECONDS", "60"))
+
+# Threads for blocking SDK calls (embed, vector query/fetch/upsert) made from async code
+IO_THREAD_POOL_SIZE = int(os.getenv("IO_THREAD_POOL_SIZE", "16"))
+
+# Background vector writes (influencer analyses -> vector store)
+VECTOR_WRITE_BATCH_SIZE = int(os.getenv("VECTOR_WRITE_BATCH_SIZE", "500"))
+VECTOR_WRITE_FLUSH_MS = float(os.getenv("VECTOR_WRITE_FLUSH_MS", "200"))
+VECTOR_UPSERT_BATCH_SIZE = int(os.getenv("VECTOR_UPSERT_BATCH_SIZE", "100"))  # vectors per upsert request
+# A failed batch is queued again after VECTOR_WRITE_RETRY_BASE_SECONDS (doubling) until it has been tried this often
+VECTOR_WRITE_MAX_ATTEMPTS = int(os.getenv("VECTOR_WRITE_MAX_ATTEMPTS", "5"))
+VECTOR_WRITE_RETRY_BASE_SECONDS = float(os.getenv("VECTOR_WRITE_RETRY_BASE_SECONDS", "2"))
+
+# Validation (checked when a client is first created, not at import time)
 REQUIRED_KEYS = ["OPENAI_API_KEY", "COHERE_API_KEY", "PINECONE_API_KEY"]
-missing_keys = [key for key in REQUIRED_KEYS if not os.getenv(key)]
-if missing_keys:
-    raise ValueError(f"Missing required environment variables: {', '.join(missing_keys)}")
+
+def require_keys(*keys: str):
+    missing_keys = [key for key in (keys or REQUIRED_KEYS) if not os.getenv(key)]
+    if missing_keys:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing_keys)}")
+
+# Logging: level and "text" (key=value) or "json" lines
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
 
 # Collections
 BRAND_COLLECTION = "brands"
 INFLUENCER_COLLECTION = "influencers"
+ONBOARDING_COLLECTION = "onboarding_progress"
+META_COLLECTION = "meta"
+MATCH_CACHE_COLLECTION = "match_cache"
+MATCH_ANALYSIS_CACHE_COLLECTION = "match_analysis_cache"
+JOB_COLLECTION = "jobs"
+
+# Match result cache: "memory", "mongo" or "none"
+MATCH_CACHE_BACKEND = os.getenv("MATCH_CACHE_BACKEND", "memory")
+MATCH_CACHE_TTL_SECONDS = int(os.getenv("MATCH_CACHE_TTL_SECONDS", "3600"))
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "1024"))
+# How long a worker trusts its last read of the brand/corpus versions
+MATCH_CACHE_VERSION_TTL_SECONDS = float(os.getenv("MATCH_CACHE_VERSION_TTL_SECONDS", "2"))
+
+# Stored influencer x brand match analyses (in-process LRU in front of Mongo)
+MATCH_ANALYSIS_CACHE_ENABLED = os.getenv("MATCH_ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+MATCH_ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("MATCH_ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+MATCH_ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("MATCH_ANALYSIS_CACHE_MAX_ENTRIES", "512"))
+
+# Influencer ranking: hits pulled per namespace as candidates (all candidates
+# are then re-scored exactly on every field) and how many results are returned
+MATCH_CANDIDATE_POOL_SIZE = int(os.getenv("MATCH_CANDIDATE_POOL_SIZE", "10"))
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "3"))
+# Brands scored together in one pass by the batch match endpoint
+MATCH_BATCH_CHUNK_SIZE = int(os.getenv("MATCH_BATCH_CHUNK_SIZE", "16"))
+
+# Brand listing / autocomplete snapshot: reloaded when older than this (picks
+# up brands written by other workers; this worker's writes are immediate)
+BRAND_DIRECTORY_REFRESH_SECONDS = float(os.getenv("BRAND_DIRECTORY_REFRESH_SECONDS", "30"))
+
+# Freshness: stored analyses younger than this are served without re-running
+# the agent/LLM pipeline; older ones are served and refreshed in the background
+BRAND_ANALYSIS_TTL_SECONDS = int(os.getenv("BRAND_ANALYSIS_TTL_SECONDS", str(7 * 24 * 3600)))
+INFLUENCER_ANALYSIS_TTL_SECONDS = int(os.getenv("INFLUENCER_ANALYSIS_TTL_SECONDS", str(24 * 3600)))
+# An influencer refresh reuses the stored web-search result while it is younger
+# than this (TikTok videos are still re-checked on every refresh)
+INFLUENCER_SEARCH_TTL_SECONDS = int(os.getenv("INFLUENCER_SEARCH_TTL_SECONDS", str(30 * 24 * 3600)))
+# Background refreshes of stale analyses running at once per worker; stale
+# reads beyond this are served without starting one
+BACKGROUND_REFRESH_CONCURRENCY = int(os.getenv("BACKGROUND_REFRESH_CONCURRENCY", "4"))
+
+# Match analysis prompt context (estimated tokens): total budget, cap per
+# brand/influencer field, and how many video summaries are included
+MATCH_CONTEXT_TOKEN_BUDGET = int(os.getenv("MATCH_CONTEXT_TOKEN_BUDGET", "1500"))
+MATCH_CONTEXT_FIELD_TOKENS = int(os.getenv("MATCH_CONTEXT_FIELD_TOKENS", "120"))
+MATCH_CONTEXT_MAX_VIDEOS = int(os.getenv("MATCH_CONTEXT_MAX_VIDEOS", "5"))
+MATCH_CONTEXT_VIDEO_TOKENS = int(os.getenv("MATCH_CONTEXT_VIDEO_TOKENS", "60"))
+
+# TikTok ingestion (videos summarized concurrently per influencer)
+TIKTOK_SUMMARY_CONCURRENCY = int(os.getenv("TIKTOK_SUMMARY_CONCURRENCY", "4"))
+
+# Bulk influencer onboarding (per-stage concurrency limits)
+BULK_SEARCH_CONCURRENCY = int(os.getenv("BULK_SEARCH_CONCURRENCY", "4"))
+BULK_TIKTOK_CONCURRENCY = int(os.getenv("BULK_TIKTOK_CONCURRENCY", "4"))
+BULK_LLM_CONCURRENCY = int(os.getenv("BULK_LLM_CONCURRENCY", "8"))
+BULK_WRITE_BATCH_SIZE = int(os.getenv("BULK_WRITE_BATCH_SIZE", "50"))
+# How long a finished run's live stats stay available from the progress endpoint
+BULK_RUN_RETENTION_SECONDS = float(os.getenv("BULK_RUN_RETENTION_SECONDS", "3600"))
+
+# Background analysis jobs (/api/v1/jobs): analyses run at once per worker
+# process (the bound on concurrent web-search/yt-dlp/LLM pipelines), attempts
+# before a job fails (retries back off exponentially from the base delay)
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+# A running job's lease is renewed while it runs; a lapsed lease (worker died)
+# puts the job back in the queue
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+# How often idle workers look for jobs submitted by other processes
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+# Finished jobs (and their results) are deleted by a TTL index after this long
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
@@ -0,0 +1,79 @@
+import logging
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from brand_influencer_matcher_backend.config import (
+    MONGO_URI, DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS
+)
+from brand_influencer_matcher_backend.metrics import MongoCommandMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Database:
+    """
+    The one MongoDB client (and connection pool) of the process.
+
+    The FastAPI lifespan calls `connect()` on startup and `close()` on
+    shutdown. Scripts that run outside the app get the client lazily on
+    first use.
+    """
+
+    def __init__(self, uri: str = MONGO_URI, name: str = DB_NAME):
+        self.uri = uri
+        self.name = name
+        self._client: Optional[AsyncIOMotorClient] = None
+
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        if self._client is None:
+            self._client = AsyncIOMotorClient(
+                self.uri,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+                # Per-command latency into the stage_duration_seconds histogram
+                event_listeners=[MongoCommandMetrics()],
+            )
+        return self._client
+
+    @property
+    def db(self) -> AsyncIOMotorDatabase:
+        return self.client[self.name]
+
+    async def connect(self):
+        """Create the pool and fail fast if the server is unreachable."""
+        try:
+            await self.client.admin.command("ping")
+        except Exception as e:
+            logger.error("Error connecting to MongoDB", extra={"error": str(e)})
+            raise
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+database = Database()
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    """Shared database handle; usable as a FastAPI dependency (`Depends(get_db)`)."""
+    return database.db
+
+
+def get_collection(name: str) -> AsyncIOMotorCollection:
+    return database.db[name]
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lookup key stored as `name_key` on brand and influencer documents:
+    '  @SomeBrand ' and 'somebrand' map to the same document.
+    """
+    return name.strip().lstrip("@").strip().casefold()
@@ -1,19 +1,87 @@
+import asyncio
+import logging
 import os
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+from brand_influencer_matcher_backend.logging_setup import configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
 # Import routers
-from brand_influencer_matcher_backend.api.endpoints import brand_router, influencer_router, match_router
+from brand_influencer_matcher_backend.api.endpoints import brand_router, influencer_router, jobs_router, match_router
+from brand_influencer_matcher_backend.services.vector_store import LocalVectorStore, get_vector_store
+from brand_influencer_matcher_backend.services.vector_writer import get_vector_writer
+from brand_influencer_matcher_backend.database import database
+from brand_influencer_matcher_backend.clients import preload_sdks
+from brand_influencer_matcher_backend.migrations import migrate
+from brand_influencer_matcher_backend import metrics
+from brand_influencer_matcher_backend.services.embedding_service import get_embedding_service
+from brand_influencer_matcher_backend.services.embedding_cache import get_embedding_cache
+from brand_influencer_matcher_backend.services.match_cache import get_match_cache
+from brand_influencer_matcher_backend.services.analysis_cache import get_analysis_cache
+from brand_influencer_matcher_backend.services.match_analysis import usage_stats
+from brand_influencer_matcher_backend.services.influencer_service import refresh_stats
+from brand_influencer_matcher_backend.services.freshness import background_stats
+from brand_influencer_matcher_backend.process_tiktok import summary_stats
+from brand_influencer_matcher_backend.services.singleflight import brand_runs, influencer_runs
+from brand_influencer_matcher_backend.services.io_pool import get_io_pool
+from brand_influencer_matcher_backend.services.brand_directory import get_brand_directory
+from brand_influencer_matcher_backend.services.corpus_snapshot import SnapshotVectorStore
+from brand_influencer_matcher_backend.services.job_queue import get_job_queue
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Import the provider SDKs now rather than on the event loop during the first request
+    preload_sdks()
+    # One MongoDB pool per worker, checked before we accept traffic
+    await database.connect()
+    # Backfill name_key and make sure the lookup indexes exist (idempotent)
+    await migrate(database.db)
+    await get_vector_writer().start()
+    # Snapshot backend: fold in influencers updated since the export, then keep following Mongo
+    store = get_vector_store()
+    catch_up = None
+    if isinstance(store, SnapshotVectorStore):
+        await store.catch_up()
+        catch_up = asyncio.create_task(store.keep_caught_up())
+    # Local backends: one process per directory, changes written out periodically
+    saver = None
+    if isinstance(store, LocalVectorStore):
+        store.claim()
+        saver = asyncio.create_task(store.keep_saved())
+    await get_job_queue().start()
+    yield
+    # Running jobs go back to the queue (before the vector writer, which they feed)
+    await get_job_queue().stop()
+    for task in (catch_up, saver):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    # Flush queued vector writes before the index is persisted
+    await get_vector_writer().stop()
+    # Persist the local vector index (no-op for Pinecone and the snapshot)
+    if store:
+        store.save()
+    get_io_pool().shutdown()
+    database.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Brand-Influencer Matching API",
     description="API for analyzing brands and influencers, and finding the best matches",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -23,19 +91,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor of /api/v1/brands
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Request latency per route template (not per raw path, to keep label cardinality bounded)
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_SECONDS.observe(
+            time.perf_counter() - started, request.method, getattr(route, "path", "unmatched"), str(status)
+        )
+
 # Include routers
 app.include_router(brand_router)
 app.include_router(influencer_router)
+app.include_router(jobs_router)
 app.include_router(match_router)
 
-# Debug: Print registered routes
-print("\n=== Registered Routes ===")
+# Component counters exported as gauges on /metrics
+metrics.register_stats("embedding_batcher", lambda: get_embedding_service().stats())
+metrics.register_stats("embedding_cache", lambda: get_embedding_cache() and get_embedding_cache().stats())
+metrics.register_stats("match_cache", lambda: get_match_cache() and get_match_cache().stats())
+metrics.register_stats("match_analysis_cache", lambda: get_analysis_cache() and get_analysis_cache().stats())
+metrics.register_stats("match_analysis_tokens", usage_stats)
+metrics.register_stats("influencer_refresh", refresh_stats)
+metrics.register_stats("background_refresh", background_stats)
+metrics.register_stats("tiktok_video_summaries", summary_stats)
+metrics.register_stats("vector_writer", lambda: get_vector_writer().stats())
+metrics.register_stats("blocking_io_pool", get_io_pool().stats)
+metrics.register_stats("vector_store", lambda: get_vector_store() and get_vector_store().stats())
+metrics.register_stats("job_queue", get_job_queue().stats)
+metrics.register_stats("brand_directory", get_brand_directory().stats)
+metrics.register_stats("singleflight_brand", brand_runs.stats)
+metrics.register_stats("singleflight_influencer", influencer_runs.stats)
+
 for route in app.routes:
     if hasattr(route, "methods"):
-        print(f"{route.path} - {route.methods}")
-print("======================\n")
+        logger.debug("Registered route", extra={"path": route.path, "methods": sorted(route.methods)})
 
 # Health check endpoint
 @app.get("/health")
@@ -43,6 +143,11 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage latency histograms, request latency and component counters (Prometheus text format)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Debug endpoint to list all routes
 @app.get("/routes")
 async def list_routes():
@@ -0,0 +1,176 @@
+"""
+Lightweight in-process instrumentation.
+
+`span(stage, operation)` times one unit of work (a Mongo command, an embed
+call, a vector query, an LLM/agent run, a yt-dlp subprocess, ...) into the
+`stage_duration_seconds` histogram and counts failures. Component `stats()`
+dicts are exported as gauges through `register_stats`. `render()` produces
+the Prometheus text format served at `/metrics`.
+
+No client library is needed: the exposition format is written by hand.
+"""
+import bisect
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# ------------------------------
+# Metric types
+# ------------------------------
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> ([count per bucket (non-cumulative), +Inf last], sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            counts, total = self._values.get(labels) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[labels] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds", "Time spent per pipeline stage and operation", ("stage", "operation")
+)
+STAGE_ERRORS = Counter(
+    "stage_errors_total", "Failed pipeline stage operations", ("stage", "operation")
+)
+HTTP_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+
+
+# ------------------------------
+# Spans
+# ------------------------------
+class span:
+    """
+    Time a block (sync or async code inside a plain `with`):
+
+        with span("llm", "match_analysis"):
+            response = await client.responses.parse(...)
+    """
+
+    def __init__(self, stage: str, operation: str):
+        self.stage = stage
+        self.operation = operation
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        STAGE_SECONDS.observe(elapsed, self.stage, self.operation)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            STAGE_ERRORS.inc(self.stage, self.operation)
+        logger.debug("span", extra={"stage": self.stage, "operation": self.operation,
+                                    "seconds": round(elapsed, 4), "error": exc_type is not None})
+        return False
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command the shared client sends (find, update, aggregate, ...)."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        STAGE_SECONDS.observe(event.duration_micros / 1e6, "mongo", event.command_name)
+
+    def failed(self, event):
+        STAGE_SECONDS.observe(event.duration_micros / 1e6, "mongo", event.command_name)
+        STAGE_ERRORS.inc("mongo", event.command_name)
+
+
+# ------------------------------
+# Component stats
+# ------------------------------
+_stats_sources: Dict[str, Callable[[], Optional[dict]]] = {}
+
+
+def register_stats(component: str, source: Callable[[], Optional[dict]]):
+    """Export the numeric values of `source()` as `component_stat{component=..., stat=...}` gauges."""
+    _stats_sources[component] = source
+
+
+def _render_stats() -> List[str]:
+    lines = ["# HELP component_stat Counters and sizes reported by component stats()",
+             "# TYPE component_stat gauge"]
+    for component, source in sorted(_stats_sources.items()):
+        try:
+            stats = source() or {}
+        except Exception as e:
+            logger.warning("stats source failed", extra={"component": component, "error": str(e)})
+            continue
+        for key, value in sorted(stats.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"component_stat{_labels(('component', 'stat'), (component, key))} {value}")
+    return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in (STAGE_SECONDS, STAGE_ERRORS, HTTP_SECONDS):
+        lines.extend(metric.render())
+    lines.extend(_render_stats())
+    return "\n".join(lines) + "\n"
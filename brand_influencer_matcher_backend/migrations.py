@@ -0,0 +1,131 @@
+import logging
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from brand_influencer_matcher_backend.config import (
+    BRAND_COLLECTION, INFLUENCER_COLLECTION, ONBOARDING_COLLECTION, JOB_COLLECTION
+)
+from brand_influencer_matcher_backend.database import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# collection -> field the lookup key is derived from
+NAME_FIELDS = {
+    BRAND_COLLECTION: "brand_name",
+    INFLUENCER_COLLECTION: "influencer",
+}
+
+# Losing duplicates are moved to `<key>#dup-<_id>`
+DUPLICATE_KEY_MARKER = "#dup-"
+
+
+async def backfill_name_keys(db) -> int:
+    """Set `name_key` on every brand/influencer document that lacks it."""
+    updated = 0
+    for collection_name, name_field in NAME_FIELDS.items():
+        collection = db[collection_name]
+        ops = []
+        async for doc in collection.find({"name_key": {"$exists": False}}, {name_field: 1}):
+            if doc.get(name_field):
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"name_key": normalize_name(doc[name_field])}}))
+        for start in range(0, len(ops), 1000):
+            await collection.bulk_write(ops[start:start + 1000], ordered=False)
+        updated += len(ops)
+        if ops:
+            logger.info("Backfilled name_key", extra={"collection": collection_name, "count": len(ops)})
+    return updated
+
+
+async def backfill_last_updated(db) -> int:
+    """
+    Date brand/influencer documents that have no `last_updated` as of now, so
+    they go stale (and are refreshed) one TTL after the migration rather than
+    all being treated as fresh forever.
+    """
+    updated = 0
+    now = datetime.now().isoformat()
+    for collection_name in NAME_FIELDS:
+        result = await db[collection_name].update_many({"last_updated": {"$exists": False}}, {"$set": {"last_updated": now}})
+        updated += result.modified_count
+        if result.modified_count:
+            logger.info("Backfilled last_updated", extra={"collection": collection_name, "count": result.modified_count})
+    return updated
+
+
+async def resolve_duplicate_keys(db) -> int:
+    """
+    Documents whose names only differed by case/'@'/whitespace now share a
+    name_key. Keep the most recently updated one on the key and move the others
+    to `<key>#dup-<_id>` (nothing is deleted) so the unique index can be built.
+
+    Once that index exists there can be no duplicates and the collection is
+    skipped; before, one aggregation returns only the keys held by several
+    documents.
+    """
+    moved = 0
+    for collection_name in NAME_FIELDS:
+        collection = db[collection_name]
+        if "name_key_unique" in await collection.index_information():
+            continue
+        pipeline = [
+            {"$match": {"name_key": {"$exists": True}}},
+            {"$group": {
+                "_id": "$name_key",
+                "count": {"$sum": 1},
+                "docs": {"$push": {"_id": "$_id", "last_updated": "$last_updated"}},
+            }},
+            {"$match": {"count": {"$gt": 1}}},
+        ]
+        async for group in collection.aggregate(pipeline, allowDiskUse=True):
+            key, docs = group["_id"], group["docs"]
+            docs.sort(key=lambda d: (d.get("last_updated") or "", d["_id"]), reverse=True)
+            for doc in docs[1:]:
+                await collection.update_one(
+                    {"_id": doc["_id"]}, {"$set": {"name_key": f"{key}{DUPLICATE_KEY_MARKER}{doc['_id']}"}}
+                )
+                moved += 1
+            logger.warning("Duplicate name_key moved to #dup keys",
+                           extra={"collection": collection_name, "name_key": key, "count": len(docs) - 1})
+    return moved
+
+
+async def ensure_indexes(db):
+    await db[BRAND_COLLECTION].create_index([("name_key", ASCENDING)], unique=True, name="name_key_unique")
+    await db[INFLUENCER_COLLECTION].create_index([("name_key", ASCENDING)], unique=True, name="name_key_unique")
+    # Brand directory reloads are covered by this index and never read the documents (which carry the embeddings)
+    await db[BRAND_COLLECTION].create_index(
+        [("name_key", ASCENDING), ("brand_name", ASCENDING)], name="name_key_brand_name"
+    )
+    # Recency scans (delta catch-up, "recently analyzed" listings)
+    await db[INFLUENCER_COLLECTION].create_index([("last_updated", DESCENDING)], name="last_updated")
+    await db[ONBOARDING_COLLECTION].create_index(
+        [("run_id", ASCENDING), ("status", ASCENDING)], name="run_status"
+    )
+    # One queued/running job per kind and name (submissions join it)
+    await db[JOB_COLLECTION].create_index(
+        [("dedupe_key", ASCENDING)], unique=True, partialFilterExpression={"active": True}, name="active_dedupe_key"
+    )
+    # Worker claims: highest priority, then oldest
+    await db[JOB_COLLECTION].create_index(
+        [("status", ASCENDING), ("priority", DESCENDING), ("created_at", ASCENDING)], name="claim_order"
+    )
+    # Finished jobs are removed once expire_at passes
+    await db[JOB_COLLECTION].create_index([("expire_at", ASCENDING)], expireAfterSeconds=0, name="expire_at_ttl")
+
+
+async def migrate(db):
+    """Idempotent; runs at app startup and from the command line."""
+    await backfill_name_keys(db)
+    await backfill_last_updated(db)
+    await resolve_duplicate_keys(db)
+    await ensure_indexes(db)
+
+
+if __name__ == "__main__":
+    import asyncio
+    from brand_influencer_matcher_backend.database import get_db
+    from brand_influencer_matcher_backend.logging_setup import configure_logging
+
+    configure_logging()
+    asyncio.run(migrate(get_db()))
@@ -1,4 +1,4 @@
-from .influencer import db as mongo_db, INFLUENCER_COLLECTION
+from .influencer import INFLUENCER_COLLECTION
 from ..config import BRAND_COLLECTION
 
-__all__ = ['mongo_db', 'INFLUENCER_COLLECTION', 'BRAND_COLLECTION']
\ No newline at end of file
+__all__ = ['INFLUENCER_COLLECTION', 'BRAND_COLLECTION']
\ No newline at end of file
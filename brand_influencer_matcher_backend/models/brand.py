@@ -1,5 +1,4 @@
 from pydantic import BaseModel
-from agents import Agent, WebSearchTool
 from brand_influencer_matcher_backend.config import BRAND_COLLECTION
 
 # ------------------------------
@@ -12,11 +11,4 @@ class BrandAnalysis(BaseModel):
     brand_personality: str
     vision: str
 
-# ------------------------------
-# Agent setup
-# ------------------------------
-brand_agent = Agent(
-    name="Brand Researcher",
-    tools=[WebSearchTool()],
-    output_type=BrandAnalysis,
-)
+# The "Brand Researcher" agent is created lazily by clients.get_brand_agent()
@@ -1,69 +1,169 @@
-import os
 import asyncio
 import json
+import logging
 import subprocess
 from datetime import datetime
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
+from typing import Dict, Optional
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY not found in environment variables or .env file")
+from brand_influencer_matcher_backend.config import TIKTOK_SUMMARY_CONCURRENCY
+from brand_influencer_matcher_backend.clients import get_openai_client
+from brand_influencer_matcher_backend.metrics import span
 
-openai_client = AsyncOpenAI(api_key=api_key)
+logger = logging.getLogger(__name__)
+
+# summarize_text's answer when the LLM call failed; such summaries are never reused
+SUMMARY_FAILED = "ไม่สามารถสรุปเนื้อหาได้"
+
+_metrics = {"videos_summarized": 0, "videos_reused": 0}
+
+# --- ดึง videos ด้วย yt-dlp แบบ stream (ขอแค่ N คลิปแรก, parse ทีละบรรทัด) ---
+async def stream_tiktok_entries(username, limit=3):
+    # Covers the whole subprocess lifetime, including the time the caller spends between entries
+    with span("ytdlp", "flat_playlist"):
+        proc = await asyncio.create_subprocess_exec(
+            "yt-dlp", f"https://www.tiktok.com/@{username}",
+            "-j", "--flat-playlist", "--playlist-end", str(limit),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        # Read stderr alongside stdout: once its pipe buffer fills, yt-dlp blocks
+        # on writing warnings and stops printing entries
+        stderr_read = asyncio.ensure_future(proc.stderr.read())
+        emitted = 0
+        exhausted = False
+        try:
+            # yt-dlp prints one JSON document per playlist entry
+            async for line in proc.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                yield json.loads(line)
+                emitted += 1
+                if emitted >= limit:
+                    break
+            else:
+                exhausted = True
+        finally:
+            # Stop yt-dlp as soon as we have enough entries (or the caller stopped reading)
+            if not exhausted and proc.returncode is None:
+                proc.kill()
+            stderr = await stderr_read
+            await proc.wait()
+        if exhausted and proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, "yt-dlp", stderr=stderr.decode(errors="replace"))
+
+def _video_from_entry(username, vid):
+    return {
+        "url": f"https://www.tiktok.com/@{username}/video/{vid['id']}",
+        "video_id": vid["id"],
+        "caption": vid.get("title", ""),
+        "transcription": None,  # เราไม่ดาวน์โหลด audio
+        "summary": None
+    }
 
 # --- ดึง profile + videos ด้วย yt-dlp (flat playlist) ---
 async def fetch_tiktok_profile_and_videos(username, limit=3):
-    def _run():
-        return subprocess.run(
-            ["yt-dlp", f"https://www.tiktok.com/@{username}", "-J", "--flat-playlist"],
-            capture_output=True, text=True, check=True
-        )
-    
-    result = await asyncio.to_thread(_run)
-    data = json.loads(result.stdout)
-    
     profile_data = {
         "username": username,
         "last_updated": datetime.now().isoformat()
     }
 
     videos = []
-    entries = data.get("entries", [])[:limit]
-    for vid in entries:
-        video_url = f"https://www.tiktok.com/@{username}/video/{vid['id']}"
-        videos.append({
-            "url": video_url,
-            "video_id": vid["id"],
-            "caption": vid.get("title", ""),
-            "transcription": None,  # เราไม่ดาวน์โหลด audio
-            "summary": None
-        })
+    async for vid in stream_tiktok_entries(username, limit):
+        videos.append(_video_from_entry(username, vid))
     return profile_data, videos
 
 # --- สรุปด้วย GPT จาก caption ---
 async def summarize_text(text):
     try:
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "คุณเป็นผู้ช่วยสร้างสรุปเนื้อหา video สั้น ๆ"},
-                {"role": "user", "content": f"สรุปวิดีโอนี้ให้สั้นกระชับ 1-2 ประโยค ถ้าเป็นโฆษณาก็วิเคราะห์ว่าขายอะไร: {text}"}
-            ],
-            max_tokens=300
-        )
+        with span("llm", "video_summary"):
+            response = await get_openai_client().chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "คุณเป็นผู้ช่วยสร้างสรุปเนื้อหา video สั้น ๆ"},
+                    {"role": "user", "content": f"สรุปวิดีโอนี้ให้สั้นกระชับ 1-2 ประโยค ถ้าเป็นโฆษณาก็วิเคราะห์ว่าขายอะไร: {text}"}
+                ],
+                max_tokens=300
+            )
         return response.choices[0].message.content.strip()
     except Exception as e:
-        print(f"Error in summarize_text: {str(e)}")
-        return "ไม่สามารถสรุปเนื้อหาได้"
+        logger.warning("Error in summarize_text", extra={"error": str(e)})
+        return SUMMARY_FAILED
+
+def known_summary(known: Optional[Dict[str, dict]], vid: dict) -> Optional[str]:
+    """Stored summary of `vid` when the same video (and caption) was summarized before."""
+    stored = (known or {}).get(vid["video_id"])
+    if not stored or stored.get("caption") != vid["caption"]:
+        return None
+    summary = stored.get("summary")
+    return summary if summary and summary != SUMMARY_FAILED else None
+
+# --- stream: summarize หลายคลิปพร้อมกัน (จำกัดด้วย semaphore) แล้ว yield ทีละคลิป ---
+async def stream_tiktok_videos(username, limit=3, concurrency=TIKTOK_SUMMARY_CONCURRENCY, known=None):
+    """
+    Async generator yielding one summarized video dict per entry, in completion
+    order. Summaries start as soon as yt-dlp emits each entry; videos in
+    `known` (stored videos by video_id) keep their stored summary instead.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = asyncio.Queue()
+    tasks = set()
+
+    async def summarize(position, vid):
+        async with semaphore:
+            logger.debug("Summarizing video", extra={"url": vid["url"]})
+            vid["summary"] = await summarize_text(vid["caption"])
+        await results.put((position, vid))
+
+    async def produce():
+        position = 0
+        async for entry in stream_tiktok_entries(username, limit):
+            vid = _video_from_entry(username, entry)
+            summary = known_summary(known, vid)
+            if summary is not None:
+                _metrics["videos_reused"] += 1
+                results.put_nowait((position, {**vid, "summary": summary}))
+            else:
+                _metrics["videos_summarized"] += 1
+                tasks.add(asyncio.create_task(summarize(position, vid)))
+            position += 1
+        return position
+
+    producer = asyncio.create_task(produce())
+    yielded = 0
+    try:
+        while True:
+            if producer.done():
+                # Raises yt-dlp errors; afterwards just drain the remaining summaries
+                if yielded == producer.result():
+                    break
+                position, vid = await results.get()
+            else:
+                getter = asyncio.create_task(results.get())
+                await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                position, vid = getter.result()
+            yielded += 1
+            yield {**vid, "position": position}
+    finally:
+        producer.cancel()
+        for task in tasks:
+            task.cancel()
 
 # --- pipeline ---
-async def process_tiktok_user(username, limit=3):
-    profile, videos = await fetch_tiktok_profile_and_videos(username, limit)
-    for vid in videos:
-        print(f"Processing: {vid['url']}")
-        vid["summary"] = await summarize_text(vid["caption"])
+async def process_tiktok_user(username, limit=3, known_videos=None):
+    """
+    Profile and summarized videos of `username`. `known_videos` maps video_id
+    to a previously stored video; only videos not in it are summarized.
+    """
+    profile = {
+        "username": username,
+        "last_updated": datetime.now().isoformat()
+    }
+    videos = [vid async for vid in stream_tiktok_videos(username, limit, known=known_videos)]
+    # คืนลำดับเดิมของ playlist
+    videos.sort(key=lambda vid: vid.pop("position"))
     profile["videos_processed"] = len(videos)
     return {
         "username": username,
@@ -72,6 +172,9 @@ async def process_tiktok_user(username, limit=3):
         "videos": videos
     }
 
+def summary_stats() -> dict:
+    return dict(_metrics)
+
 # --- รัน script ---
 if __name__ == "__main__":
     import sys
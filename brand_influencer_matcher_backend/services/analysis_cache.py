@@ -0,0 +1,68 @@
+from typing import Any, Dict, Optional
+
+from brand_influencer_matcher_backend.config import (
+    MATCH_ANALYSIS_CACHE_ENABLED, MATCH_ANALYSIS_CACHE_COLLECTION,
+    MATCH_ANALYSIS_CACHE_TTL_SECONDS, MATCH_ANALYSIS_CACHE_MAX_ENTRIES
+)
+from brand_influencer_matcher_backend.services.match_cache import MemoryMatchCache, MongoMatchCache
+from brand_influencer_matcher_backend.services.match_context import MATCH_PROMPT_VERSION
+
+
+class MatchAnalysisCache:
+    """
+    Stored influencer x brand match analyses.
+
+    Keyed on both document versions, the prompt version and the model, so
+    re-analyzing either side (which bumps its `version`) or changing the
+    prompt makes old entries unreachable; they expire through the TTL index.
+    An in-process LRU sits in front of the shared Mongo collection.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = MATCH_ANALYSIS_CACHE_COLLECTION,
+        ttl: float = MATCH_ANALYSIS_CACHE_TTL_SECONDS,
+        max_entries: int = MATCH_ANALYSIS_CACHE_MAX_ENTRIES,
+    ):
+        self.memory = MemoryMatchCache(max_entries=max_entries, ttl=ttl)
+        self.mongo = MongoMatchCache(collection_name=collection_name, ttl=ttl)
+        self._metrics = {"memory_hits": 0, "mongo_hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(influencer_doc: Dict[str, Any], brand_doc: Dict[str, Any], model: str) -> str:
+        return (
+            f"{influencer_doc.get('name_key')}|i{influencer_doc.get('version', 0)}"
+            f"|{brand_doc.get('name_key')}|b{brand_doc.get('version', 0)}"
+            f"|p{MATCH_PROMPT_VERSION}|{model}"
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.memory.get(key)
+        if value is not None:
+            self._metrics["memory_hits"] += 1
+            return value
+        value = await self.mongo.get(key)
+        if value is None:
+            self._metrics["misses"] += 1
+            return None
+        self._metrics["mongo_hits"] += 1
+        await self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: str):
+        await self.memory.set(key, value)
+        await self.mongo.set(key, value)
+
+    def stats(self) -> dict:
+        return dict(self._metrics)
+
+
+_cache: Optional[MatchAnalysisCache] = None
+
+
+def get_analysis_cache() -> Optional[MatchAnalysisCache]:
+    """Return the match analysis cache, or None when MATCH_ANALYSIS_CACHE_ENABLED is false."""
+    global _cache
+    if _cache is None and MATCH_ANALYSIS_CACHE_ENABLED:
+        _cache = MatchAnalysisCache()
+    return _cache
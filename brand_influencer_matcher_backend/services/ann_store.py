@@ -0,0 +1,508 @@
+import copy
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from brand_influencer_matcher_backend.config import (
+    LOCAL_VECTOR_STORE_PATH, PINECONE_DIMENSION, ANN_NPROBE, ANN_RERANK_FACTOR, ANN_LISTS, ANN_MIN_TRAIN_SIZE
+)
+from brand_influencer_matcher_backend.services.vector_store import LocalVectorStore, VectorMatch
+
+logger = logging.getLogger(__name__)
+
+# Rows per chunk when a whole namespace is encoded, assigned or written out
+_CHUNK = 65536
+
+# Growth since the last training after which `save` retrains a namespace
+RETRAIN_GROWTH = 4
+
+
+# ------------------------------
+# Helpers
+# ------------------------------
+class _Rows:
+    """Append-only NumPy array with amortized growth; `view` is the filled part."""
+
+    def __init__(self, tail=(), dtype=np.float32, capacity: int = 1024):
+        self.data = np.zeros((max(capacity, 1), *tail), dtype=dtype)
+        self.size = 0
+
+    @property
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+    def extend(self, rows: np.ndarray):
+        needed = self.size + len(rows)
+        if needed > len(self.data):
+            grown = np.zeros((max(needed, len(self.data) * 2), *self.data.shape[1:]), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:needed] = rows
+        self.size = needed
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def frozen(self, copy_data: bool = False) -> "_Rows":
+        """
+        The filled rows as of now. Appends never touch them, so they are
+        shared unless `copy_data` (for rows that are changed in place).
+        """
+        rows = _Rows.__new__(_Rows)
+        rows.data = self.view.copy() if copy_data else self.view
+        rows.size = self.size
+        return rows
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+if hasattr(np, "bitwise_count"):
+    def _hamming(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(codes ^ query).sum(axis=1)
+else:  # NumPy < 2.0
+    _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _hamming(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        return _POPCOUNT[(codes ^ query).view(np.uint8)].sum(axis=1, dtype=np.uint32)
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for each (unit) row."""
+    return np.concatenate([
+        np.argmax(vectors[start:start + _CHUNK] @ centroids.T, axis=1) for start in range(0, len(vectors), _CHUNK)
+    ]).astype(np.int32) if len(vectors) else np.zeros(0, dtype=np.int32)
+
+
+def _kmeans(sample: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: `k` unit centroids for the unit rows of `sample`."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=k)
+        filled = np.flatnonzero(counts)
+        sums = np.add.reduceat(sample[order], np.concatenate(([0], np.cumsum(counts)[:-1]))[filled], axis=0)
+        centroids[filled] = _unit(sums)
+        # Empty lists restart from random points
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+    return centroids
+
+
+# ------------------------------
+# Namespace
+# ------------------------------
+class _IVFNamespace:
+    """
+    Inverted-file index over one namespace.
+
+    Every row keeps its float32 vector (the saved matrix is memory-mapped, rows
+    added since are in memory) for exact scores. The in-memory index holds,
+    per row, its list, the sign bits of its residual `vector - centroid` (one
+    bit per dimension) and `centroid . vector`. A query scores the `nprobe`
+    nearest centroids, estimates the score of every live row in those lists
+    from the Hamming distance between residual codes, and re-ranks the
+    `top_k * rerank_factor` best estimates with exact float dot products.
+
+    Rows are append-only: an upsert of an existing id appends a new row and
+    retires the old one, deletes retire rows; `save` compacts. Namespaces
+    below `min_train_size` rows are scanned exactly until they reach it. New
+    rows join the nearest existing list; `save` retrains once the namespace
+    has grown to RETRAIN_GROWTH times the rows it was trained on.
+
+    `view` hands out a read-only copy for queries that run without the
+    lock: appended rows are past its end and retraining replaces arrays
+    rather than changing them, so only the live flags are copied.
+    """
+
+    def __init__(self, dimension: int, nprobe: int, rerank_factor: int, lists: int, min_train_size: int,
+                 base: Optional[np.ndarray] = None):
+        self.dimension = dimension
+        self.words = (dimension + 63) // 64
+        self.nprobe = nprobe
+        self.rerank_factor = rerank_factor
+        self.list_count = lists
+        self.min_train_size = min_train_size
+        # Float rows: the saved (memory-mapped) matrix, then rows added since
+        self.base = base if base is not None else np.zeros((0, dimension), dtype=np.float32)
+        self.extra = _Rows((dimension,), np.float32)
+        self.size = len(self.base)
+        self.alive = _Rows((), bool, capacity=self.size)
+        self.alive.extend(np.ones(self.size, dtype=bool))
+        self.ids: List[str] = []
+        self.influencers: List[str] = []
+        self.texts: List[str] = []
+        self.id_to_row: Dict[str, int] = {}
+        # IVF state (None until trained)
+        self.centroids: Optional[np.ndarray] = None
+        self.codes: Optional[_Rows] = None
+        self.assign: Optional[_Rows] = None
+        self.centroid_dot: Optional[_Rows] = None
+        self.trained_rows = 0
+        # cos(pi * hamming / dimension): angle estimate between two residuals
+        self._cos = np.cos(np.pi * np.arange(dimension + 1) / dimension).astype(np.float32)
+        self.lists: List[_Rows] = []
+        self._view: Optional["_IVFNamespace"] = None
+
+    def view(self) -> "_IVFNamespace":
+        """Snapshot of the current rows and index; later writes never change it."""
+        if self._view is None:
+            view = copy.copy(self)
+            view.extra = self.extra.frozen()
+            view.alive = self.alive.frozen(copy_data=True)
+            if self.centroids is not None:
+                view.codes, view.assign = self.codes.frozen(), self.assign.frozen()
+                view.centroid_dot = self.centroid_dot.frozen()
+                view.lists = [rows.frozen() for rows in self.lists]
+            # ids/influencers/texts are append-only, so the lists are shared; id_to_row is not
+            view.id_to_row = None
+            self._view = view
+        return self._view
+
+    # --- float rows ---
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        split = len(self.base)
+        if not self.extra.size:
+            return np.asarray(self.base[rows])
+        out = np.empty((len(rows), self.dimension), dtype=np.float32)
+        low = rows < split
+        out[low] = self.base[rows[low]]
+        out[~low] = self.extra.view[rows[~low] - split]
+        return out
+
+    # --- codes / lists ---
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        bits = np.packbits(residuals > 0, axis=1)
+        padded = np.zeros((len(residuals), self.words * 8), dtype=np.uint8)
+        padded[:, :bits.shape[1]] = bits
+        return padded.view(np.uint64)
+
+    def _quantize(self, vectors: np.ndarray):
+        """(list, residual code, centroid dot) of each row."""
+        assign = _nearest(vectors, self.centroids)
+        centroids = self.centroids[assign]
+        return assign, self._encode(vectors - centroids), np.einsum("ij,ij->i", vectors, centroids)
+
+    def _index(self, first: int, vectors: np.ndarray):
+        """Index rows first..first+len(vectors)."""
+        assign, codes, dots = self._quantize(vectors)
+        self.codes.extend(codes)
+        self.assign.extend(assign)
+        self.centroid_dot.extend(dots)
+        rows = np.arange(first, first + len(vectors), dtype=np.int32)
+        for list_id in np.unique(assign):
+            self.lists[list_id].extend(rows[assign == list_id])
+
+    def _build_lists(self, assign: np.ndarray):
+        live = np.flatnonzero(self.alive.view)
+        order = live[np.argsort(assign[live], kind="stable")]
+        counts = np.bincount(assign[live], minlength=len(self.centroids))
+        self.lists = []
+        for members in np.split(order, np.cumsum(counts)[:-1]):
+            rows = _Rows((), np.int32, capacity=len(members) * 2)
+            rows.extend(members)
+            self.lists.append(rows)
+
+    def train(self, lists: Optional[int] = None, seed: int = 0):
+        """(Re)build centroids, codes and lists from the live rows."""
+        live = np.flatnonzero(self.alive.view)
+        if not len(live):
+            return
+        self._view = None
+        count = min(lists or self.list_count or max(1, int(round(np.sqrt(len(live))))), len(live))
+        rng = np.random.default_rng(seed)
+        sample = self.vectors(np.sort(rng.choice(live, min(len(live), max(count * 40, 20000)), replace=False)))
+        self.centroids = _kmeans(sample, count, seed=seed)
+        self.codes = _Rows((self.words,), np.uint64, capacity=self.size)
+        self.assign = _Rows((), np.int32, capacity=self.size)
+        self.centroid_dot = _Rows((), np.float32, capacity=self.size)
+        for start in range(0, self.size, _CHUNK):
+            assign, codes, dots = self._quantize(self.vectors(np.arange(start, min(start + _CHUNK, self.size))))
+            self.codes.extend(codes)
+            self.assign.extend(assign)
+            self.centroid_dot.extend(dots)
+        self._build_lists(self.assign.view)
+        self.trained_rows = len(live)
+        logger.info("IVF index trained", extra={"rows": len(live), "lists": count})
+
+    def restore(self, centroids: np.ndarray, codes: np.ndarray, assign: np.ndarray, centroid_dot: np.ndarray,
+                trained_rows: int):
+        """Adopt a saved index (rows in the saved order, all live)."""
+        self._view = None
+        self.centroids = centroids
+        self.trained_rows = trained_rows
+        self.codes = _Rows((self.words,), np.uint64, capacity=len(codes))
+        self.codes.extend(codes)
+        self.assign = _Rows((), np.int32, capacity=len(assign))
+        self.assign.extend(assign)
+        self.centroid_dot = _Rows((), np.float32, capacity=len(centroid_dot))
+        self.centroid_dot.extend(centroid_dot)
+        self._build_lists(self.assign.view)
+
+    # --- writes ---
+    def upsert(self, vectors: List[dict]):
+        if not vectors:
+            return
+        self._view = None
+        block = _unit(np.asarray([item["values"] for item in vectors], dtype=np.float32).reshape(len(vectors), -1))
+        first = self.size
+        self.extra.extend(block)
+        self.alive.extend(np.ones(len(vectors), dtype=bool))
+        for row, item in enumerate(vectors, start=first):
+            metadata = item.get("metadata") or {}
+            previous = self.id_to_row.get(item["id"])
+            if previous is not None:
+                self.alive.data[previous] = False
+            self.id_to_row[item["id"]] = row
+            self.ids.append(item["id"])
+            self.influencers.append(metadata.get("influencer", self.influencers[previous] if previous is not None else ""))
+            self.texts.append(metadata.get("text", self.texts[previous] if previous is not None else ""))
+        self.size += len(vectors)
+        if self.centroids is not None:
+            self._index(first, block)
+        elif len(self.id_to_row) >= self.min_train_size:
+            self.train()
+
+    def delete(self, ids: List[str]):
+        self._view = None
+        for vector_id in ids:
+            row = self.id_to_row.pop(vector_id, None)
+            if row is not None:
+                self.alive.data[row] = False
+
+    # --- reads ---
+    def _top(self, rows: np.ndarray, scores: np.ndarray, top_k: int) -> List[VectorMatch]:
+        k = min(top_k, len(rows))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [VectorMatch(self.ids[rows[i]], float(scores[i]), self.influencers[rows[i]]) for i in top]
+
+    def _exact(self, queries: np.ndarray, top_k: int) -> List[List[VectorMatch]]:
+        scores = np.concatenate([queries @ self.base.T, queries @ self.extra.view.T], axis=1)
+        live = np.flatnonzero(self.alive.view)
+        return [self._top(live, row[live], top_k) for row in scores]
+
+    def search_many(self, queries: np.ndarray, top_k: int) -> List[List[VectorMatch]]:
+        if not self.size:
+            return [[] for _ in range(len(queries))]
+        if self.centroids is None:
+            return self._exact(queries, top_k)
+        nprobe = min(self.nprobe, len(self.centroids))
+        shortlist = top_k * self.rerank_factor
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+        alive, codes, dots = self.alive.view, self.codes.view, self.centroid_dot.view
+        results = []
+        for query, scores, probe in zip(queries, centroid_scores, probes):
+            members = [self.lists[list_id].view for list_id in probe]
+            rows = np.concatenate(members)
+            owner = np.repeat(np.arange(len(probe)), [len(m) for m in members])
+            live = alive[rows]
+            rows, owner = rows[live], owner[live]
+            if len(rows) > shortlist:
+                # q.v = q.c + c.v - 1 + (q - c).(v - c), the last term from the residual codes
+                residuals = query - self.centroids[probe]
+                distance = _hamming(codes[rows], self._encode(residuals)[owner])
+                row_dots = dots[rows]
+                estimate = (scores[probe][owner] + row_dots - 1
+                            + np.linalg.norm(residuals, axis=1)[owner] * np.sqrt(np.maximum(2 - 2 * row_dots, 0))
+                            * self._cos[distance])
+                rows = rows[np.argpartition(-estimate, shortlist - 1)[:shortlist]]
+            # Sorted rows read the memory-mapped matrix in file order
+            rows.sort()
+            results.append(self._top(rows, self.vectors(rows) @ query, top_k))
+        return results
+
+    def search(self, query: np.ndarray, top_k: int) -> List[VectorMatch]:
+        return self.search_many(query[None, :], top_k)[0]
+
+    def fetch(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        found = [(vector_id, self.id_to_row[vector_id]) for vector_id in ids if vector_id in self.id_to_row]
+        if not found:
+            return {}
+        gathered = self.vectors([row for _, row in found])
+        return {vector_id: gathered[i] for i, (vector_id, _) in enumerate(found)}
+
+    def stats(self) -> dict:
+        index_bytes = 0
+        if self.centroids is not None:
+            index_bytes = (self.codes.nbytes + self.assign.nbytes + self.centroid_dot.nbytes
+                           + self.centroids.nbytes + sum(rows.nbytes for rows in self.lists))
+        return {
+            "vectors": len(self.id_to_row),
+            "retired_rows": self.size - len(self.id_to_row),
+            "lists": len(self.centroids) if self.centroids is not None else 0,
+            "index_bytes": index_bytes,
+            "float_bytes_mapped": self.base.nbytes,
+            "float_bytes_in_memory": self.extra.nbytes,
+        }
+
+
+# ------------------------------
+# Store
+# ------------------------------
+class QuantizedVectorStore(LocalVectorStore):
+    """
+    Local backend for large corpora (VECTOR_STORE_BACKEND=ivf): an IVF index
+    with binary codes per namespace, exact float re-ranking of the shortlist.
+
+    Uses the same vector / `<namespace>.json` files as LocalVectorStore
+    (memory-mapped instead of loaded) plus a `<namespace>.<generation>.ivf.npz`
+    with the trained index, named in the JSON file like the vectors. A
+    directory written by the plain local backend is indexed on load.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        dimension: int = PINECONE_DIMENSION,
+        nprobe: int = ANN_NPROBE,
+        rerank_factor: int = ANN_RERANK_FACTOR,
+        lists: int = ANN_LISTS,
+        min_train_size: int = ANN_MIN_TRAIN_SIZE,
+    ):
+        self.nprobe = nprobe
+        self.rerank_factor = rerank_factor
+        self.lists = lists
+        self.min_train_size = min_train_size
+        super().__init__(path, dimension)
+
+    def _new_namespace(self, dimension: int, base: Optional[np.ndarray] = None) -> _IVFNamespace:
+        return _IVFNamespace(dimension, self.nprobe, self.rerank_factor, self.lists, self.min_train_size, base)
+
+    def _namespace(self, namespace: str) -> _IVFNamespace:
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            ns = self._namespaces[namespace] = self._new_namespace(self.dimension)
+        return ns
+
+    def configure(self, nprobe: Optional[int] = None, rerank_factor: Optional[int] = None):
+        """Change the recall/latency trade-off of every namespace."""
+        self.nprobe = nprobe or self.nprobe
+        self.rerank_factor = rerank_factor or self.rerank_factor
+        for namespace, ns in list(self._namespaces.items()):
+            with self._namespace_lock(namespace):
+                ns.nprobe, ns.rerank_factor = self.nprobe, self.rerank_factor
+                ns._view = None
+
+    def count(self, namespace: str) -> int:
+        ns = self._namespaces.get(namespace)
+        return len(ns.id_to_row) if ns else 0
+
+    def train(self, lists: Optional[int] = None, namespaces: Optional[List[str]] = None):
+        """(Re)train the given namespaces (default all), e.g. after the corpus grew a lot."""
+        for namespace in namespaces or list(self._namespaces):
+            with self._namespace_lock(namespace):
+                self._namespaces[namespace].train(lists)
+                self._mark_dirty(namespace)
+
+    # --- persistence ---
+    def _load_namespace(self, namespace: str) -> _IVFNamespace:
+        with open(self.path / f"{namespace}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        base = np.load(self._vectors_file(namespace, meta), mmap_mode="r")
+        ns = self._new_namespace(base.shape[1], base)
+        ns.ids = meta["ids"]
+        ns.influencers = meta["influencers"]
+        ns.texts = meta["texts"]
+        ns.id_to_row = {vector_id: row for row, vector_id in enumerate(ns.ids)}
+        # Saves before generations kept the index next to `<namespace>.npy`
+        index_name = meta.get("index") if "vectors" in meta else f"{namespace}.ivf.npz"
+        index_file = self.path / index_name if index_name else None
+        if index_file is not None and index_file.exists():
+            with np.load(index_file) as saved:
+                if len(saved["assign"]) == ns.size and saved["codes"].shape[1] == ns.words:
+                    ns.restore(saved["centroids"], saved["codes"], saved["assign"], saved["centroid_dot"],
+                               int(saved["trained_rows"]))
+        if ns.centroids is None and len(ns.id_to_row) >= ns.min_train_size:
+            ns.train()
+            self._mark_dirty(namespace)
+        return ns
+
+    def load(self):
+        with self._lock:
+            self._dirty.clear()
+            for meta_file in self.path.glob("*.json"):
+                self._namespaces[meta_file.stem] = self._load_namespace(meta_file.stem)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._save_lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for namespace in self._take_dirty():
+                # Held throughout: the namespace is swapped for the compacted copy written here
+                with self._namespace_lock(namespace):
+                    try:
+                        self._save_namespace(namespace)
+                    except Exception:
+                        self._mark_dirty(namespace)
+                        raise
+
+    def _save_namespace(self, namespace: str):
+        ns = self._namespaces[namespace]
+        if ns.centroids is not None and len(ns.id_to_row) >= RETRAIN_GROWTH * ns.trained_rows:
+            ns.train()
+        live = np.flatnonzero(ns.alive.view)
+        vectors_file = self._generation_file(namespace, ".npy")
+        out = np.lib.format.open_memmap(vectors_file, mode="w+", dtype=np.float32, shape=(len(live), ns.dimension))
+        for start in range(0, len(live), _CHUNK):
+            out[start:start + _CHUNK] = ns.vectors(live[start:start + _CHUNK])
+        out.flush()
+        del out
+        meta = {
+            "vectors": vectors_file.name,
+            "ids": [ns.ids[row] for row in live],
+            "influencers": [ns.influencers[row] for row in live],
+            "texts": [ns.texts[row] for row in live],
+        }
+        if ns.centroids is not None:
+            index_file = self._generation_file(namespace, ".ivf.npz")
+            with open(index_file, "wb") as f:
+                np.savez(f, centroids=ns.centroids, codes=ns.codes.view[live],
+                         assign=ns.assign.view[live], centroid_dot=ns.centroid_dot.view[live],
+                         trained_rows=ns.trained_rows)
+                f.flush()
+                os.fsync(f.fileno())
+            meta["index"] = index_file.name
+        self._commit(namespace, meta)
+        # Continue from the compacted, memory-mapped copy
+        self._namespaces[namespace] = self._load_namespace(namespace)
+
+    def stats(self) -> dict:
+        totals = {}
+        for namespace in list(self._namespaces):
+            with self._namespace_lock(namespace):
+                for key, value in self._namespaces[namespace].stats().items():
+                    totals[key] = totals.get(key, 0) + value
+        return {**totals, "nprobe": self.nprobe, "rerank_factor": self.rerank_factor}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from brand_influencer_matcher_backend.logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="(Re)build the IVF index of the local vector store")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--lists", type=int, default=None, help="Inverted lists per namespace (default about sqrt(vectors))")
+    args = parser.parse_args()
+
+    configure_logging()
+    store = QuantizedVectorStore(LOCAL_VECTOR_STORE_PATH)
+    store.claim()
+    store.train(args.lists)
+    store.save()
+    print(json.dumps(store.stats(), indent=2))
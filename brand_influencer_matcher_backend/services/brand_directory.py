@@ -0,0 +1,130 @@
+import asyncio
+import bisect
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from brand_influencer_matcher_backend.config import BRAND_COLLECTION, BRAND_DIRECTORY_REFRESH_SECONDS
+from brand_influencer_matcher_backend.database import get_collection, normalize_name
+from brand_influencer_matcher_backend.migrations import DUPLICATE_KEY_MARKER
+from brand_influencer_matcher_backend.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class BrandDirectory:
+    """
+    Sorted in-memory snapshot of every brand's `name_key` (with its display
+    name) for listing and prefix search.
+
+    Loaded on first use with a scan covered by the (name_key, brand_name)
+    index, so the brand documents themselves are never read. Brands written
+    by this process are inserted immediately; writes from other workers show
+    up when the snapshot is older than `ttl` seconds, at which point it is
+    reloaded in the background while the current one keeps serving. Keys are
+    unique (the index enforces it at write time), so nothing is deduplicated
+    here.
+    """
+
+    def __init__(self, ttl: float = BRAND_DIRECTORY_REFRESH_SECONDS):
+        self.ttl = ttl
+        self._keys: List[str] = []
+        self._names: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._reloads = SingleFlight("brand-directory")
+        self._background = set()
+        # Brands recorded while a reload is reading the collection; re-applied to its result
+        self._recorded_during_reload: Optional[Dict[str, str]] = None
+        self._metrics = {"reloads": 0, "recorded": 0}
+
+    async def reload(self):
+        keys, names = [], {}
+        self._recorded_during_reload = {}
+        try:
+            # Only indexed fields and no _id: answered from the index alone
+            cursor = get_collection(BRAND_COLLECTION).find({}, {"_id": 0, "name_key": 1, "brand_name": 1}).sort("name_key", 1)
+            async for doc in cursor:
+                key = doc.get("name_key")
+                # Legacy duplicates parked by the name_key migration are not listed
+                if not key or DUPLICATE_KEY_MARKER in key:
+                    continue
+                keys.append(key)
+                names[key] = doc.get("brand_name") or key
+            recorded = self._recorded_during_reload
+        finally:
+            self._recorded_during_reload = None
+        self._keys, self._names = keys, names
+        for key, name in recorded.items():
+            self._insert(key, name)
+        self._loaded_at = time.monotonic()
+        self._metrics["reloads"] += 1
+        logger.debug("Brand directory loaded", extra={"brands": len(keys)})
+
+    async def _ensure_loaded(self):
+        if self._loaded_at is None:
+            await self._reloads.do("reload", self.reload)
+        elif time.monotonic() - self._loaded_at > self.ttl and not self._reloads.in_flight("reload"):
+            task = asyncio.ensure_future(self._reloads.do("reload", self.reload))
+            self._background.add(task)
+            task.add_done_callback(self._reload_done)
+
+    def _reload_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Brand directory reload failed", extra={"error": str(task.exception())})
+
+    def _insert(self, key: str, name: str):
+        if key not in self._names:
+            bisect.insort(self._keys, key)
+        self._names[key] = name
+
+    def record(self, brand_name: str):
+        """A brand this process just wrote (new or updated)."""
+        key = normalize_name(brand_name)
+        self._metrics["recorded"] += 1
+        if self._recorded_during_reload is not None:
+            self._recorded_during_reload[key] = brand_name
+        if self._loaded_at is not None:
+            self._insert(key, brand_name)
+
+    async def page(self, limit: int, after: Optional[str] = None, prefix: str = "") -> Tuple[List[str], Optional[str]]:
+        """
+        Brand names in name_key order.
+
+        Args:
+            limit: Page size
+            after: Cursor returned with the previous page (a name_key); the page starts after it
+            prefix: Only brands whose normalized name starts with it
+
+        Returns:
+            (display names, cursor for the next page or None on the last page)
+        """
+        await self._ensure_loaded()
+        keys = self._keys
+        # Like normalize_name, but a trailing space is part of what was typed
+        prefix = prefix.lstrip().lstrip("@").lstrip().casefold()
+        start = bisect.bisect_left(keys, prefix)
+        if after:
+            start = max(start, bisect.bisect_right(keys, after))
+        window = keys[start:start + limit + 1]
+        if prefix:
+            # Keys sharing the prefix are contiguous; stop at the first that does not
+            end = next((i for i, key in enumerate(window) if not key.startswith(prefix)), len(window))
+            window = window[:end]
+        page = window[:limit]
+        next_cursor = page[-1] if len(window) > limit else None
+        return [self._names[key] for key in page], next_cursor
+
+    def stats(self) -> dict:
+        return {
+            **self._metrics,
+            "brands": len(self._keys),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else -1,
+        }
+
+
+_directory = BrandDirectory()
+
+
+def get_brand_directory() -> BrandDirectory:
+    return _directory
@@ -0,0 +1,69 @@
+import hashlib
+from typing import Dict, List, Optional
+
+from brand_influencer_matcher_backend.config import BRAND_COLLECTION, COHERE_EMBED_MODEL
+from brand_influencer_matcher_backend.database import get_collection
+from brand_influencer_matcher_backend.services.embedding_service import embed_texts
+
+# Brand fields that are matched against influencer namespaces
+BRAND_EMBEDDING_FIELDS = ["type_of_product", "target_group", "positioning", "brand_personality", "vision"]
+
+# Bump when the way brand texts are embedded changes (input_type, preprocessing, ...)
+BRAND_EMBEDDING_VERSION = 1
+BRAND_EMBEDDING_INPUT_TYPE = "classification"
+
+
+def embedding_tag(model: str = COHERE_EMBED_MODEL) -> str:
+    return f"{model}:{BRAND_EMBEDDING_INPUT_TYPE}:v{BRAND_EMBEDDING_VERSION}"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def stored_vectors(brand_doc: dict) -> Dict[str, List[float]]:
+    """Stored field vectors that are still valid for the current text and model."""
+    stored = brand_doc.get("embeddings") or {}
+    if brand_doc.get("embedding_tag") != embedding_tag():
+        return {}
+    return {
+        field: entry["vector"]
+        for field, entry in stored.items()
+        if field in brand_doc and entry.get("text_hash") == text_hash(str(brand_doc[field]))
+    }
+
+
+async def build_brand_embeddings(fields: Dict[str, str], existing: Optional[dict] = None) -> dict:
+    """
+    `$set` payload (`embeddings` + `embedding_tag`) for a brand with the given
+    field texts. Only fields whose text (or the model) changed since `existing`
+    was stored are embedded.
+    """
+    fields = {k: str(v) for k, v in fields.items() if k in BRAND_EMBEDDING_FIELDS and v}
+    reusable = stored_vectors({**(existing or {}), **fields}) if existing else {}
+    missing = [k for k in fields if k not in reusable]
+    vectors = dict(reusable)
+    if missing:
+        embedded = await embed_texts([fields[k] for k in missing], input_type=BRAND_EMBEDDING_INPUT_TYPE)
+        vectors.update(zip(missing, embedded))
+    return {
+        "embeddings": {k: {"vector": list(vectors[k]), "text_hash": text_hash(fields[k])} for k in fields},
+        "embedding_tag": embedding_tag(),
+    }
+
+
+async def get_brand_vectors(brand_doc: dict) -> Dict[str, List[float]]:
+    """
+    Query vectors for a brand document. Served from the stored embeddings; a
+    brand analyzed before they existed (or under another model) is embedded
+    once here and the result is stored on its document.
+    """
+    fields = {k: brand_doc[k] for k in BRAND_EMBEDDING_FIELDS if brand_doc.get(k)}
+    vectors = stored_vectors(brand_doc)
+    if all(k in vectors for k in fields):
+        return {k: vectors[k] for k in fields}
+
+    update = await build_brand_embeddings(fields, brand_doc)
+    # No version bump: the analysis itself did not change
+    await get_collection(BRAND_COLLECTION).update_one({"_id": brand_doc["_id"]}, {"$set": update})
+    return {k: entry["vector"] for k, entry in update["embeddings"].items()}
@@ -1,48 +1,57 @@
-import motor.motor_asyncio
-from agents import Runner
-from brand_influencer_matcher_backend.models.brand import BrandAnalysis, brand_agent
-
-# ------------------------------
-# MongoDB setup
-# ------------------------------
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables from .env file in project root
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
-
-MONGO_URI = os.getenv("MONGODB_URI")
-DB_NAME = os.getenv("DB_NAME", "brand_influencer_db")
-
-if not MONGO_URI:
-    raise ValueError("MONGODB_URI environment variable is not set")
-
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
-try:
-    # Test the connection
-    client.server_info()
-    db = client[DB_NAME]
-    brand_collection = db["brands"]
-except Exception as e:
-    print(f"Error connecting to MongoDB: {str(e)}")
-    raise
-
-# Import the agent and model from models.brand
+from datetime import datetime
+from pymongo import ReturnDocument
+from brand_influencer_matcher_backend.models.brand import BrandAnalysis
+from brand_influencer_matcher_backend.clients import get_brand_agent, run_agent
+from brand_influencer_matcher_backend.services.match_cache import get_version_tracker
+from brand_influencer_matcher_backend.services.brand_embeddings import build_brand_embeddings
+from brand_influencer_matcher_backend.services.brand_directory import get_brand_directory
+from brand_influencer_matcher_backend.services.freshness import FreshnessPolicy, serve_with_freshness
+from brand_influencer_matcher_backend.services.singleflight import brand_runs
+from brand_influencer_matcher_backend.database import get_collection, normalize_name
+from brand_influencer_matcher_backend.config import BRAND_COLLECTION, BRAND_ANALYSIS_TTL_SECONDS
 
 # ------------------------------
 # Function
 # ------------------------------
 async def search_Brand(brand: str):
-    result = await Runner.run(brand_agent, f"วิเคราะห์แบรนด์ {brand}  ตามโครงสร้างที่กำหนด")
+    result = await run_agent(get_brand_agent(), f"วิเคราะห์แบรนด์ {brand}  ตามโครงสร้างที่กำหนด")
     data = result.final_output.model_dump()
 
-    # เก็บลง MongoDB
-    await brand_collection.update_one(
-        {"brand_name": brand},              # filter
-        {"$set": {"brand_name": brand, **data}},  
-        upsert=True                         # ถ้ามีอยู่แล้ว update ถ้าไม่มี insert ใหม่
+    # Embed the match fields now so matching never has to (unchanged fields reuse the stored vectors)
+    name_key = normalize_name(brand)
+    collection = get_collection(BRAND_COLLECTION)
+    existing = await collection.find_one({"name_key": name_key}, {"embeddings": 1, "embedding_tag": 1})
+    embeddings = await build_brand_embeddings(data, existing)
+
+    # เก็บลง MongoDB (version +1 ทุกครั้งที่เขียน เพื่อให้ cache ของผล match หมดอายุ)
+    saved = await collection.find_one_and_update(
+        {"name_key": name_key},             # filter (unique index)
+        {"$set": {"brand_name": brand, "name_key": name_key, **data, **embeddings, "last_updated": datetime.now().isoformat()}, "$inc": {"version": 1}},
+        upsert=True,                        # ถ้ามีอยู่แล้ว update ถ้าไม่มี insert ใหม่
+        return_document=ReturnDocument.AFTER
+    )
+    get_version_tracker().record_brand_version(brand, saved["version"])
+    get_brand_directory().record(brand)
+
+    return data
+
+brand_freshness = FreshnessPolicy(BRAND_ANALYSIS_TTL_SECONDS)
+
+async def get_brand_analysis(brand: str, force_refresh: bool = False, wait_for_refresh: bool = False):
+    """
+    Serve the stored brand analysis while it is fresh; otherwise (or when
+    forced) run search_Brand. Concurrent runs for one brand are coalesced.
+    A stale analysis is served at once and refreshed in the background unless
+    `wait_for_refresh` is set.
+    """
+    stored = await get_collection(BRAND_COLLECTION).find_one({"name_key": normalize_name(brand)})
+    return await serve_with_freshness(
+        stored,
+        brand_freshness,
+        brand_runs,
+        normalize_name(brand),
+        refresh=lambda: search_Brand(brand),
+        extract=lambda doc: {k: doc.get(k, "") for k in BrandAnalysis.model_fields},
+        force_refresh=force_refresh,
+        wait=wait_for_refresh,
     )
-
-    return data
\ No newline at end of file
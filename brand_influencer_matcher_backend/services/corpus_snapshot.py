@@ -0,0 +1,422 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from brand_influencer_matcher_backend.config import (
+    INFLUENCER_COLLECTION, CORPUS_SNAPSHOT_PATH, SNAPSHOT_CATCH_UP_SECONDS, PINECONE_DIMENSION, COHERE_EMBED_MODEL
+)
+from brand_influencer_matcher_backend.database import get_collection, normalize_name
+from brand_influencer_matcher_backend.services.embedding_service import embed_texts
+from brand_influencer_matcher_backend.services.io_pool import run_blocking
+from brand_influencer_matcher_backend.services.match_cache import get_version_tracker
+from brand_influencer_matcher_backend.services.vector_store import (
+    NAMESPACES, VectorMatch, VectorStore, _Namespace, _normalize, get_vector_store, vector_id
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+# Text columns: the influencer name, then one analysis field per namespace
+NAME_COLUMN = "influencer"
+
+
+# ------------------------------
+# Layout
+# ------------------------------
+# <path>/manifest.json            format, rows, dimension, namespaces, watermark
+# <path>/vectors/<namespace>.f32  rows x dimension float32, unit rows (zeros where missing)
+# <path>/present.u8               rows x namespaces, 1 where the vector exists
+# <path>/text/<column>.bin        UTF-8 values back to back
+# <path>/text/<column>.off        rows + 1 int64 offsets into <column>.bin
+#
+# Every file is a plain array that np.memmap maps read-only, so all workers
+# of a host share one copy of the pages.
+
+class _TextColumnWriter:
+    def __init__(self, directory: Path, column: str):
+        self._data = open(directory / f"{column}.bin", "wb")
+        self._offsets = open(directory / f"{column}.off", "wb")
+        self._end = 0
+        self._offsets.write(np.int64(0).tobytes())
+
+    def extend(self, values: List[str]):
+        encoded = [value.encode("utf-8") for value in values]
+        self._data.write(b"".join(encoded))
+        ends = self._end + np.cumsum([len(e) for e in encoded], dtype=np.int64)
+        self._offsets.write(ends.tobytes())
+        if len(ends):
+            self._end = int(ends[-1])
+
+    def close(self):
+        self._data.close()
+        self._offsets.close()
+
+
+def _map(file: Path, dtype, shape) -> np.ndarray:
+    # np.memmap cannot map an empty file
+    if not np.prod(shape):
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(file, dtype=dtype, mode="r", shape=shape)
+
+
+# ------------------------------
+# Export
+# ------------------------------
+async def export_snapshot(
+    path: str = CORPUS_SNAPSHOT_PATH,
+    store: Optional[VectorStore] = None,
+    dimension: int = PINECONE_DIMENSION,
+    batch_size: int = 1000,
+) -> dict:
+    """
+    Write every analyzed influencer (name, analysis fields, the five vectors
+    from `store`) to a snapshot at `path`, replacing any previous one.
+
+    Returns:
+        The manifest written
+    """
+    store = store or get_vector_store()
+    if store is None:
+        raise ValueError("Vector store is not initialized")
+    target = Path(path)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    (tmp / "vectors").mkdir(parents=True)
+    (tmp / "text").mkdir()
+
+    # Anything written from here on is newer than the snapshot and caught up from Mongo
+    watermark = datetime.now().isoformat()
+    vector_files = {ns: open(tmp / "vectors" / f"{ns}.f32", "wb") for ns in NAMESPACES}
+    present_file = open(tmp / "present.u8", "wb")
+    columns = {column: _TextColumnWriter(tmp / "text", column) for column in [NAME_COLUMN, *NAMESPACES]}
+    rows = 0
+    missing = 0
+
+    async def write(docs: List[dict]):
+        nonlocal rows, missing
+        names = [doc["influencer"] for doc in docs]
+
+        def ids(ns: str) -> List[str]:
+            current = {vector_id(name, ns) for name in names}
+            # Raw-name ids of vectors written before ids were keyed by name_key
+            return [*current, *({f"{name}_{ns}" for name in names} - current)]
+
+        fetched = await asyncio.gather(*(run_blocking(store.fetch, ids(ns), ns) for ns in NAMESPACES))
+        present = np.zeros((len(docs), len(NAMESPACES)), dtype=np.uint8)
+        for f, (ns, vectors) in enumerate(zip(NAMESPACES, fetched)):
+            block = np.zeros((len(docs), dimension), dtype=np.float32)
+            for i, name in enumerate(names):
+                vector = vectors.get(vector_id(name, ns))
+                if vector is None:
+                    vector = vectors.get(f"{name}_{ns}")
+                if vector is None:
+                    continue
+                if len(vector) != dimension:
+                    raise ValueError(f"Vector of {name} in {ns} has {len(vector)} dimensions, expected {dimension}")
+                block[i] = _normalize(np.asarray(vector, dtype=np.float32))
+                present[i, f] = 1
+            vector_files[ns].write(block.tobytes())
+        present_file.write(present.tobytes())
+        columns[NAME_COLUMN].extend(names)
+        for ns in NAMESPACES:
+            columns[ns].extend([str((doc.get("analysis") or {}).get(ns) or "") for doc in docs])
+        rows += len(docs)
+        missing += int((present == 0).sum())
+
+    try:
+        batch = []
+        cursor = get_collection(INFLUENCER_COLLECTION).find(
+            {"analysis": {"$exists": True}}, {"_id": 0, "influencer": 1, "analysis": 1}
+        ).sort("name_key", 1)
+        async for doc in cursor:
+            if not doc.get("influencer"):
+                continue
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                await write(batch)
+                batch = []
+        if batch:
+            await write(batch)
+    finally:
+        for f in [*vector_files.values(), present_file]:
+            f.close()
+        for column in columns.values():
+            column.close()
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "created_at": datetime.now().isoformat(),
+        "watermark": watermark,
+        "rows": rows,
+        "dimension": dimension,
+        "namespaces": NAMESPACES,
+        "embed_model": COHERE_EMBED_MODEL,
+        "missing_vectors": missing,
+    }
+    with open(tmp / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap directories; processes still mapping the old files keep reading them
+    old = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+    logger.info("Corpus snapshot exported", extra={"path": str(target), "rows": rows, "missing_vectors": missing})
+    return manifest
+
+
+# ------------------------------
+# Loader
+# ------------------------------
+class CorpusSnapshot:
+    """Read-only, memory-mapped view of an exported snapshot."""
+
+    def __init__(self, path: str = CORPUS_SNAPSHOT_PATH):
+        self.path = Path(path)
+        with open(self.path / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format {self.manifest.get('format')} in {self.path}")
+        self.rows = self.manifest["rows"]
+        self.dimension = self.manifest["dimension"]
+        self.namespaces: List[str] = self.manifest["namespaces"]
+        self.watermark: str = self.manifest["watermark"]
+        self.vectors = {
+            ns: _map(self.path / "vectors" / f"{ns}.f32", np.float32, (self.rows, self.dimension))
+            for ns in self.namespaces
+        }
+        self.present = _map(self.path / "present.u8", np.bool_, (self.rows, len(self.namespaces)))
+        self._text = {
+            column: (_map(self.path / "text" / f"{column}.bin", np.uint8, (os.path.getsize(self.path / "text" / f"{column}.bin"),)),
+                     _map(self.path / "text" / f"{column}.off", np.int64, (self.rows + 1,)))
+            for column in [NAME_COLUMN, *self.namespaces]
+        }
+        self.names = [self.text(NAME_COLUMN, row) for row in range(self.rows)]
+        # name_key -> row (vector ids are keyed by name_key)
+        self.row_of: Dict[str, int] = {normalize_name(name): row for row, name in enumerate(self.names)}
+
+    def text(self, column: str, row: int) -> str:
+        data, offsets = self._text[column]
+        return bytes(data[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def analysis(self, row: int) -> Dict[str, str]:
+        return {ns: self.text(ns, row) for ns in self.namespaces}
+
+
+# ------------------------------
+# Vector store backend
+# ------------------------------
+class SnapshotVectorStore(VectorStore):
+    """
+    Serves matching from a corpus snapshot (VECTOR_STORE_BACKEND=snapshot),
+    with no vector-store round trips.
+
+    Vectors written after the export live in an in-memory overlay: upserts
+    from this process go there directly, and `catch_up` re-embeds the
+    analyses of influencers whose Mongo `last_updated` is at or after the
+    watermark. Overlaid snapshot rows are hidden, so every vector id has one
+    answer. Queries scan the memory-mapped matrix exactly.
+    """
+
+    def __init__(self, path: str = CORPUS_SNAPSHOT_PATH):
+        self.snapshot = CorpusSnapshot(path)
+        self.dimension = self.snapshot.dimension
+        self.watermark = self.snapshot.watermark
+        self._overlay: Dict[str, _Namespace] = {}
+        # Snapshot rows not to serve: vector missing at export, or overlaid / deleted since
+        self._hidden = {
+            ns: ~np.asarray(self.snapshot.present[:, f]) for f, ns in enumerate(self.snapshot.namespaces)
+        }
+        self._lock = threading.RLock()
+        self._metrics = {"catch_ups": 0, "caught_up_vectors": 0}
+
+    def _row(self, vector_id: str, namespace: str) -> Optional[int]:
+        suffix = f"_{namespace}"
+        if not vector_id.endswith(suffix):
+            return None
+        return self.snapshot.row_of.get(vector_id[:-len(suffix)])
+
+    def _hide(self, ids: List[str], namespace: str):
+        hidden = self._hidden.get(namespace)
+        if hidden is None:
+            return
+        rows = [row for row in (self._row(vector_id, namespace) for vector_id in ids) if row is not None]
+        hidden[rows] = True
+
+    def upsert(self, vectors, namespace):
+        with self._lock:
+            overlay = self._overlay.get(namespace)
+            if overlay is None:
+                overlay = self._overlay[namespace] = _Namespace(self.dimension)
+            overlay.upsert(vectors)
+            self._hide([item["id"] for item in vectors], namespace)
+
+    def delete(self, ids, namespace):
+        with self._lock:
+            if namespace in self._overlay:
+                self._overlay[namespace].delete(ids)
+            self._hide(ids, namespace)
+
+    def query(self, vector, top_k, namespace):
+        return self.query_many([vector], top_k, namespace)[0]
+
+    def query_many(self, vectors, top_k, namespace):
+        queries = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1)
+        results = [[] for _ in range(len(queries))]
+        # The mapped matrix never changes: scan it without the lock, so upserts
+        # and other namespaces' queries are not held up
+        matrix = self.snapshot.vectors.get(namespace)
+        scores = queries @ matrix.T if matrix is not None and len(matrix) else None
+        with self._lock:
+            # The hidden rows and the overlay are read together, so each vector id has one answer
+            hidden = self._hidden[namespace].copy() if scores is not None else None
+            overlay = self._overlay.get(namespace)
+            extras = overlay.search_many(queries, top_k) if overlay is not None else None
+        if scores is not None:
+            scores[:, hidden] = -np.inf
+            k = min(top_k, len(matrix))
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for hits, row, candidates in zip(results, scores, top):
+                hits.extend(
+                    VectorMatch(vector_id(self.snapshot.names[i], namespace), float(row[i]), self.snapshot.names[i])
+                    for i in candidates if np.isfinite(row[i])
+                )
+        if extras is not None:
+            for hits, extra in zip(results, extras):
+                hits.extend(extra)
+        return [sorted(hits, key=lambda match: -match.score)[:top_k] for hits in results]
+
+    def fetch(self, ids, namespace):
+        with self._lock:
+            overlay = self._overlay.get(namespace)
+            found = overlay.fetch(ids) if overlay else {}
+            matrix = self.snapshot.vectors.get(namespace)
+            if matrix is None:
+                return found
+            hidden = self._hidden[namespace]
+            rows = [(vector_id, row) for vector_id, row in ((v, self._row(v, namespace)) for v in ids if v not in found)
+                    if row is not None and not hidden[row]]
+            if rows:
+                # Sorted rows read the mapped file in order
+                rows.sort(key=lambda pair: pair[1])
+                gathered = np.asarray(matrix[[row for _, row in rows]])
+                found.update({vector_id: gathered[i] for i, (vector_id, _) in enumerate(rows)})
+            return found
+
+    def count(self, namespace: str) -> int:
+        hidden = self._hidden.get(namespace)
+        overlay = self._overlay.get(namespace)
+        return (int((~hidden).sum()) if hidden is not None else 0) + (overlay.size if overlay else 0)
+
+    def _current_text(self, influencer: str, namespace: str) -> Optional[str]:
+        overlay = self._overlay.get(namespace)
+        overlay_id = vector_id(influencer, namespace)
+        if overlay is not None and overlay_id in overlay.id_to_row:
+            return overlay.texts[overlay.id_to_row[overlay_id]]
+        row = self.snapshot.row_of.get(normalize_name(influencer))
+        if row is None or self._hidden[namespace][row]:
+            return None
+        return self.snapshot.text(namespace, row)
+
+    # --- catch-up ---
+    async def catch_up(self, batch_size: int = 500) -> int:
+        """
+        Re-embed analysis fields changed since the watermark (Mongo
+        `last_updated`) into the overlay; returns the number of vectors written.
+        """
+        since, started = self.watermark, datetime.now().isoformat()
+        changed = []
+        cursor = get_collection(INFLUENCER_COLLECTION).find(
+            {"last_updated": {"$gte": since}, "analysis": {"$exists": True}}, {"_id": 0, "influencer": 1, "analysis": 1}
+        )
+        async for doc in cursor:
+            influencer = doc.get("influencer")
+            for ns in NAMESPACES:
+                text = str((doc.get("analysis") or {}).get(ns) or "")
+                # Refreshes that did not change a field need no new vector
+                if influencer and text and text != self._current_text(influencer, ns):
+                    changed.append((influencer, ns, text))
+        for start in range(0, len(changed), batch_size):
+            chunk = changed[start:start + batch_size]
+            # Same call as the vector writer, so overlay vectors match what it would have written
+            embeddings = await embed_texts([text for _, _, text in chunk])
+            by_namespace: Dict[str, List[dict]] = {}
+            for (influencer, ns, text), embedding in zip(chunk, embeddings):
+                by_namespace.setdefault(ns, []).append({
+                    "id": vector_id(influencer, ns), "values": embedding,
+                    "metadata": {"influencer": influencer, "field": ns, "text": text},
+                })
+            for ns, vectors in by_namespace.items():
+                self.upsert(vectors, ns)
+        self.watermark = started
+        self._metrics["catch_ups"] += 1
+        self._metrics["caught_up_vectors"] += len(changed)
+        if changed:
+            logger.info("Corpus snapshot caught up", extra={"vectors": len(changed), "since": since})
+            # Cached matches were computed without these vectors
+            await get_version_tracker().bump_corpus()
+        return len(changed)
+
+    async def keep_caught_up(self, interval: float = SNAPSHOT_CATCH_UP_SECONDS):
+        """Run `catch_up` every `interval` seconds until cancelled (the caller has just caught up)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.catch_up()
+            except Exception as e:
+                logger.error("Error catching up corpus snapshot", extra={"error": str(e)})
+
+    def stats(self) -> dict:
+        return {
+            **self._metrics,
+            "snapshot_rows": self.snapshot.rows,
+            "overlay_vectors": sum(ns.size for ns in self._overlay.values()),
+            "hidden_rows": sum(int(hidden.sum()) for hidden in self._hidden.values()),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from brand_influencer_matcher_backend.database import database
+    from brand_influencer_matcher_backend.logging_setup import configure_logging
+
+    parser = argparse.ArgumentParser(description="Export or inspect the memory-mapped corpus snapshot")
+    parser.add_argument("command", choices=["export", "info", "match"])
+    parser.add_argument("brand", nargs="?", help="Brand to match (match)")
+    parser.add_argument("--path", default=CORPUS_SNAPSHOT_PATH)
+    args = parser.parse_args()
+    configure_logging()
+
+    async def main():
+        if args.command == "export":
+            # Exporting from a snapshot backend first folds in everything caught up since
+            source = get_vector_store()
+            if isinstance(source, SnapshotVectorStore):
+                await source.catch_up()
+            print(json.dumps(await export_snapshot(args.path, source), indent=2))
+        elif args.command == "info":
+            snapshot = CorpusSnapshot(args.path)
+            print(json.dumps(snapshot.manifest, indent=2))
+        else:
+            # Offline matching: vectors from the snapshot (+ catch-up), brands from Mongo
+            from brand_influencer_matcher_backend.services import vector_store
+            from brand_influencer_matcher_backend.services.match_service import rank_top3_influencers_by_brand
+            store = vector_store._store = SnapshotVectorStore(args.path)
+            await store.catch_up()
+            print(await rank_top3_influencers_by_brand(args.brand))
+        database.close()
+
+    asyncio.run(main())
@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from brand_influencer_matcher_backend.config import (
+    COHERE_EMBED_MODEL, EMBED_CACHE_ENABLED, EMBED_CACHE_PATH, EMBED_CACHE_MAX_BYTES
+)
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]  # (model, input_type, sha256(text))
+
+
+def cache_key(text: str, input_type: str, model: str = COHERE_EMBED_MODEL) -> CacheKey:
+    return (model, input_type, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed embedding cache.
+
+    - Memory: LRU of float32 vectors bounded by `max_bytes`.
+    - Disk: SQLite table that survives restarts (`path=None` keeps it memory-only).
+
+    Memory lookups never touch SQLite, so they are safe on the event loop;
+    disk reads and writes block and belong in a worker thread.
+    """
+
+    def __init__(self, path: Optional[str] = EMBED_CACHE_PATH, max_bytes: int = EMBED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        # Memory tier only; the SQLite connection has its own lock, so a disk
+        # write in a worker thread never holds up a memory lookup
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._metrics = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+        self._db = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, input_type TEXT NOT NULL, text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL, PRIMARY KEY (model, input_type, text_hash))"
+            )
+            self._db.commit()
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    # ------------------------------
+    # Memory tier
+    # ------------------------------
+    def _remember(self, key: CacheKey, vector: np.ndarray):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._memory[key] = vector
+        self._bytes += vector.nbytes
+        while self._bytes > self.max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._metrics["evictions"] += 1
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def get_memory(self, texts: List[str], input_type: str = "classification",
+                   model: str = COHERE_EMBED_MODEL) -> List[Optional[List[float]]]:
+        """Memory-tier lookup (None where not cached); never blocks on disk."""
+        found = []
+        with self._lock:
+            for text in texts:
+                key = cache_key(text, input_type, model)
+                vector = self._memory.get(key)
+                if vector is None:
+                    found.append(None)
+                    continue
+                self._memory.move_to_end(key)
+                self._metrics["memory_hits"] += 1
+                found.append(vector.tolist())
+        return found
+
+    def get_disk(self, texts: List[str], input_type: str = "classification",
+                 model: str = COHERE_EMBED_MODEL) -> List[Optional[List[float]]]:
+        """
+        Disk-tier lookup for memory misses, one query per 500 texts; hits are
+        promoted to memory. Blocking: call it through run_blocking.
+        """
+        keys = [cache_key(text, input_type, model) for text in texts]
+        rows = {}
+        if self._db is not None and keys:
+            hashes = list(dict.fromkeys(key[2] for key in keys))
+            with self._db_lock:
+                for start in range(0, len(hashes), 500):
+                    chunk = hashes[start:start + 500]
+                    rows.update(self._db.execute(
+                        "SELECT text_hash, vector FROM embeddings WHERE model = ? AND input_type = ?"
+                        f" AND text_hash IN ({', '.join('?' * len(chunk))})",
+                        (model, input_type, *chunk),
+                    ).fetchall())
+        found = []
+        with self._lock:
+            for key in keys:
+                blob = rows.get(key[2])
+                if blob is None:
+                    self._metrics["misses"] += 1
+                    found.append(None)
+                    continue
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self._remember(key, vector)
+                self._metrics["disk_hits"] += 1
+                found.append(vector.tolist())
+        return found
+
+    def get(self, text: str, input_type: str = "classification", model: str = COHERE_EMBED_MODEL) -> Optional[List[float]]:
+        """Both tiers for one text (blocking when the disk tier is consulted)."""
+        cached = self.get_memory([text], input_type, model)[0]
+        return cached if cached is not None else self.get_disk([text], input_type, model)[0]
+
+    def put_many(self, texts: List[str], vectors: List[List[float]], input_type: str = "classification",
+                 model: str = COHERE_EMBED_MODEL):
+        rows = []
+        with self._lock:
+            for text, values in zip(texts, vectors):
+                key = cache_key(text, input_type, model)
+                vector = np.asarray(values, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((*key, vector.tobytes()))
+            self._metrics["writes"] += len(rows)
+        if self._db is not None and rows:
+            with self._db_lock:
+                self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+                self._db.commit()
+
+    def put(self, text: str, vector: List[float], input_type: str = "classification", model: str = COHERE_EMBED_MODEL):
+        self.put_many([text], [vector], input_type, model)
+
+    def stats(self) -> dict:
+        hits = self._metrics["memory_hits"] + self._metrics["disk_hits"]
+        lookups = hits + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._bytes,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# ------------------------------
+# Shared instance
+# ------------------------------
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the shared cache, or None when EMBED_CACHE_ENABLED is off."""
+    global _cache
+    if _cache is None and EMBED_CACHE_ENABLED:
+        _cache = EmbeddingCache()
+    return _cache
+
+
+async def warm_from_mongo(db) -> int:
+    """
+    Embed every brand field and influencer analysis field stored in Mongo that
+    is not cached yet. Returns the number of texts looked up.
+    """
+    from brand_influencer_matcher_backend.config import BRAND_COLLECTION, INFLUENCER_COLLECTION
+    from brand_influencer_matcher_backend.services.embedding_service import embed_texts
+
+    brand_fields = ["type_of_product", "target_group", "positioning", "brand_personality", "vision"]
+    texts = []
+    async for doc in db[BRAND_COLLECTION].find({}, {field: 1 for field in brand_fields}):
+        texts.extend(doc[field] for field in brand_fields if doc.get(field))
+    async for doc in db[INFLUENCER_COLLECTION].find({}, {"analysis": 1}):
+        texts.extend(value for value in (doc.get("analysis") or {}).values() if value)
+
+    # The embedding service serves cached texts directly and batches the rest
+    texts = list(dict.fromkeys(texts))
+    await embed_texts(texts)
+    cache = get_embedding_cache()
+    logger.info("Embedding cache warmed", extra={"texts": len(texts), **(cache.stats() if cache else {})})
+    return len(texts)
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "warm":
+        print("Usage: python -m brand_influencer_matcher_backend.services.embedding_cache warm")
+        sys.exit(1)
+
+    from brand_influencer_matcher_backend.database import get_db
+    from brand_influencer_matcher_backend.logging_setup import configure_logging
+    configure_logging()
+    asyncio.run(warm_from_mongo(get_db()))
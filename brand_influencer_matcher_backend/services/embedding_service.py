@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from brand_influencer_matcher_backend.config import EMBED_MAX_BATCH_SIZE, EMBED_BATCH_WINDOW_MS
+from brand_influencer_matcher_backend.services.embedding_cache import EmbeddingCache, get_embedding_cache
+from brand_influencer_matcher_backend.services.io_pool import run_blocking
+from brand_influencer_matcher_backend.metrics import span
+
+
+class EmbeddingBatcher:
+    """
+    Collects texts from every in-flight request for a short window (or until
+    `max_batch_size` texts are pending) and sends them as one embed call.
+
+    Each caller awaits its own future, so `await batcher.embed(text)` behaves
+    like a per-text call while the provider only sees batches. Texts found in
+    the embedding cache are answered without joining a batch.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[List[str], str], List[List[float]]]] = None,
+        max_batch_size: int = EMBED_MAX_BATCH_SIZE,
+        max_wait_ms: float = EMBED_BATCH_WINDOW_MS,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        self._embed_fn = embed_fn
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # input_type -> [(text, future)]
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = defaultdict(list)
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks = set()
+        self._metrics = {
+            "texts": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_batch_size": 0,
+            "provider_seconds": 0.0,
+        }
+        self._started = time.monotonic()
+
+    def _get_embed_fn(self):
+        if self._embed_fn is None:
+            from brand_influencer_matcher_backend.models.influencer import get_embeddings
+            self._embed_fn = get_embeddings
+        return self._embed_fn
+
+    async def embed(self, text: str, input_type: str = "classification") -> List[float]:
+        """Embed one text; the call is merged with whatever else is pending."""
+        return (await self.embed_many([text], input_type))[0]
+
+    async def embed_many(self, texts: List[str], input_type: str = "classification") -> List[List[float]]:
+        """Embed several texts; they join the same batch window as other callers."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing = list(range(len(texts)))
+        if self.cache is not None and texts:
+            results = self.cache.get_memory(texts, input_type)
+            missing = [i for i, cached in enumerate(results) if cached is None]
+            if missing:
+                # The disk tier is SQLite: one query for every memory miss, off the event loop
+                lookup = [texts[i] for i in missing]
+                if self.cache.persistent:
+                    from_disk = await run_blocking(self.cache.get_disk, lookup, input_type)
+                else:
+                    from_disk = self.cache.get_disk(lookup, input_type)
+                for i, cached in zip(missing, from_disk):
+                    results[i] = cached
+                missing = [i for i in missing if results[i] is None]
+        if missing:
+            embedded = await asyncio.gather(*(self._enqueue(texts[i], input_type) for i in missing))
+            for i, vector in zip(missing, embedded):
+                results[i] = vector
+        return results
+
+    async def _enqueue(self, text: str, input_type: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending[input_type]
+        pending.append((text, future))
+        self._metrics["texts"] += 1
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(input_type)
+        elif input_type not in self._timers:
+            self._timers[input_type] = loop.call_later(self.max_wait, self._flush, input_type)
+        return await future
+
+    def _flush(self, input_type: str):
+        timer = self._timers.pop(input_type, None)
+        if timer:
+            timer.cancel()
+        pending = self._pending.pop(input_type, [])
+        for start in range(0, len(pending), self.max_batch_size):
+            task = asyncio.ensure_future(self._run_batch(pending[start:start + self.max_batch_size], input_type))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _embed_and_cache(self, texts: List[str], input_type: str) -> List[List[float]]:
+        with span("embed", input_type):
+            vectors = self._get_embed_fn()(texts, input_type)
+        if self.cache is not None:
+            self.cache.put_many(texts, vectors, input_type)
+        return vectors
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]], input_type: str):
+        # Identical texts within a window are embedded once
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        started = time.perf_counter()
+        try:
+            vectors = await run_blocking(self._embed_and_cache, unique_texts, input_type)
+        except Exception as e:
+            self._metrics["errors"] += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._metrics["provider_seconds"] += time.perf_counter() - started
+
+        self._metrics["batches"] += 1
+        self._metrics["max_batch_size"] = max(self._metrics["max_batch_size"], len(unique_texts))
+        by_text = dict(zip(unique_texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def stats(self) -> dict:
+        """Throughput metrics since the batcher was created."""
+        batches = self._metrics["batches"]
+        elapsed = time.monotonic() - self._started
+        return {
+            **self._metrics,
+            "avg_batch_size": round(self._metrics["texts"] / batches, 2) if batches else 0.0,
+            "texts_per_second": round(self._metrics["texts"] / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+# ------------------------------
+# Shared instance
+# ------------------------------
+_batcher: Optional[EmbeddingBatcher] = None
+
+
+def get_embedding_service() -> EmbeddingBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = EmbeddingBatcher(cache=get_embedding_cache())
+    return _batcher
+
+
+async def embed_text(text: str, input_type: str = "classification") -> List[float]:
+    return await get_embedding_service().embed(text, input_type)
+
+
+async def embed_texts(texts: List[str], input_type: str = "classification") -> List[List[float]]:
+    return await get_embedding_service().embed_many(texts, input_type)
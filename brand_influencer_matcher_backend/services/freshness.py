@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from brand_influencer_matcher_backend.config import BACKGROUND_REFRESH_CONCURRENCY
+from brand_influencer_matcher_backend.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Background refreshes in progress (kept referenced so they are not garbage collected);
+# at most BACKGROUND_REFRESH_CONCURRENCY, further stale reads are served without one
+_background = set()
+_metrics = {"background_started": 0, "background_skipped": 0}
+
+
+class FreshnessPolicy:
+    """Stored analyses younger than `ttl_seconds` are served as-is."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl = timedelta(seconds=ttl_seconds)
+
+    def is_fresh(self, last_updated: Optional[str]) -> bool:
+        # Undated documents predate `last_updated`; they count as fresh until the migration dates them
+        if not last_updated:
+            return True
+        try:
+            return datetime.now() - datetime.fromisoformat(last_updated) < self.ttl
+        except (TypeError, ValueError):
+            return False
+
+
+async def serve_with_freshness(
+    stored: Optional[dict],
+    policy: FreshnessPolicy,
+    flight: SingleFlight,
+    key: str,
+    refresh: Callable[[], Awaitable[Any]],
+    extract: Callable[[dict], Any],
+    force_refresh: bool = False,
+    wait: bool = False,
+) -> Any:
+    """
+    Stale-while-revalidate over a stored analysis document.
+
+    - nothing stored or `force_refresh`: run `refresh` and wait for it
+    - fresh: return `extract(stored)`
+    - stale: return `extract(stored)` and refresh in the background, or
+      with `wait` (job workers, which must hold their slot for the run)
+      run `refresh` and wait for it
+
+    Refreshes go through `flight`, so they coalesce with in-flight runs. A
+    forced refresh only coalesces with other forced ones: joining a regular
+    run could return without redoing the analysis.
+    """
+    if force_refresh:
+        return await flight.do(f"{key}:force", refresh)
+    if stored is None:
+        return await flight.do(key, refresh)
+
+    stale = not policy.is_fresh(stored.get("last_updated"))
+    if stale and wait:
+        return await flight.do(key, refresh)
+    if stale and not flight.in_flight(key):
+        if len(_background) < BACKGROUND_REFRESH_CONCURRENCY:
+            task = asyncio.ensure_future(flight.do(key, refresh))
+            _background.add(task)
+            task.add_done_callback(_background_done)
+            _metrics["background_started"] += 1
+        else:
+            _metrics["background_skipped"] += 1
+    return extract(stored)
+
+
+def _background_done(task: asyncio.Task):
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background refresh failed", extra={"error": str(task.exception())})
+
+
+def background_stats() -> dict:
+    return {**_metrics, "running": len(_background)}
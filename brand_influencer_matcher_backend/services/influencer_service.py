@@ -1,12 +1,20 @@
 import asyncio
+import hashlib
 import json
 from datetime import datetime
 from collections import defaultdict
 
 # Import from models
-from brand_influencer_matcher_backend.models.influencer import (
-    client_openai, co, index, collection,
-    InfluencerAnalysis, get_embedding
+from brand_influencer_matcher_backend.models.influencer import InfluencerAnalysis
+from brand_influencer_matcher_backend.clients import get_openai_client, get_web_search_agent, run_agent
+from brand_influencer_matcher_backend.database import get_collection, normalize_name
+from brand_influencer_matcher_backend.metrics import span
+from brand_influencer_matcher_backend.services.vector_writer import get_vector_writer
+from brand_influencer_matcher_backend.services.freshness import FreshnessPolicy, serve_with_freshness
+from brand_influencer_matcher_backend.services.singleflight import influencer_runs
+from brand_influencer_matcher_backend.services.match_context import stored_videos
+from brand_influencer_matcher_backend.config import (
+    INFLUENCER_COLLECTION, INFLUENCER_ANALYSIS_TTL_SECONDS, INFLUENCER_SEARCH_TTL_SECONDS
 )
 
 # -----------------------------
@@ -14,39 +22,31 @@ from brand_influencer_matcher_backend.models.influencer import (
 # -----------------------------
 from brand_influencer_matcher_backend.process_tiktok import process_tiktok_user
 
-async def process_tiktok_user_async(username, limit=2):
+async def process_tiktok_user_async(username, limit=2, known_videos=None):
     # Directly await the async function
-    return await process_tiktok_user(username, limit)
+    return await process_tiktok_user(username, limit, known_videos)
 
 # -----------------------------
 # Web search
 # -----------------------------
-from agents import Agent, Runner, WebSearchTool
-
-agent = Agent(name="Assistant", tools=[WebSearchTool()])
-
 async def search_influ(influ: str):
-    result = await Runner.run(agent, f"tiktok {influ} คือ ใคร ข้อมูลว่าคนติดตามเป็นกลุ่มไหน ทำ content อะไร")
+    result = await run_agent(get_web_search_agent(), f"tiktok {influ} คือ ใคร ข้อมูลว่าคนติดตามเป็นกลุ่มไหน ทำ content อะไร")
     return result.final_output
 
 # -----------------------------
-# Main pipeline
+# LLM analysis
 # -----------------------------
-async def search_influ_analysis(influ: str):
-    # 1) Search online
-    search_result = await search_influ(influ)
+INFLUENCER_ANALYSIS_MODEL = "gpt-4o-mini"
 
-    # 2) Process TikTok videos
-    tiktok_result = await process_tiktok_user_async(influ, 2)
-    
-    # Convert TikTok result to string if it's not already
-    tiktok_result_str = str(tiktok_result) if tiktok_result else "No TikTok data available"
+# Bump whenever the analysis prompt below changes (stored analyses are then redone on refresh)
+INFLUENCER_PROMPT_VERSION = 1
 
-    # 3) Analyze with LLM
-    llm_response = await client_openai.responses.parse(
-        model="gpt-4o-mini",
-        text_format=InfluencerAnalysis,
-        input=f"""
+async def analyze_influ(influ: str, search_result, tiktok_result_str: str) -> dict:
+    with span("llm", "influencer_analysis"):
+        llm_response = await get_openai_client().responses.parse(
+            model=INFLUENCER_ANALYSIS_MODEL,
+            text_format=InfluencerAnalysis,
+            input=f"""
 วิเคราะห์ TikTok {influ} ตามโครงสร้างที่กำหนด
 
 ผลจากการสืบค้นจากเน็ต:
@@ -55,7 +55,7 @@ async def search_influ_analysis(influ: str):
 ผลการวิเคราะห์ตัวอย่างคลิปในช่อง:
 {tiktok_result_str}
 """
-    )
+        )
 
     # Convert to dict
     if isinstance(llm_response.output_text, str):
@@ -66,36 +66,133 @@ async def search_influ_analysis(influ: str):
             analysis = {k: getattr(llm_response.output_parsed, k, "") for k in InfluencerAnalysis.__fields__}
     else:
         analysis = llm_response.output_text
+    return analysis
 
-    # 4) Save to MongoDB
+def influencer_input_hash(search_result, videos: list) -> str:
+    """
+    Hash of everything an analysis is computed from. When a refresh arrives at
+    the stored hash, re-running the LLM would only reword the same analysis.
+    """
+    payload = {
+        "model": INFLUENCER_ANALYSIS_MODEL,
+        "prompt_version": INFLUENCER_PROMPT_VERSION,
+        "search_result": str(search_result),
+        "videos": [[vid.get("video_id"), vid.get("caption"), vid.get("summary")] for vid in videos],
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def build_influencer_doc(influ: str, search_result, tiktok_result_str: str, analysis: dict, videos=None, searched_at=None) -> dict:
+    """
+    Influencer document `$set` payload. With `videos` (the summarized videos
+    the analysis saw), they are stored by video_id together with the input
+    hash, so the next refresh only summarizes new videos and can skip the analysis.
+    """
+    now = datetime.now().isoformat()
     doc = {
         "influencer": influ,
+        "name_key": normalize_name(influ),
         "search_result": search_result,
+        "searched_at": searched_at or now,
         "tiktok_result": tiktok_result_str,
         "analysis": analysis,
-        "last_updated": datetime.now().isoformat()
+        "last_updated": now
     }
+    if videos is not None:
+        doc["videos"] = videos
+        doc["input_hash"] = influencer_input_hash(search_result, videos)
+    return doc
+
+# -----------------------------
+# Main pipeline
+# -----------------------------
+search_freshness = FreshnessPolicy(INFLUENCER_SEARCH_TTL_SECONDS)
+
+_metrics = {"refreshes": 0, "searches_reused": 0, "unchanged": 0, "vectors_resubmitted": 0}
+
+async def search_influ_analysis(influ: str, force: bool = False):
+    """
+    (Re-)analyze an influencer incrementally: only TikTok videos not stored
+    before are summarized, the stored web search is reused while fresh, and
+    when the inputs hash to the stored value the analysis and the document
+    version are kept (vectors missing from the store are queued again).
+    `force` re-runs the search and the analysis.
+    """
+    collection = get_collection(INFLUENCER_COLLECTION)
+    name_key = normalize_name(influ)
+    stored = await collection.find_one(
+        {"name_key": name_key},
+        {"analysis": 1, "search_result": 1, "searched_at": 1, "last_updated": 1, "input_hash": 1, "videos": 1, "tiktok_result": 1}
+    ) or {}
+    _metrics["refreshes"] += 1
+
+    # 1) Process TikTok videos (stored summaries are reused by video_id)
+    known_videos = {vid["video_id"]: vid for vid in stored_videos(stored) if vid.get("video_id")}
+    tiktok_result = await process_tiktok_user_async(influ, 2, known_videos)
+    videos = tiktok_result.get("videos", []) if tiktok_result else []
+
+    # Convert TikTok result to string if it's not already
+    tiktok_result_str = str(tiktok_result) if tiktok_result else "No TikTok data available"
+
+    # 2) Search online (documents from before `searched_at` count from their last update)
+    searched_at = stored.get("searched_at") or stored.get("last_updated")
+    if not force and stored.get("search_result") and search_freshness.is_fresh(searched_at):
+        search_result = stored["search_result"]
+        _metrics["searches_reused"] += 1
+    else:
+        search_result, searched_at = await search_influ(influ), None
+
+    # 3) Same inputs as the stored analysis: only mark the document as checked
+    if not force and stored.get("analysis") and stored.get("input_hash") == influencer_input_hash(search_result, videos):
+        _metrics["unchanged"] += 1
+        await collection.update_one({"name_key": name_key}, {"$set": {"last_updated": datetime.now().isoformat()}})
+        # The hash is stored before the background vector write runs; if that write
+        # was dropped, queue the vectors that never made it into the store
+        writer = get_vector_writer()
+        missing = await writer.missing_fields(influ, stored["analysis"])
+        if missing:
+            _metrics["vectors_resubmitted"] += 1
+            await writer.submit_analysis(influ, {field: stored["analysis"][field] for field in missing})
+        return stored["analysis"]
+
+    # 4) Analyze with LLM
+    analysis = await analyze_influ(influ, search_result, tiktok_result_str)
+
+    # 5) Save to MongoDB
+    doc = build_influencer_doc(influ, search_result, tiktok_result_str, analysis, videos=videos, searched_at=searched_at)
     await collection.update_one(
-        {"influencer": influ},
-        {"$set": doc},
+        {"name_key": doc["name_key"]},
+        # version +1 ทุกครั้งที่เขียน เพื่อให้ผล analyze-match ที่เก็บไว้หมดอายุ
+        {"$set": doc, "$inc": {"version": 1}},
         upsert=True
     )
 
-    # 5) Upsert embeddings to Pinecone
-    if index:
-        for key, value in analysis.items():
-            vector_id = f"{influ}_{key}"
-            # Delete old
-            index.delete(ids=[vector_id], namespace=key)
-            # Create embedding
-            embedding = get_embedding(value)
-            index.upsert(
-                vectors=[{
-                    "id": vector_id,
-                    "values": embedding,
-                    "metadata": {"influencer": influ, "field": key, "text": value}
-                }],
-                namespace=key
-            )
+    # 6) Queue embeddings for the vector store (batched, written off the request path)
+    await get_vector_writer().submit_analysis(influ, analysis)
 
     return analysis
+
+def refresh_stats() -> dict:
+    return dict(_metrics)
+
+influencer_freshness = FreshnessPolicy(INFLUENCER_ANALYSIS_TTL_SECONDS)
+
+async def get_influ_analysis(influ: str, force_refresh: bool = False, wait_for_refresh: bool = False):
+    """
+    Serve the stored influencer analysis while it is fresh; otherwise (or when
+    forced) run search_influ_analysis. Concurrent runs for one influencer are coalesced.
+    A stale analysis is served at once and refreshed in the background unless
+    `wait_for_refresh` is set.
+    """
+    stored = await get_collection(INFLUENCER_COLLECTION).find_one({"name_key": normalize_name(influ)}, {"analysis": 1, "last_updated": 1})
+    if stored is not None and not stored.get("analysis"):
+        stored = None
+    return await serve_with_freshness(
+        stored,
+        influencer_freshness,
+        influencer_runs,
+        normalize_name(influ),
+        refresh=lambda: search_influ_analysis(influ, force=force_refresh),
+        extract=lambda doc: doc["analysis"],
+        force_refresh=force_refresh,
+        wait=wait_for_refresh,
+    )
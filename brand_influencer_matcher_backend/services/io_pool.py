@@ -0,0 +1,69 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from brand_influencer_matcher_backend.config import IO_THREAD_POOL_SIZE
+
+T = TypeVar("T")
+
+
+class BlockingIOPool:
+    """
+    Dedicated, bounded thread pool for the synchronous SDK calls (Cohere
+    embed, Pinecone query/fetch/upsert, local index math) made from async
+    code, so they never run on the event loop.
+
+    Kept apart from the loop's default executor: a burst of slow provider
+    calls queues here instead of starving `asyncio.to_thread` users, and the
+    pool size caps how many provider requests are in flight per worker.
+    """
+
+    def __init__(self, max_workers: int = IO_THREAD_POOL_SIZE):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._metrics = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blocking-io")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run `fn(*args, **kwargs)` in the pool and await its result."""
+        with self._lock:
+            self._metrics["calls"] += 1
+            self._metrics["in_flight"] += 1
+            self._metrics["max_in_flight"] = max(self._metrics["max_in_flight"], self._metrics["in_flight"])
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._metrics["in_flight"] -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        # in_flight counts calls waiting for a thread as well as running ones
+        return {**self._metrics, "max_workers": self.max_workers}
+
+
+# ------------------------------
+# Shared instance
+# ------------------------------
+_pool = BlockingIOPool()
+
+
+def get_io_pool() -> BlockingIOPool:
+    return _pool
+
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    return await _pool.run(fn, *args, **kwargs)
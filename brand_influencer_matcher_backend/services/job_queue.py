@@ -0,0 +1,347 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from brand_influencer_matcher_backend.config import (
+    JOB_COLLECTION, JOB_CONCURRENCY, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_SECONDS,
+    JOB_LEASE_SECONDS, JOB_POLL_SECONDS, JOB_RETENTION_SECONDS
+)
+from brand_influencer_matcher_backend.database import get_collection, normalize_name
+from brand_influencer_matcher_backend.services.brand_service import get_brand_analysis
+from brand_influencer_matcher_backend.services.influencer_service import get_influ_analysis
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# kind -> analysis run for a job; results are the same dicts the synchronous endpoints return.
+# A stale analysis is refreshed inside the job (not in the background), so the
+# refresh counts against the worker's slot, lease and retries.
+HANDLERS: Dict[str, Callable[[dict], Awaitable[dict]]] = {
+    "influencer": lambda job: get_influ_analysis(job["name"], job["force_refresh"], wait_for_refresh=True),
+    "brand": lambda job: get_brand_analysis(job["name"], job["force_refresh"], wait_for_refresh=True),
+}
+
+# Fields returned by the API (the rest is queue bookkeeping)
+PUBLIC_FIELDS = [
+    "kind", "name", "status", "priority", "force_refresh", "attempts",
+    "created_at", "started_at", "finished_at", "result", "error",
+]
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def public_job(doc: dict) -> dict:
+    return {"job_id": doc["_id"], **{field: doc.get(field) for field in PUBLIC_FIELDS}}
+
+
+class JobQueue:
+    """
+    Analysis jobs persisted in Mongo, run by an in-process worker pool.
+
+    Every process runs `concurrency` workers that claim the highest-priority,
+    oldest runnable job with one find_one_and_update, so jobs submitted to any
+    worker process are shared out and survive restarts. A claimed job holds a
+    lease that its worker renews while it runs; when the worker dies the lease
+    lapses and the job is queued again. Failed runs are retried with
+    exponential backoff up to `max_attempts`.
+
+    While a job is queued or running it carries `active: true`; a unique
+    partial index on `dedupe_key` makes a second submission for the same
+    kind and name return the existing job instead.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = JOB_CONCURRENCY,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_base: float = JOB_RETRY_BASE_SECONDS,
+        lease: float = JOB_LEASE_SECONDS,
+        poll_interval: float = JOB_POLL_SECONDS,
+        retention: float = JOB_RETENTION_SECONDS,
+    ):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lease = timedelta(seconds=lease)
+        self.poll_interval = poll_interval
+        self.retention = timedelta(seconds=retention)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._workers: List[asyncio.Task] = []
+        self._reaper: Optional[asyncio.Task] = None
+        # Set when this process queues a job, so idle workers claim it without waiting for the poll
+        self._wakeup = asyncio.Event()
+        # Replaced on every status change made by this process; watchers wait on the current one
+        self._changed = asyncio.Event()
+        self._running = 0
+        self._metrics = {"submitted": 0, "deduplicated": 0, "succeeded": 0, "failed": 0, "retried": 0, "requeued": 0}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.started:
+            return
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._reaper = asyncio.create_task(self._requeue_expired_forever())
+
+    async def stop(self):
+        """Cancel the workers; jobs they were running go back to the queue."""
+        tasks = [*self._workers, *([self._reaper] if self._reaper else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers, self._reaper = [], None
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    # ------------------------------
+    # Submit / read
+    # ------------------------------
+    async def submit(self, kind: str, name: str, force_refresh: bool = False, priority: int = 0) -> Tuple[dict, bool]:
+        """
+        Queue an analysis, or join the queued/running job for the same name.
+
+        Args:
+            kind: "influencer" or "brand"
+            name: Influencer or brand name
+            force_refresh: Re-run the analysis even if the stored one is fresh
+            priority: Higher runs first; joining a queued job raises its priority to this
+
+        Returns:
+            (job document, whether an existing job was returned)
+        """
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        key = normalize_name(name)
+        if not key:
+            raise ValueError("Name is empty")
+        jobs = get_collection(JOB_COLLECTION)
+        dedupe_key = f"{kind}:{key}"
+        now = _now().isoformat()
+        doc = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "name": name,
+            "dedupe_key": dedupe_key,
+            "active": True,
+            "status": QUEUED,
+            "priority": priority,
+            "force_refresh": force_refresh,
+            "attempts": 0,
+            "run_after": now,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        while True:
+            existing = await jobs.find_one_and_update(
+                {"dedupe_key": dedupe_key, "active": True},
+                {"$max": {"priority": priority}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if existing is not None:
+                self._metrics["deduplicated"] += 1
+                return existing, True
+            try:
+                await jobs.insert_one(doc)
+                break
+            except DuplicateKeyError:
+                # Another process queued the same name between our two commands
+                continue
+        self._metrics["submitted"] += 1
+        self._wakeup.set()
+        self._notify()
+        logger.info("Job queued", extra={"job_id": doc["_id"], "kind": kind, "job_name": name, "priority": priority})
+        return doc, False
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await get_collection(JOB_COLLECTION).find_one({"_id": job_id})
+
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """
+        Yield the job whenever its status or attempt changes, ending after it finishes.
+
+        Changes made by this process are seen at once; changes made by other
+        processes on the next poll.
+        """
+        last = None
+        while True:
+            changed = self._changed
+            job = await self.get(job_id)
+            if job is None:
+                return
+            seen = (job["status"], job["attempts"])
+            if seen != last:
+                last = seen
+                yield job
+            if job["status"] in FINISHED:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # ------------------------------
+    # Workers
+    # ------------------------------
+    async def _claim(self) -> Optional[dict]:
+        now = _now()
+        return await get_collection(JOB_COLLECTION).find_one_and_update(
+            {"status": QUEUED, "run_after": {"$lte": now.isoformat()}},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "started_at": now.isoformat(),
+                    "lease_until": (now + self.lease).isoformat(),
+                    "worker": self.worker_id,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", -1), ("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _work(self):
+        while True:
+            # Cleared before claiming, so a job queued meanwhile sets it again
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error("Error claiming job", extra={"error": str(e)})
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Bookkeeping failed (e.g. Mongo unreachable); the lease lapses and the job is queued again
+                logger.exception("Error running job", extra={"job_id": job["_id"], "error": str(e)})
+
+    async def _run(self, job: dict):
+        jobs = get_collection(JOB_COLLECTION)
+        # The attempt number identifies this claim: if the lease lapsed and another
+        # worker took the job over, our late updates match nothing
+        mine = {"_id": job["_id"], "attempts": job["attempts"]}
+        self._running += 1
+        self._notify()
+        renewer = asyncio.create_task(self._renew_lease(mine))
+        try:
+            result = await HANDLERS[job["kind"]](job)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without using up an attempt
+            await asyncio.shield(jobs.update_one(
+                mine, {"$set": {"status": QUEUED, "run_after": _now().isoformat()}, "$inc": {"attempts": -1}}
+            ))
+            self._metrics["requeued"] += 1
+            raise
+        except Exception as e:
+            await self._failed(job, mine, e)
+        else:
+            await jobs.update_one(mine, {"$set": self._finish(SUCCEEDED, result=result, error=None)})
+            self._metrics["succeeded"] += 1
+            logger.info("Job succeeded", extra={"job_id": job["_id"], "kind": job["kind"], "job_name": job["name"]})
+        finally:
+            renewer.cancel()
+            self._running -= 1
+            self._notify()
+
+    def _finish(self, status: str, **fields) -> dict:
+        now = datetime.now(timezone.utc)
+        return {
+            "status": status,
+            "active": False,
+            "finished_at": _now().isoformat(),
+            # BSON date for the TTL index
+            "expire_at": now + self.retention,
+            **fields,
+        }
+
+    async def _failed(self, job: dict, mine: dict, error: Exception):
+        jobs = get_collection(JOB_COLLECTION)
+        if job["attempts"] < self.max_attempts:
+            delay = self.retry_base * 2 ** (job["attempts"] - 1)
+            await jobs.update_one(mine, {"$set": {
+                "status": QUEUED,
+                "run_after": (_now() + timedelta(seconds=delay)).isoformat(),
+                "error": str(error),
+            }})
+            self._metrics["retried"] += 1
+            logger.warning("Job failed, retrying", extra={
+                "job_id": job["_id"], "kind": job["kind"], "attempt": job["attempts"], "delay": delay, "error": str(error)
+            })
+        else:
+            await jobs.update_one(mine, {"$set": self._finish(FAILED, error=str(error))})
+            self._metrics["failed"] += 1
+            logger.error("Job failed", extra={
+                "job_id": job["_id"], "kind": job["kind"], "attempts": job["attempts"], "error": str(error)
+            })
+
+    async def _renew_lease(self, mine: dict):
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                await get_collection(JOB_COLLECTION).update_one(
+                    {**mine, "status": RUNNING}, {"$set": {"lease_until": (_now() + self.lease).isoformat()}}
+                )
+            except Exception as e:
+                logger.error("Error renewing job lease", extra={"job_id": mine["_id"], "error": str(e)})
+
+    async def requeue_expired(self) -> int:
+        """Queue running jobs whose worker stopped renewing the lease."""
+        result = await get_collection(JOB_COLLECTION).update_many(
+            {"status": RUNNING, "lease_until": {"$lt": _now().isoformat()}},
+            {"$set": {"status": QUEUED, "run_after": _now().isoformat()}},
+        )
+        if result.modified_count:
+            logger.warning("Jobs with lapsed leases queued again", extra={"count": result.modified_count})
+            self._metrics["requeued"] += result.modified_count
+            self._wakeup.set()
+        return result.modified_count
+
+    async def _requeue_expired_forever(self):
+        while True:
+            try:
+                await self.requeue_expired()
+            except Exception as e:
+                logger.error("Error requeuing expired jobs", extra={"error": str(e)})
+            await asyncio.sleep(self.lease.total_seconds() / 2)
+
+    def stats(self) -> dict:
+        return {**self._metrics, "running": self._running, "workers": len(self._workers)}
+
+
+# ------------------------------
+# Shared instance
+# ------------------------------
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
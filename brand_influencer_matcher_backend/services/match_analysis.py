@@ -1,93 +1,178 @@
+import asyncio
+import json
+import logging
+import re
 from datetime import datetime
-from typing import Dict, Any, Optional
-from motor.motor_asyncio import AsyncIOMotorClient
-from openai import AsyncOpenAI
-from brand_influencer_matcher_backend.models import mongo_db
-from brand_influencer_matcher_backend.config import OPENAI_API_KEY
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from brand_influencer_matcher_backend.database import get_db, normalize_name
+from brand_influencer_matcher_backend.clients import get_openai_client
 from brand_influencer_matcher_backend.models.analysis import InfluencerBrandMatchAnalysis
+from brand_influencer_matcher_backend.services.match_context import build_match_context
+from brand_influencer_matcher_backend.services.analysis_cache import get_analysis_cache
 
-# Initialize OpenAI client
-client_openai = AsyncOpenAI(api_key=OPENAI_API_KEY)
+from brand_influencer_matcher_backend.metrics import span
+
+logger = logging.getLogger(__name__)
+
+MATCH_ANALYSIS_MODEL = "gpt-4o-mini"
 
 async def get_influencer_data(influencer_name: str) -> Optional[Dict[str, Any]]:
     """
     Fetch influencer data from the database.
     """
-    # Remove @ if present
-    influencer_name = influencer_name.lstrip('@')
-    
-    # Find the most recent analysis for this influencer
-    cursor = mongo_db['influencers'].find(
-        {"influencer": influencer_name}
-    ).sort("last_updated", -1).limit(1)
-    
-    result = await cursor.to_list(1)
-    return result[0] if result else None
+    # name_key is unique, so this is a single index seek
+    return await get_db()['influencers'].find_one({"name_key": normalize_name(influencer_name)})
 
 async def get_brand_data(brand_name: str) -> Optional[Dict[str, Any]]:
     """
     Fetch brand data from the database.
     """
-    cursor = mongo_db['brands'].find(
-        {"brand_name": brand_name}
-    ).sort("last_updated", -1).limit(1)
-    
-    result = await cursor.to_list(1)
-    return result[0] if result else None
+    return await get_db()['brands'].find_one({"name_key": normalize_name(brand_name)})
 
-async def analyze_influencer_brand_match(influencer_name: str, brand_name: str) -> Dict[str, Any]:
+async def load_match_inputs(influencer_name: str, brand_name: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
-    Analyze the match between an influencer and a brand using LLM.
+    Fetch both documents of a match; raises ValueError if either is missing.
     """
-    # Get influencer data
-    influencer_data = await get_influencer_data(influencer_name)
+    influencer_data, brand_data = await asyncio.gather(
+        get_influencer_data(influencer_name), get_brand_data(brand_name)
+    )
     if not influencer_data:
         raise ValueError(f"No data found for influencer: {influencer_name}")
-    
-    # Get brand data
-    brand_data = await get_brand_data(brand_name)
     if not brand_data:
         raise ValueError(f"No data found for brand: {brand_name}")
-    
-    # Extract necessary data
-    search_result = influencer_data.get("search_result", "")
-    tiktok_result_str = influencer_data.get("tiktok_result", "")
-    
-    # Get brand analysis fields
-    brand_analysis = brand_data.get("analysis", {})
-    
+    return influencer_data, brand_data
+
+def build_match_prompt(influencer_name: str, brand_name: str, influencer_data: Dict[str, Any], brand_data: Dict[str, Any]) -> str:
+    # Stored analysis fields + short video summaries, cut to the token budget (not the raw search/yt-dlp dumps)
+    context = build_match_context(influencer_name, brand_name, influencer_data, brand_data)
+    return f"""วิเคราะห์ความเหมาะสมระหว่าง TikToker: {influencer_name} กับ Brand: {brand_name}
+
+{context}
+
+โปรดวิเคราะห์และสรุปประเด็นต่อไปนี้:
+1. จุดเด่นของ {influencer_name} ในการเป็นพรีเซนเตอร์ให้ {brand_name}
+2. สไตล์การนำเสนอคอนเทนต์ที่โดดเด่น
+3. ความเข้ากันได้กับ Brand ตามข้อมูลที่ให้
+4. ความเหมาะสมในการทำแคมเปญร่วมกัน
+5. ข้อเสนอแนะเชิงกลยุทธ์ (รูปแบบคอนเทนต์ที่แนะนำ, จุดขายที่ควรเน้น, แนวทางการทำงานร่วมกัน)
+"""
+
+# ------------------------------
+# Token usage
+# ------------------------------
+_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+def record_usage(response, influencer_name: str, brand_name: str) -> Dict[str, int]:
+    """Add one LLM call's token counts to the running totals and return them."""
+    usage = getattr(response, "usage", None)
+    counts = {
+        "prompt_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+    _usage["calls"] += 1
+    _usage["prompt_tokens"] += counts["prompt_tokens"]
+    _usage["completion_tokens"] += counts["completion_tokens"]
+    logger.info("analyze-match tokens", extra={"influencer": influencer_name, "brand": brand_name, **counts})
+    return counts
+
+def usage_stats() -> Dict[str, int]:
+    return dict(_usage)
+
+async def analyze_influencer_brand_match(influencer_name: str, brand_name: str) -> Dict[str, Any]:
+    """
+    Analyze the match between an influencer and a brand using LLM.
+    """
+    influencer_data, brand_data = await load_match_inputs(influencer_name, brand_name)
+
+    # Served from the stored analysis while neither document nor the prompt changed
+    cache = get_analysis_cache()
+    cache_key = cache.key(influencer_data, brand_data, MATCH_ANALYSIS_MODEL) if cache else None
+    if cache_key:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return InfluencerBrandMatchAnalysis.model_validate_json(cached)
+
     # Generate the analysis using LLM
-    llm_response = await client_openai.responses.parse(
-        model="gpt-4o-mini",
-        text_format=InfluencerBrandMatchAnalysis,
-        input=f"""
-        วิเคราะห์ความเหมาะสมระหว่าง TikToker: {influencer_name} กับ Brand: {brand_name}
-
-        ข้อมูลจากผลการสืบค้นของ {influencer_name}:
-        {search_result}
-
-        ผลการวิเคราะห์คลิป TikTok:
-        {tiktok_result_str}
-
-        ข้อมูลของ Brand {brand_name}:
-        {{
-            "type_of_product": "{brand_analysis.get('type_of_product', '')}",
-            "target_group": "{brand_analysis.get('target_group', '')}",
-            "positioning": "{brand_analysis.get('positioning', '')}",
-            "brand_personality": "{brand_analysis.get('brand_personality', '')}",
-            "vision": "{brand_analysis.get('vision', '')}"
-        }}
-
-        โปรดวิเคราะห์และสรุปประเด็นต่อไปนี้:
-        1. จุดเด่นของ {influencer_name} ในการเป็นพรีเซนเตอร์ให้ {brand_name}
-        2. สไตล์การนำเสนอคอนเทนต์ที่โดดเด่น
-        3. ความเข้ากันได้กับ Brand ตามข้อมูลที่ให้
-        4. ความเหมาะสมในการทำแคมเปญร่วมกัน
-        5. ข้อเสนอแนะเชิงกลยุทธ์ (รูปแบบคอนเทนต์ที่แนะนำ, จุดขายที่ควรเน้น, แนวทางการทำงานร่วมกัน)
-        """
-    )
+    with span("llm", "match_analysis"):
+        llm_response = await get_openai_client().responses.parse(
+            model=MATCH_ANALYSIS_MODEL,
+            text_format=InfluencerBrandMatchAnalysis,
+            input=build_match_prompt(influencer_name, brand_name, influencer_data, brand_data)
+        )
     
+    record_usage(llm_response, influencer_name, brand_name)
+
     # Prepare the result
     result = llm_response.output_parsed
+    if cache_key:
+        await cache.set(cache_key, result.model_dump_json())
     
     return result
+
+# ------------------------------
+# Streaming
+# ------------------------------
+class SectionParser:
+    """
+    Picks completed sections out of the partial JSON the model streams.
+
+    The fields of InfluencerBrandMatchAnalysis are generated in schema order,
+    so a section is complete once its string value has a closing quote.
+    """
+
+    def __init__(self, fields: List[str]):
+        self.pending = list(fields)
+        self.buffer = ""
+
+    def feed(self, delta: str) -> List[Tuple[str, str]]:
+        self.buffer += delta
+        done = []
+        while self.pending:
+            match = re.search(rf'"{self.pending[0]}"\s*:\s*"((?:[^"\\]|\\.)*)"', self.buffer)
+            if not match:
+                break
+            done.append((self.pending.pop(0), json.loads(f'"{match.group(1)}"')))
+        return done
+
+async def stream_influencer_brand_match(
+    influencer_name: str, brand_name: str, influencer_data: Dict[str, Any], brand_data: Dict[str, Any]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream the match analysis as (event, data) pairs: one "section" per
+    InfluencerBrandMatchAnalysis field as soon as the model finished it, then
+    "result" with the complete parsed analysis.
+
+    Closing the generator (e.g. the client disconnected) leaves the `async
+    with` block, which closes the upstream response and stops generation.
+    """
+    cache = get_analysis_cache()
+    cache_key = cache.key(influencer_data, brand_data, MATCH_ANALYSIS_MODEL) if cache else None
+    cached = await cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        result = InfluencerBrandMatchAnalysis.model_validate_json(cached)
+        for field in InfluencerBrandMatchAnalysis.model_fields:
+            yield "section", {"field": field, "text": getattr(result, field)}
+        yield "result", result.model_dump()
+        return
+
+    parser = SectionParser(list(InfluencerBrandMatchAnalysis.model_fields))
+    with span("llm", "match_analysis_stream"):
+        async with get_openai_client().responses.stream(
+            model=MATCH_ANALYSIS_MODEL,
+            text_format=InfluencerBrandMatchAnalysis,
+            input=build_match_prompt(influencer_name, brand_name, influencer_data, brand_data)
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    for field, text in parser.feed(event.delta):
+                        yield "section", {"field": field, "text": text}
+            response = await stream.get_final_response()
+    record_usage(response, influencer_name, brand_name)
+
+    result = response.output_parsed
+    if cache_key:
+        await cache.set(cache_key, result.model_dump_json())
+    # Sections the incremental parser could not pick out are still sent before the result
+    for field in parser.pending:
+        yield "section", {"field": field, "text": getattr(result, field, "")}
+    yield "result", result.model_dump()
@@ -0,0 +1,174 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from brand_influencer_matcher_backend.config import (
+    BRAND_COLLECTION, META_COLLECTION, MATCH_CACHE_BACKEND, MATCH_CACHE_COLLECTION,
+    MATCH_CACHE_TTL_SECONDS, MATCH_CACHE_MAX_ENTRIES, MATCH_CACHE_VERSION_TTL_SECONDS
+)
+from brand_influencer_matcher_backend.database import get_db, normalize_name
+
+CORPUS_VERSION_ID = "corpus_version"
+
+
+# ------------------------------
+# Versions
+# ------------------------------
+class VersionTracker:
+    """
+    Brand-document and influencer-corpus versions used to key cached matches.
+
+    Versions live in Mongo (`version` on each brand document, a counter in the
+    meta collection for the corpus). Reads are memoized for `ttl` seconds; bumps
+    made by this process are visible immediately, bumps from other workers
+    within `ttl`.
+    """
+
+    def __init__(self, db=None, ttl: float = MATCH_CACHE_VERSION_TTL_SECONDS):
+        self._db = db
+        self.ttl = ttl
+        self._corpus: Optional[Tuple[int, float]] = None
+        self._brands: Dict[str, Tuple[int, float]] = {}
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_db()
+
+    def _fresh(self, entry) -> bool:
+        return entry is not None and time.monotonic() - entry[1] < self.ttl
+
+    async def corpus_version(self) -> int:
+        if not self._fresh(self._corpus):
+            doc = await self.db[META_COLLECTION].find_one({"_id": CORPUS_VERSION_ID})
+            self._corpus = ((doc or {}).get("value", 0), time.monotonic())
+        return self._corpus[0]
+
+    async def brand_version(self, brand_name: str) -> Optional[int]:
+        """Current version of a brand document, or None if the brand does not exist."""
+        name_key = normalize_name(brand_name)
+        entry = self._brands.get(name_key)
+        if not self._fresh(entry):
+            doc = await self.db[BRAND_COLLECTION].find_one({"name_key": name_key}, {"version": 1})
+            if doc is None:
+                return None
+            entry = self._brands[name_key] = (doc.get("version", 0), time.monotonic())
+        return entry[0]
+
+    async def bump_corpus(self):
+        doc = await self.db[META_COLLECTION].find_one_and_update(
+            {"_id": CORPUS_VERSION_ID}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        self._corpus = (doc["value"], time.monotonic())
+
+    def record_brand_version(self, brand_name: str, version: int):
+        """Record a brand version this process just wrote (or read along with the brand)."""
+        self._brands[normalize_name(brand_name)] = (version, time.monotonic())
+
+
+# ------------------------------
+# Backends
+# ------------------------------
+class MemoryMatchCache:
+    def __init__(self, max_entries: int = MATCH_CACHE_MAX_ENTRIES, ttl: float = MATCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    async def set(self, key: str, value: str):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class MongoMatchCache:
+    """Shared across workers; expired entries are removed by a TTL index on created_at."""
+
+    def __init__(self, collection_name: str = MATCH_CACHE_COLLECTION, ttl: float = MATCH_CACHE_TTL_SECONDS):
+        self.collection_name = collection_name
+        self.ttl = ttl
+        self._indexed = False
+
+    @property
+    def collection(self):
+        return get_db()[self.collection_name]
+
+    async def _ensure_index(self):
+        if not self._indexed:
+            await self.collection.create_index("created_at", expireAfterSeconds=int(self.ttl))
+            self._indexed = True
+
+    async def get(self, key: str) -> Optional[str]:
+        doc = await self.collection.find_one({"_id": key})
+        # The TTL monitor only runs about once a minute, so check age here too
+        if doc is None or doc["created_at"] < datetime.utcnow() - timedelta(seconds=self.ttl):
+            return None
+        return doc["value"]
+
+    async def set(self, key: str, value: str):
+        await self._ensure_index()
+        await self.collection.replace_one(
+            {"_id": key}, {"_id": key, "value": value, "created_at": datetime.utcnow()}, upsert=True
+        )
+
+
+# ------------------------------
+# Cache front
+# ------------------------------
+class MatchResultCache:
+    def __init__(self, backend, versions: VersionTracker):
+        self.backend = backend
+        self.versions = versions
+        self._metrics = {"hits": 0, "misses": 0}
+
+    async def key(self, brand_name: str, params: str = "") -> Optional[str]:
+        """Cache key for the brand's current version, or None if the brand is unknown."""
+        brand_version = await self.versions.brand_version(brand_name)
+        if brand_version is None:
+            return None
+        corpus_version = await self.versions.corpus_version()
+        return f"{normalize_name(brand_name)}|b{brand_version}|c{corpus_version}|{params}"
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.backend.get(key)
+        self._metrics["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        await self.backend.set(key, value)
+
+    def stats(self) -> dict:
+        return dict(self._metrics)
+
+
+_versions = VersionTracker()
+_cache: Optional[MatchResultCache] = None
+
+
+def get_version_tracker() -> VersionTracker:
+    return _versions
+
+
+def get_match_cache() -> Optional[MatchResultCache]:
+    """Return the configured match cache, or None when MATCH_CACHE_BACKEND is "none"."""
+    global _cache
+    if _cache is None and MATCH_CACHE_BACKEND != "none":
+        if MATCH_CACHE_BACKEND == "mongo":
+            backend = MongoMatchCache()
+        else:
+            backend = MemoryMatchCache()
+        _cache = MatchResultCache(backend, _versions)
+    return _cache
@@ -0,0 +1,126 @@
+import ast
+import math
+from typing import Any, Dict, List
+
+from brand_influencer_matcher_backend.config import (
+    MATCH_CONTEXT_TOKEN_BUDGET, MATCH_CONTEXT_FIELD_TOKENS, MATCH_CONTEXT_MAX_VIDEOS, MATCH_CONTEXT_VIDEO_TOKENS
+)
+
+# Bump whenever the prompt built here changes
+MATCH_PROMPT_VERSION = 2
+
+INFLUENCER_FIELDS = ["Type_of_content", "target_Audience", "positioning", "personality", "vision"]
+BRAND_FIELDS = ["type_of_product", "target_group", "positioning", "brand_personality", "vision"]
+
+
+# ------------------------------
+# Token estimates
+# ------------------------------
+def estimate_tokens(text: str) -> int:
+    """
+    Conservative token estimate without a tokenizer: ~4 ASCII characters per
+    token, one token per non-ASCII character (Thai script tokenizes densely).
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` within `max_tokens` (by estimate_tokens), marked with '…'."""
+    text = " ".join(str(text).split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+    budget = (max_tokens - 1) * 4  # in quarter tokens; one token kept for the marker
+    for end, ch in enumerate(text):
+        budget -= 1 if ord(ch) < 128 else 4
+        if budget < 0:
+            return text[:end].rstrip() + "…"
+    return text
+
+
+# ------------------------------
+# Inputs
+# ------------------------------
+def stored_videos(influencer_doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Video dicts (video_id, caption, summary, ...) of an influencer document.
+    Older documents only have `tiktok_result`, the repr of the
+    process_tiktok_user dict.
+    """
+    videos = influencer_doc.get("videos")
+    if videos is None:
+        try:
+            videos = ast.literal_eval(influencer_doc.get("tiktok_result") or "{}").get("videos", [])
+        except (ValueError, SyntaxError, AttributeError):
+            videos = []
+    return [vid for vid in videos if isinstance(vid, dict)]
+
+
+def video_summaries(influencer_doc: Dict[str, Any]) -> List[str]:
+    """Per-video summaries of an influencer document."""
+    summaries = []
+    for vid in stored_videos(influencer_doc):
+        text = vid.get("summary") or vid.get("caption")
+        if text:
+            summaries.append(text)
+    return summaries
+
+
+def brand_fields(brand_doc: Dict[str, Any]) -> Dict[str, str]:
+    # Brand analyses are stored at the top level of the brand document
+    source = brand_doc.get("analysis") or brand_doc
+    return {k: str(source.get(k) or "") for k in BRAND_FIELDS}
+
+
+# ------------------------------
+# Context
+# ------------------------------
+def build_match_context(
+    influencer_name: str,
+    brand_name: str,
+    influencer_doc: Dict[str, Any],
+    brand_doc: Dict[str, Any],
+    budget: int = MATCH_CONTEXT_TOKEN_BUDGET,
+) -> str:
+    """
+    Compact prompt context for a match analysis.
+
+    Sections are filled in priority order: brand fields and influencer
+    analysis fields (together at most ~60% of the budget), video summaries
+    (~25%), then a web-search excerpt with whatever is left. Every entry is
+    cut to its cap and to the remaining budget, so the same documents always
+    give the same context and it never exceeds `budget` (estimated tokens).
+    """
+    remaining = budget
+    lines = []
+
+    def section(title: str, entries: List[tuple], cap: int):
+        nonlocal remaining
+        left = remaining - estimate_tokens(title) - 1
+        body = []
+        for label, text in entries:
+            text = truncate_to_tokens(text, min(cap, left - estimate_tokens(label) - 1))
+            if text:
+                body.append(f"{label} {text}")
+                left -= estimate_tokens(body[-1]) + 1
+        if body:
+            lines.append(title)
+            lines.extend(body)
+            remaining = left
+
+    field_cap = min(MATCH_CONTEXT_FIELD_TOKENS, budget * 3 // 50)
+    section(f"Brand {brand_name}:", [(f"- {k}:", v) for k, v in brand_fields(brand_doc).items()], field_cap)
+    analysis = influencer_doc.get("analysis") or {}
+    section(f"TikToker {influencer_name}:", [(f"- {k}:", str(analysis.get(k) or "")) for k in INFLUENCER_FIELDS], field_cap)
+
+    summaries = video_summaries(influencer_doc)[:MATCH_CONTEXT_MAX_VIDEOS]
+    if summaries:
+        video_cap = min(MATCH_CONTEXT_VIDEO_TOKENS, budget // (4 * len(summaries)))
+        section("คลิปล่าสุด:", [(f"{i}.", text) for i, text in enumerate(summaries, 1)], video_cap)
+
+    if influencer_doc.get("search_result"):
+        section("ผลการสืบค้น (ย่อ):", [("-", str(influencer_doc["search_result"]))], remaining)
+
+    return "\n".join(lines)
@@ -1,25 +1,22 @@
-import json
-from collections import defaultdict
 import asyncio
-import motor.motor_asyncio
-from pinecone import Pinecone
+import json
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+
+import numpy as np
 
 # Import from models
-from ..models.influencer import get_embedding, index
+from .brand_embeddings import get_brand_vectors
+from .vector_store import get_vector_store, vector_id
+from .match_cache import get_match_cache
+from .io_pool import run_blocking
 
 # Import configuration
-from ..config import (
-    PINECONE_API_KEY, MONGO_URI, DB_NAME, BRAND_COLLECTION,
-    PINECONE_INDEX_NAME
-)
+from ..config import BRAND_COLLECTION, MATCH_CANDIDATE_POOL_SIZE, MATCH_TOP_K, MATCH_BATCH_CHUNK_SIZE
+from ..database import get_collection, normalize_name
+from ..metrics import span
 
-# Initialize Pinecone client
-pc = Pinecone(api_key=PINECONE_API_KEY)
-
-# MongoDB setup
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
-db = client[DB_NAME]
-brand_collection = db[BRAND_COLLECTION]
+logger = logging.getLogger(__name__)
 
 # Mapping brand key -> Pinecone namespace
 key_to_namespace = {
@@ -31,98 +28,235 @@ key_to_namespace = {
 }
 
 # ------------------------------
-# Async function to rank top 3 influencers
+# Async function to rank influencers
+async def rank_influencers_by_brand(
+    brand_name: str,
+    k: int = MATCH_TOP_K,
+    weights: Optional[Dict[str, float]] = None,
+    candidate_pool: int = MATCH_CANDIDATE_POOL_SIZE,
+):
+    """
+    Rank influencers against a brand in two stages.
+
+    Args:
+        brand_name: Brand to match (looked up by name_key)
+        k: Number of influencers returned
+        weights: Per brand field weight (keys of key_to_namespace), default 1.0
+        candidate_pool: Hits taken from each namespace as candidates
+
+    Returns:
+        JSON string of the top k influencers with total_score and per-field details
+    """
+    weights = {key: float(w) for key, w in (weights or {}).items()}
+
+    # Served from cache while neither the brand nor the influencer corpus changed
+    cache = get_match_cache()
+    params = _cache_params(k, weights, candidate_pool)
+    cache_key = await cache.key(brand_name, params) if cache else None
+    if cache_key:
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    result = await _rank_influencers_by_brand(brand_name, k, weights, candidate_pool)
+    if cache_key:
+        await cache.set(cache_key, result)
+    return result
+
 async def rank_top3_influencers_by_brand(brand_name: str):
-    print(f"Starting influencer matching for brand: {brand_name}")
+    return await rank_influencers_by_brand(brand_name, k=3)
+
+async def rank_influencers_for_brands(
+    brand_names: List[str],
+    k: int = MATCH_TOP_K,
+    weights: Optional[Dict[str, float]] = None,
+    candidate_pool: int = MATCH_CANDIDATE_POOL_SIZE,
+    chunk_size: int = MATCH_BATCH_CHUNK_SIZE,
+) -> AsyncIterator[dict]:
+    """
+    Rank influencers for many brands, yielding one result per brand as soon as
+    it is ready: cached and unknown brands first, then the rest in chunks of
+    `chunk_size`, each chunk scored in one vectorized pass.
+
+    Yields:
+        {"brand_name": ..., "matches": [...]} or {"brand_name": ..., "error": ...}
+    """
+    weights = {key: float(w) for key, w in (weights or {}).items()}
+    names = list(dict.fromkeys(brand_names))
+
+    # All brand documents in one query
+    docs = {}
+    async for doc in get_collection(BRAND_COLLECTION).find({"name_key": {"$in": [normalize_name(n) for n in names]}}):
+        docs[doc["name_key"]] = doc
+
+    cache = get_match_cache()
+    params = _cache_params(k, weights, candidate_pool)
+    pending = []
+    for name in names:
+        doc = docs.get(normalize_name(name))
+        if doc is None:
+            yield {"brand_name": name, "error": f"Brand '{name}' not found in MongoDB"}
+            continue
+        cache_key = None
+        if cache:
+            # The version just read saves the tracker a lookup per brand
+            cache.versions.record_brand_version(name, doc.get("version", 0))
+            cache_key = await cache.key(name, params)
+            cached = await cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                yield {"brand_name": name, "matches": json.loads(cached)}
+                continue
+        pending.append((name, doc, cache_key))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            ranked_lists = await _rank_brand_docs([doc for _, doc, _ in chunk], k, weights, candidate_pool)
+        except Exception as e:
+            logger.error("Error ranking brand chunk", extra={"brands": len(chunk), "error": str(e)})
+            for name, _, _ in chunk:
+                yield {"brand_name": name, "error": str(e)}
+            continue
+        for (name, _, cache_key), ranked in zip(chunk, ranked_lists):
+            if not ranked:
+                yield {"brand_name": name, "error": "No influencers found for the given brand attributes"}
+                continue
+            if cache_key:
+                await cache.set(cache_key, json.dumps(ranked, ensure_ascii=False, indent=2))
+            yield {"brand_name": name, "matches": ranked}
+
+def _cache_params(k: int, weights: Dict[str, float], candidate_pool: int) -> str:
+    return json.dumps({"k": k, "weights": weights, "pool": candidate_pool}, sort_keys=True)
+
+async def _rank_influencers_by_brand(brand_name: str, k: int, weights: Dict[str, float], candidate_pool: int):
+    logger.debug("Starting influencer matching", extra={"brand": brand_name})
     
     try:
         # 1) ดึง brand data จาก MongoDB
-        print(f"Fetching brand data for '{brand_name}' from MongoDB...")
-        brand_doc = await brand_collection.find_one({"brand_name": brand_name})
+        brand_doc = await get_collection(BRAND_COLLECTION).find_one({"name_key": normalize_name(brand_name)})
         if not brand_doc:
             error_msg = f"Brand '{brand_name}' not found in MongoDB"
-            print(error_msg)
-            raise ValueError(error_msg)
-        print("Brand data found in MongoDB")
-
-        # 2) เตรียม brand_input dict จาก document
-        brand_input = {k: brand_doc[k] for k in key_to_namespace.keys() if k in brand_doc}
-        print(f"Brand input fields: {list(brand_input.keys())}")
-
-        # 3) เก็บคะแนน raw
-        raw_scores = defaultdict(dict)
-        
-        if index is None:
-            error_msg = "Pinecone index is not initialized"
-            print(error_msg)
+            logger.info(error_msg)
             raise ValueError(error_msg)
 
-        for input_key, text in brand_input.items():
-            try:
-                namespace = key_to_namespace[input_key]
-                print(f"Processing namespace: {namespace} for input key: {input_key}")
-                
-                print(f"Generating embedding for text: {text[:50]}...")
-                query_emb = get_embedding(text)
-                print(f"Generated embedding vector of length: {len(query_emb) if query_emb else 0}")
-
-                print(f"Querying Pinecone index '{index}' in namespace '{namespace}'...")
-                result = index.query(
-                    vector=query_emb,
-                    top_k=10,
-                    namespace=namespace,
-                    include_metadata=True
-                )
-                print(f"Received {len(result.matches)} matches from Pinecone")
-
-                for match in result.matches:
-                    if not hasattr(match, 'metadata') or not match.metadata or "influencer" not in match.metadata:
-                        print(f"Warning: Match is missing required 'influencer' metadata: {match}")
-                        continue
-                    influencer = match.metadata["influencer"]
-                    raw_scores[input_key][influencer] = match.score
-                    print(f"Added score {match.score:.4f} for influencer '{influencer}' in category '{input_key}'")
-                    
-            except Exception as e:
-                print(f"Error processing input key '{input_key}' with namespace '{namespace}': {str(e)}")
-                raise
-
-        # 4) Normalize score แต่ละ key เป็น 0-10
-        print("Normalizing scores...")
-        normalized = defaultdict(lambda: {"details": {}, "total_score": 0.0})
-        for key, influencer_scores in raw_scores.items():
-            if not influencer_scores:
-                print(f"No scores found for key: {key}")
-                continue
-            max_score = max(influencer_scores.values()) if influencer_scores else 0
-            print(f"Normalizing scores for key: {key}, max_score: {max_score}")
-            for influencer, score in influencer_scores.items():
-                norm_score = (score / max_score) * 10 if max_score > 0 else 0
-                normalized[influencer]["details"][key] = round(norm_score, 2)
-                normalized[influencer]["total_score"] += norm_score
-                print(f"Normalized score for {influencer} in {key}: {norm_score:.2f}")
-                
-        if not normalized:
+        ranked = (await _rank_brand_docs([brand_doc], k, weights, candidate_pool))[0]
+        if not ranked:
             error_msg = "No influencers found for the given brand attributes"
-            print(error_msg)
+            logger.info(error_msg, extra={"brand": brand_name})
             raise ValueError(error_msg)
 
-        # 5) แปลงเป็น list + sort + slice top 3
-        print("Sorting and selecting top 3 influencers...")
-        ranked = sorted(
-            [
-                {"influencer": inf, 
-                 "total_score": round(data["total_score"], 2), 
-                 "details": data["details"]}
-                for inf, data in normalized.items()
-            ],
-            key=lambda x: x["total_score"],
-            reverse=True
-        )[:3]  # <-- top 3
-
-        print(f"Top 3 influencers found: {[r['influencer'] for r in ranked]}")
+        logger.info("Ranked influencers", extra={"brand": brand_name, "top": [r["influencer"] for r in ranked]})
         return json.dumps(ranked, ensure_ascii=False, indent=2)
         
+    except ValueError:
+        raise
     except Exception as e:
-        print(f"Error in rank_top3_influencers_by_brand: {str(e)}")
+        logger.exception("Error in rank_influencers_by_brand", extra={"brand": brand_name, "error": str(e)})
         raise
+
+async def _rank_brand_docs(brand_docs: List[dict], k: int, weights: Dict[str, float], candidate_pool: int) -> List[List[dict]]:
+    """
+    Two-stage ranking of one or more brands at once; returns the top k list
+    of every brand (empty when it has no candidates).
+
+    Stage 1 takes the union of each brand's approximate hits per namespace
+    (one batched query per namespace for all brands). Stage 2 fetches the
+    stored vectors of all candidates once and scores brands x candidates per
+    field as a single matrix product. Scores are then normalized to 0-10 per
+    brand and field over that brand's own candidates, exactly as for a single
+    brand.
+    """
+    store = get_vector_store()
+    if store is None:
+        error_msg = "Vector store is not initialized"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+    fields = list(key_to_namespace)
+    # Brand vectors are stored with the brand at analysis time (no embed call here)
+    brand_vectors = await asyncio.gather(*(get_brand_vectors(doc) for doc in brand_docs))
+
+    # 1) Stage 1 - candidates (the namespaces are queried concurrently, off the event loop)
+    rows_by_key = {}
+    for key in fields:
+        rows = [b for b, vectors in enumerate(brand_vectors) if key in vectors]
+        if rows:
+            rows_by_key[key] = rows
+    results = await asyncio.gather(*(
+        _query_namespace(store, [brand_vectors[b][key] for b in rows], candidate_pool, key_to_namespace[key])
+        for key, rows in rows_by_key.items()
+    ))
+    hits = {key: list(zip(rows, matches)) for (key, rows), matches in zip(rows_by_key.items(), results)}
+    # Candidates by name_key (the vector id prefix); any spelling found in the metadata is shown
+    display = {normalize_name(match.influencer): match.influencer
+               for pairs in hits.values() for _, matches in pairs for match in matches}
+    union = sorted(display)
+    if not union:
+        return [[] for _ in brand_docs]
+    column = {name_key: j for j, name_key in enumerate(union)}
+    is_candidate = np.zeros((len(brand_docs), len(union)), dtype=bool)
+    for pairs in hits.values():
+        for b, matches in pairs:
+            is_candidate[b, [column[normalize_name(m.influencer)] for m in matches]] = True
+    logger.debug("Candidates", extra={"brands": len(brand_docs), "candidates": len(union)})
+
+    # 2) Stage 2 - exact scores from the stored vectors (one fetch per namespace, concurrently)
+    namespaces = [key_to_namespace[key] for key in hits]
+    fetched = await asyncio.gather(*(
+        _fetch_namespace(store, [vector_id(name_key, namespace) for name_key in union], namespace) for namespace in namespaces
+    ))
+    stored = dict(zip(namespaces, fetched))
+    raw = np.zeros((len(brand_docs), len(fields), len(union)), dtype=np.float32)
+    present = np.zeros(raw.shape, dtype=bool)
+    for f, key in enumerate(fields):
+        if key not in hits:
+            continue
+        namespace = key_to_namespace[key]
+        # Approximate hit scores stand in for any vector the fetch did not return
+        for b, matches in hits[key]:
+            for match in matches:
+                raw[b, f, column[normalize_name(match.influencer)]] = match.score
+                present[b, f, column[normalize_name(match.influencer)]] = True
+        vectors = stored.get(namespace, {})
+        cols = [j for j, name_key in enumerate(union) if vector_id(name_key, namespace) in vectors]
+        if not cols:
+            logger.warning("No stored vectors for namespace", extra={"namespace": namespace})
+            continue
+        rows = [b for b, _ in hits[key]]
+        matrix = _unit(np.stack([vectors[vector_id(union[j], namespace)] for j in cols]))
+        queries = _unit(np.asarray([brand_vectors[b][key] for b in rows], dtype=np.float32))
+        raw[np.ix_(rows, [f], cols)] = (queries @ matrix.T)[:, None, :]
+        present[np.ix_(rows, [f], cols)] = True
+    present &= is_candidate[:, None, :]
+
+    # 3) Normalize score แต่ละ key เป็น 0-10 (ต่อ brand) แล้วรวมแบบถ่วงน้ำหนัก
+    max_scores = np.where(present, raw, -np.inf).max(axis=2, keepdims=True)
+    positive = max_scores > 0
+    normalized = np.where(present & positive, raw / np.where(positive, max_scores, 1) * 10, 0.0)
+    field_weights = np.array([weights.get(key, 1.0) for key in fields], dtype=np.float32)
+    totals = np.einsum("f,bfc->bc", field_weights, normalized)
+
+    # 4) sort + slice top k ของแต่ละ brand
+    ranked_lists = []
+    for b in range(len(brand_docs)):
+        cols = np.flatnonzero(is_candidate[b])
+        top = cols[np.argsort(-totals[b, cols], kind="stable")][:k]
+        ranked_lists.append([
+            {"influencer": display[union[j]],
+             "total_score": round(float(totals[b, j]), 2),
+             "details": {key: round(float(normalized[b, f, j]), 2) for f, key in enumerate(fields) if present[b, f, j]}}
+            for j in top
+        ])
+    return ranked_lists
+
+async def _query_namespace(store, vectors: List[List[float]], top_k: int, namespace: str):
+    with span("vector", "query"):
+        return await run_blocking(store.query_many, vectors, top_k, namespace)
+
+async def _fetch_namespace(store, ids: List[str], namespace: str):
+    with span("vector", "fetch"):
+        return await run_blocking(store.fetch, ids, namespace)
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
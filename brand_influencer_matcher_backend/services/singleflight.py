@@ -0,0 +1,47 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one run.
+
+    The first caller starts the run as its own task; later callers await the
+    same task. Each waiter awaits it through `asyncio.shield`, so a caller that
+    is cancelled (e.g. the client disconnected) does not cancel the shared run.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._metrics = {"runs": 0, "coalesced": 0, "failures": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._metrics["runs"] += 1
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self._metrics["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so an unawaited failure is not reported as "never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            self._metrics["failures"] += 1
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def stats(self) -> dict:
+        return {**self._metrics, "in_flight": len(self._inflight)}
+
+
+brand_runs = SingleFlight("analyze-brand")
+influencer_runs = SingleFlight("analyze-influencer")
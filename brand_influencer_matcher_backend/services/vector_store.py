@@ -0,0 +1,536 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from brand_influencer_matcher_backend.config import (
+    VECTOR_STORE_BACKEND, LOCAL_VECTOR_STORE_PATH, LOCAL_VECTOR_STORE_SAVE_SECONDS, PINECONE_DIMENSION
+)
+from brand_influencer_matcher_backend.database import normalize_name
+from brand_influencer_matcher_backend.services.io_pool import run_blocking
+
+try:
+    import fcntl
+except ImportError:  # Windows: the single-process check is skipped
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Namespaces written by search_influ_analysis (one per InfluencerAnalysis field)
+NAMESPACES = ["Type_of_content", "target_Audience", "positioning", "personality", "vision"]
+
+
+class VectorMatch(NamedTuple):
+    id: str
+    score: float
+    influencer: str  # display name (`influencer` metadata)
+
+
+def vector_id(influencer: str, namespace: str) -> str:
+    """
+    Id of an influencer's vector in `namespace`. Keyed by name_key, so every
+    spelling of a name overwrites the same vector; the display name is kept
+    in the `influencer` metadata.
+    """
+    return f"{normalize_name(influencer)}_{namespace}"
+
+
+# ------------------------------
+# Interface
+# ------------------------------
+class VectorStore:
+    """
+    Minimal vector-store interface used by the matching and ingestion paths.
+
+    Vectors are passed around in the Pinecone upsert format:
+    {"id": vector_id(...), "values": [...], "metadata": {"influencer": ..., "field": ..., "text": ...}}
+    """
+
+    def upsert(self, vectors: List[dict], namespace: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, ids: List[str], namespace: str) -> None:
+        raise NotImplementedError
+
+    def query(self, vector: List[float], top_k: int, namespace: str) -> List[VectorMatch]:
+        raise NotImplementedError
+
+    def query_many(self, vectors: List[List[float]], top_k: int, namespace: str) -> List[List[VectorMatch]]:
+        """Answer several query vectors against one namespace."""
+        return [self.query(vector, top_k, namespace) for vector in vectors]
+
+    def query_namespaces(self, queries: Dict[str, List[float]], top_k: int) -> Dict[str, List[VectorMatch]]:
+        """Answer one query vector per namespace."""
+        return {namespace: self.query(vector, top_k, namespace) for namespace, vector in queries.items()}
+
+    def fetch(self, ids: List[str], namespace: str) -> Dict[str, np.ndarray]:
+        """Stored vectors by id; ids that do not exist are left out."""
+        raise NotImplementedError
+
+    def fetch_namespaces(self, ids: Dict[str, List[str]]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Fetch a list of ids from each namespace."""
+        return {namespace: self.fetch(namespace_ids, namespace) for namespace, namespace_ids in ids.items()}
+
+    def save(self) -> None:
+        """Persist pending changes (no-op for remote backends)."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+# ------------------------------
+# Pinecone backend
+# ------------------------------
+class PineconeVectorStore(VectorStore):
+    def __init__(self, index):
+        self.index = index
+
+    def upsert(self, vectors, namespace):
+        self.index.upsert(vectors=vectors, namespace=namespace)
+
+    def delete(self, ids, namespace):
+        self.index.delete(ids=ids, namespace=namespace)
+
+    def query(self, vector, top_k, namespace):
+        result = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            namespace=namespace,
+            include_metadata=True
+        )
+        matches = []
+        for match in result.matches:
+            if not getattr(match, "metadata", None) or "influencer" not in match.metadata:
+                logger.warning("Match is missing required 'influencer' metadata", extra={"id": match.id, "namespace": namespace})
+                continue
+            matches.append(VectorMatch(match.id, float(match.score), match.metadata["influencer"]))
+        return matches
+
+    def fetch(self, ids, namespace, batch_size: int = 100):
+        vectors = {}
+        for start in range(0, len(ids), batch_size):
+            fetched = self.index.fetch(ids=ids[start:start + batch_size], namespace=namespace)
+            for vector_id, vector in fetched.vectors.items():
+                vectors[vector_id] = np.asarray(vector.values, dtype=np.float32)
+        return vectors
+
+
+# ------------------------------
+# Local NumPy backend
+# ------------------------------
+class _Namespace:
+    """
+    One contiguous, row-normalized float32 matrix plus its id/metadata columns.
+
+    `view` hands out a read-only copy for queries that run without the lock.
+    It shares the matrix: once a view exists, the first write that would
+    change one of its rows copies the matrix first.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 1024):
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.size = 0
+        self.ids: List[str] = []
+        self.influencers: List[str] = []
+        self.texts: List[str] = []
+        self.id_to_row: Dict[str, int] = {}
+        self._view: Optional["_Namespace"] = None
+        # A view (current or already handed out) shares self.vectors
+        self._shared = False
+
+    def view(self) -> "_Namespace":
+        """Snapshot of the current rows; later writes never change it."""
+        if self._view is None:
+            view = copy.copy(self)
+            view.vectors = self.vectors[:self.size]
+            view.ids, view.influencers, view.texts = tuple(self.ids), tuple(self.influencers), tuple(self.texts)
+            view.id_to_row = None
+            self._view, self._shared = view, True
+        return self._view
+
+    def _own(self):
+        """Copy the matrix before changing rows that a view may still be reading."""
+        if self._shared:
+            self.vectors = self.vectors.copy()
+            self._shared = False
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        if needed <= self.vectors.shape[0]:
+            return
+        capacity = max(needed, self.vectors.shape[0] * 2)
+        grown = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+        grown[:self.size] = self.vectors[:self.size]
+        self.vectors = grown
+        self._shared = False
+
+    def upsert(self, vectors: List[dict]):
+        self._reserve(len(vectors))
+        self._view = None
+        if self._shared and any(item["id"] in self.id_to_row for item in vectors):
+            self._own()
+        for item in vectors:
+            values = _normalize(np.asarray(item["values"], dtype=np.float32))
+            metadata = item.get("metadata") or {}
+            row = self.id_to_row.get(item["id"])
+            if row is None:
+                row = self.size
+                self.size += 1
+                self.ids.append(item["id"])
+                self.influencers.append(metadata.get("influencer", ""))
+                self.texts.append(metadata.get("text", ""))
+                self.id_to_row[item["id"]] = row
+            else:
+                self.influencers[row] = metadata.get("influencer", self.influencers[row])
+                self.texts[row] = metadata.get("text", self.texts[row])
+            self.vectors[row] = values
+
+    def delete(self, ids: List[str]):
+        if not any(vector_id in self.id_to_row for vector_id in ids):
+            return
+        self._view = None
+        self._own()
+        for vector_id in ids:
+            row = self.id_to_row.pop(vector_id, None)
+            if row is None:
+                continue
+            last = self.size - 1
+            if row != last:
+                # Move the last row into the hole so the matrix stays contiguous
+                self.vectors[row] = self.vectors[last]
+                self.ids[row] = self.ids[last]
+                self.influencers[row] = self.influencers[last]
+                self.texts[row] = self.texts[last]
+                self.id_to_row[self.ids[row]] = row
+            self.ids.pop()
+            self.influencers.pop()
+            self.texts.pop()
+            self.size = last
+
+    def search(self, query: np.ndarray, top_k: int) -> List[VectorMatch]:
+        return self.search_many(query[None, :], top_k)[0]
+
+    def search_many(self, queries: np.ndarray, top_k: int) -> List[List[VectorMatch]]:
+        """Top hits for each row of `queries` from a single matrix product."""
+        if self.size == 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self.vectors[:self.size].T
+        k = min(top_k, self.size)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            candidates = candidates[np.argsort(-row[candidates])]
+            results.append([VectorMatch(self.ids[i], float(row[i]), self.influencers[i]) for i in candidates])
+        return results
+
+    def fetch(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        rows = [(vector_id, self.id_to_row[vector_id]) for vector_id in ids if vector_id in self.id_to_row]
+        if not rows:
+            return {}
+        # One fancy-indexing gather (a copy, so later upserts cannot change it)
+        gathered = self.vectors[[row for _, row in rows]]
+        return {vector_id: gathered[i] for i, (vector_id, _) in enumerate(rows)}
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process cosine index: one float32 matrix per namespace, persisted under
+    `path` as a vector file and `<namespace>.json` (ids/metadata).
+
+    Every save writes the vectors to a new `<namespace>.<generation>.npy` and
+    then replaces `<namespace>.json`, which names it: a crash at any point
+    leaves the previous save complete. Directories written before generations
+    (`<namespace>.npy`) still load.
+
+    Each namespace has its own lock. Queries hold it only to take the
+    namespace's read-only view and score outside it, so queries on one
+    namespace overlap with queries and writes on any other (and with each other).
+    """
+
+    def __init__(self, path: Optional[str] = None, dimension: int = PINECONE_DIMENSION):
+        self.path = Path(path) if path else None
+        self.dimension = dimension
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._dirty = set()
+        # Guards the lock table and `_dirty`; namespace data is guarded by the namespace's lock
+        self._lock = threading.RLock()
+        self._locks: Dict[str, threading.RLock] = {}
+        # One save at a time (they write the same temp files)
+        self._save_lock = threading.Lock()
+        self._claim = None
+        if self.path and self.path.exists():
+            self.load()
+
+    def claim(self):
+        """
+        Take an exclusive lock on `path` for this process. Each process keeps
+        and saves its own copy of the index, so two processes on one
+        directory would overwrite each other's vectors; the second is refused.
+
+        Raises:
+            RuntimeError: Another process holds the directory
+        """
+        if not self.path or fcntl is None or self._claim is not None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        claim = open(self.path / ".lock", "w")
+        try:
+            fcntl.flock(claim, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            claim.close()
+            raise RuntimeError(
+                f"{self.path} is in use by another process: the local vector store backends "
+                "support one worker process (use pinecone or snapshot with several)"
+            )
+        self._claim = claim
+
+    def _namespace_lock(self, namespace: str) -> threading.RLock:
+        lock = self._locks.get(namespace)
+        if lock is None:
+            with self._lock:
+                lock = self._locks.setdefault(namespace, threading.RLock())
+        return lock
+
+    def _namespace(self, namespace: str) -> _Namespace:
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            ns = self._namespaces[namespace] = _Namespace(self.dimension)
+        return ns
+
+    def _mark_dirty(self, namespace: str):
+        with self._lock:
+            self._dirty.add(namespace)
+
+    def _view(self, namespace: str):
+        with self._namespace_lock(namespace):
+            ns = self._namespaces.get(namespace)
+            return ns.view() if ns is not None else None
+
+    def upsert(self, vectors, namespace):
+        with self._namespace_lock(namespace):
+            self._namespace(namespace).upsert(vectors)
+            self._mark_dirty(namespace)
+
+    def delete(self, ids, namespace):
+        with self._namespace_lock(namespace):
+            if namespace in self._namespaces:
+                self._namespaces[namespace].delete(ids)
+                self._mark_dirty(namespace)
+
+    def query(self, vector, top_k, namespace):
+        return self.query_many([vector], top_k, namespace)[0]
+
+    def query_many(self, vectors, top_k, namespace):
+        view = self._view(namespace)
+        if view is None:
+            return [[] for _ in vectors]
+        queries = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        return view.search_many(queries / np.where(norms > 0, norms, 1), top_k)
+
+    def fetch(self, ids, namespace):
+        with self._namespace_lock(namespace):
+            ns = self._namespaces.get(namespace)
+            return ns.fetch(ids) if ns else {}
+
+    def count(self, namespace: str) -> int:
+        ns = self._namespaces.get(namespace)
+        return ns.size if ns else 0
+
+    def load(self):
+        with self._lock:
+            for meta_file in self.path.glob("*.json"):
+                namespace = meta_file.stem
+                with open(meta_file, encoding="utf-8") as f:
+                    meta = json.load(f)
+                vectors = np.load(self._vectors_file(namespace, meta))
+                ns = _Namespace(vectors.shape[1], capacity=max(len(vectors), 1))
+                ns.vectors[:len(vectors)] = vectors
+                ns.size = len(vectors)
+                ns.ids = meta["ids"]
+                ns.influencers = meta["influencers"]
+                ns.texts = meta["texts"]
+                ns.id_to_row = {vector_id: row for row, vector_id in enumerate(ns.ids)}
+                self._namespaces[namespace] = ns
+            self._dirty.clear()
+
+    def _take_dirty(self) -> List[str]:
+        with self._lock:
+            dirty, self._dirty = list(self._dirty), set()
+        return dirty
+
+    def save(self):
+        if not self.path:
+            return
+        with self._save_lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for namespace in self._take_dirty():
+                # The view is immutable, so writes to the namespace go on while it is written out
+                view = self._view(namespace)
+                try:
+                    self._write(namespace, view)
+                except Exception:
+                    self._mark_dirty(namespace)
+                    raise
+
+    def _write(self, namespace: str, view: _Namespace):
+        vectors_file = self._generation_file(namespace, ".npy")
+        with open(vectors_file, "wb") as f:
+            np.save(f, view.vectors)
+            f.flush()
+            os.fsync(f.fileno())
+        self._commit(namespace, {
+            "vectors": vectors_file.name, "ids": view.ids, "influencers": view.influencers, "texts": view.texts,
+        })
+
+    async def keep_saved(self, interval: float = LOCAL_VECTOR_STORE_SAVE_SECONDS):
+        """Save changed namespaces every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_blocking(self.save)
+            except Exception as e:
+                logger.error("Error saving local vector store", extra={"error": str(e)})
+
+    # --- files ---
+    def _vectors_file(self, namespace: str, meta: dict) -> Path:
+        return self.path / meta.get("vectors", f"{namespace}.npy")
+
+    def _generation_file(self, namespace: str, suffix: str) -> Path:
+        return self.path / f"{namespace}.{uuid.uuid4().hex[:12]}{suffix}"
+
+    def _commit(self, namespace: str, meta: dict):
+        """Point `<namespace>.json` at the files just written (one atomic rename), then delete older ones."""
+        tmp_meta = self.path / f"{namespace}.json.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_meta, self.path / f"{namespace}.json")
+        current = {meta["vectors"], meta.get("index")}
+        for old in [self.path / f"{namespace}.npy", self.path / f"{namespace}.ivf.npz",
+                    *self.path.glob(f"{namespace}.*.npy"), *self.path.glob(f"{namespace}.*.ivf.npz")]:
+            if old.name not in current:
+                try:
+                    old.unlink(missing_ok=True)
+                except OSError:
+                    # Still memory-mapped on a platform that forbids deleting it; the next save retries
+                    pass
+
+
+def _current_id(vector, namespace: str) -> str:
+    influencer = (vector.metadata or {}).get("influencer")
+    return vector_id(influencer, namespace) if influencer else vector.id
+
+
+def copy_from_pinecone(index, store: VectorStore, namespaces: List[str] = NAMESPACES, batch_size: int = 100):
+    """
+    Copy every vector of the given namespaces from a Pinecone index into
+    `store`, under its name_key id (vectors written before ids were keyed by
+    name_key are re-keyed on the way).
+    """
+    for namespace in namespaces:
+        copied = 0
+        for ids in index.list(namespace=namespace):
+            for start in range(0, len(ids), batch_size):
+                fetched = index.fetch(ids=ids[start:start + batch_size], namespace=namespace)
+                store.upsert([
+                    {"id": _current_id(v, namespace), "values": v.values, "metadata": dict(v.metadata or {})}
+                    for v in fetched.vectors.values()
+                ], namespace=namespace)
+                copied += len(fetched.vectors)
+        logger.info("Copied vectors from Pinecone", extra={"namespace": namespace, "count": copied})
+    store.save()
+
+
+def rekey_pinecone(index, namespaces: List[str] = NAMESPACES, batch_size: int = 100) -> int:
+    """
+    Move vectors stored under the raw influencer name (written before ids were
+    keyed by name_key) to their name_key id. A vector already under that id
+    is newer and is kept; the old one is only deleted.
+
+    Returns:
+        Number of old ids removed
+    """
+    removed = 0
+    for namespace in namespaces:
+        count = 0
+        for ids in index.list(namespace=namespace):
+            for start in range(0, len(ids), batch_size):
+                fetched = index.fetch(ids=ids[start:start + batch_size], namespace=namespace)
+                stale = [v for v in fetched.vectors.values() if v.id != _current_id(v, namespace)]
+                if not stale:
+                    continue
+                moves = {}
+                for v in stale:
+                    moves.setdefault(_current_id(v, namespace), v)
+                existing = index.fetch(ids=list(moves), namespace=namespace).vectors
+                missing = [{"id": new_id, "values": v.values, "metadata": dict(v.metadata)}
+                           for new_id, v in moves.items() if new_id not in existing]
+                if missing:
+                    index.upsert(vectors=missing, namespace=namespace)
+                index.delete(ids=[v.id for v in stale], namespace=namespace)
+                count += len(stale)
+        logger.info("Re-keyed vectors by name_key", extra={"namespace": namespace, "count": count})
+        removed += count
+    return removed
+
+
+# ------------------------------
+# Backend selection
+# ------------------------------
+_store: Optional[VectorStore] = None
+
+
+def get_vector_store() -> Optional[VectorStore]:
+    """Return the configured vector store, or None if the backend is unavailable."""
+    global _store
+    if _store is None:
+        if VECTOR_STORE_BACKEND == "local":
+            _store = LocalVectorStore(LOCAL_VECTOR_STORE_PATH)
+        elif VECTOR_STORE_BACKEND == "ivf":
+            from brand_influencer_matcher_backend.services.ann_store import QuantizedVectorStore
+            _store = QuantizedVectorStore(LOCAL_VECTOR_STORE_PATH)
+        elif VECTOR_STORE_BACKEND == "snapshot":
+            from brand_influencer_matcher_backend.services.corpus_snapshot import SnapshotVectorStore
+            _store = SnapshotVectorStore()
+        else:
+            from brand_influencer_matcher_backend.clients import get_pinecone_index
+            index = get_pinecone_index()
+            if index is not None:
+                _store = PineconeVectorStore(index)
+    return _store
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import-pinecone", "rekey"):
+        print("Usage: python -m brand_influencer_matcher_backend.services.vector_store import-pinecone|rekey")
+        sys.exit(1)
+
+    from brand_influencer_matcher_backend.clients import get_pinecone_index
+    from brand_influencer_matcher_backend.logging_setup import configure_logging
+    configure_logging()
+    pinecone_index = get_pinecone_index()
+    if pinecone_index is None:
+        print("Pinecone index is not initialized")
+        sys.exit(1)
+    if sys.argv[1] == "rekey":
+        print(f"Re-keyed {rekey_pinecone(pinecone_index)} vectors")
+    else:
+        local_store = LocalVectorStore(LOCAL_VECTOR_STORE_PATH)
+        local_store.claim()
+        copy_from_pinecone(pinecone_index, local_store)
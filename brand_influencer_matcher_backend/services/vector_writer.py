@@ -0,0 +1,247 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+from brand_influencer_matcher_backend.config import (
+    VECTOR_WRITE_BATCH_SIZE, VECTOR_WRITE_FLUSH_MS, VECTOR_UPSERT_BATCH_SIZE,
+    VECTOR_WRITE_MAX_ATTEMPTS, VECTOR_WRITE_RETRY_BASE_SECONDS
+)
+from brand_influencer_matcher_backend.services.embedding_service import embed_texts
+from brand_influencer_matcher_backend.services.vector_store import get_vector_store, vector_id
+from brand_influencer_matcher_backend.services.match_cache import get_version_tracker
+from brand_influencer_matcher_backend.services.io_pool import run_blocking
+from brand_influencer_matcher_backend.metrics import span
+
+logger = logging.getLogger(__name__)
+
+
+class VectorWrite(NamedTuple):
+    influencer: str
+    field: str
+    text: str
+    # Order of submission; a retry is skipped once a newer item for the same vector was queued
+    seq: int = 0
+    attempts: int = 0
+
+    @property
+    def vector_id(self) -> str:
+        # Deterministic id: an upsert overwrites the previous vector (whatever the spelling), no delete needed
+        return vector_id(self.influencer, self.field)
+
+
+class VectorWritePipeline:
+    """
+    Background writer for influencer analysis vectors.
+
+    Queued (influencer, field, text) items are embedded in batches and upserted
+    per namespace in bulk. Items of a failed batch are queued again with
+    exponential backoff until they have been tried `max_attempts` times, unless
+    a newer analysis of the same influencer field was submitted meanwhile.
+    `stop()` flushes everything still queued, giving items waiting for a retry
+    one last attempt.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = VECTOR_WRITE_BATCH_SIZE,
+        flush_interval_ms: float = VECTOR_WRITE_FLUSH_MS,
+        upsert_batch_size: int = VECTOR_UPSERT_BATCH_SIZE,
+        max_attempts: int = VECTOR_WRITE_MAX_ATTEMPTS,
+        retry_base: float = VECTOR_WRITE_RETRY_BASE_SECONDS,
+    ):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.upsert_batch_size = upsert_batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._seq = itertools.count(1)
+        # vector_id -> seq of its newest item not yet written (queued, in flight or waiting to retry)
+        self._latest: Dict[str, int] = {}
+        # Sleeping retry -> the items it queues again
+        self._delayed: Dict[asyncio.Task, List[VectorWrite]] = {}
+        self._stopping = False
+        self._metrics = {
+            "queued": 0, "written": 0, "failed": 0, "retried": 0, "dropped": 0, "embed_batches": 0, "upsert_calls": 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush every queued item, then stop the worker."""
+        if not self.running:
+            return
+        # From here on a failed batch is dropped instead of retried
+        self._stopping = True
+        await self._queue.join()
+        while self._delayed:
+            for task, items in list(self._delayed.items()):
+                task.cancel()
+                self._requeue(items)
+            self._delayed.clear()
+            await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def submit_analysis(self, influencer: str, analysis: Dict[str, str]):
+        """Queue one vector per analysis field (written inline if the worker is not running)."""
+        if not self.running:
+            await self.write([VectorWrite(influencer, field, text) for field, text in analysis.items()])
+            return
+        items = [VectorWrite(influencer, field, text, next(self._seq)) for field, text in analysis.items()]
+        for item in items:
+            self._latest[item.vector_id] = item.seq
+            self._queue.put_nowait(item)
+        self._metrics["queued"] += len(items)
+
+    async def missing_fields(self, influencer: str, analysis: Dict[str, str]) -> List[str]:
+        """
+        Fields of `analysis` whose vector is not in the store (one fetch per
+        namespace). All of them when the fetch fails; none when no vector
+        store is configured (there is nothing to write them to).
+        """
+        store = get_vector_store()
+        if store is None:
+            return []
+        ids = {field: [VectorWrite(influencer, field, text).vector_id] for field, text in analysis.items()}
+        try:
+            with span("vector", "fetch"):
+                found = await run_blocking(store.fetch_namespaces, ids)
+        except Exception as e:
+            logger.warning("Error checking stored vectors", extra={"influencer": influencer, "error": str(e)})
+            return list(analysis)
+        return [field for field, (wanted,) in ids.items() if wanted not in found.get(field, {})]
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self.write(batch)
+            except Exception as e:
+                logger.error("Error writing vectors", extra={"count": len(batch), "error": str(e)})
+                self._retry_later(batch)
+            else:
+                for item in batch:
+                    self._forget(item)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _is_latest(self, item: VectorWrite) -> bool:
+        return self._latest.get(item.vector_id) == item.seq
+
+    def _forget(self, item: VectorWrite):
+        if self._is_latest(item):
+            del self._latest[item.vector_id]
+
+    def _retry_later(self, batch: List[VectorWrite]):
+        by_delay = defaultdict(list)
+        for item in batch:
+            if not self._is_latest(item):
+                # Superseded by a newer analysis, which writes the vector itself
+                continue
+            item = item._replace(attempts=item.attempts + 1)
+            if self._stopping or item.attempts >= self.max_attempts:
+                self._forget(item)
+                self._metrics["dropped"] += 1
+                logger.error("Vector write dropped", extra={
+                    "influencer": item.influencer, "field": item.field, "attempts": item.attempts
+                })
+                continue
+            by_delay[self.retry_base * 2 ** (item.attempts - 1)].append(item)
+        for delay, items in by_delay.items():
+            task = asyncio.create_task(self._requeue_after(delay, items))
+            self._delayed[task] = items
+            self._metrics["retried"] += len(items)
+
+    async def _requeue_after(self, delay: float, items: List[VectorWrite]):
+        await asyncio.sleep(delay)
+        self._delayed.pop(asyncio.current_task(), None)
+        self._requeue(items)
+
+    def _requeue(self, items: List[VectorWrite]):
+        for item in items:
+            if self._is_latest(item):
+                self._queue.put_nowait(item)
+
+    async def write(self, items: List[VectorWrite]):
+        """Embed `items` in one batch and upsert them grouped by namespace."""
+        store = get_vector_store()
+        if store is None or not items:
+            return
+        # Later writes for the same vector id win
+        latest = {item.vector_id: item for item in items}
+        items = list(latest.values())
+        try:
+            embeddings = await embed_texts([item.text for item in items])
+            self._metrics["embed_batches"] += 1
+
+            by_namespace = defaultdict(list)
+            for item, embedding in zip(items, embeddings):
+                by_namespace[item.field].append({
+                    "id": item.vector_id,
+                    "values": embedding,
+                    "metadata": {"influencer": item.influencer, "field": item.field, "text": item.text}
+                })
+            for namespace, vectors in by_namespace.items():
+                for start in range(0, len(vectors), self.upsert_batch_size):
+                    chunk = vectors[start:start + self.upsert_batch_size]
+                    with span("vector", "upsert"):
+                        await run_blocking(store.upsert, vectors=chunk, namespace=namespace)
+                    self._metrics["upsert_calls"] += 1
+        except Exception:
+            self._metrics["failed"] += len(items)
+            raise
+        self._metrics["written"] += len(items)
+
+        # The corpus changed: cached match results are stale now
+        try:
+            await get_version_tracker().bump_corpus()
+        except Exception as e:
+            logger.error("Error bumping corpus version", extra={"error": str(e)})
+
+    def stats(self) -> dict:
+        return {
+            **self._metrics,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "retrying": sum(len(items) for items in self._delayed.values()),
+        }
+
+
+# ------------------------------
+# Shared instance
+# ------------------------------
+_pipeline: Optional[VectorWritePipeline] = None
+
+
+def get_vector_writer() -> VectorWritePipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = VectorWritePipeline()
+    return _pipeline
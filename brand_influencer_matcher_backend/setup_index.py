@@ -0,0 +1,31 @@
+import logging
+
+from brand_influencer_matcher_backend.clients import get_pinecone_client
+from brand_influencer_matcher_backend.config import (
+    PINECONE_INDEX_NAME, PINECONE_SPEC, PINECONE_DIMENSION, PINECONE_METRIC
+)
+
+logger = logging.getLogger(__name__)
+
+
+# --- สร้าง Pinecone index (รันครั้งเดียวตอน setup ไม่ใช่ตอน import) ---
+def create_pinecone_index():
+    pc = get_pinecone_client()
+    existing_indexes = pc.list_indexes().names()
+    if PINECONE_INDEX_NAME in existing_indexes:
+        logger.info("Pinecone index already exists", extra={"index": PINECONE_INDEX_NAME})
+        return
+
+    pc.create_index(
+        name=PINECONE_INDEX_NAME,
+        dimension=PINECONE_DIMENSION,
+        metric=PINECONE_METRIC,
+        spec=PINECONE_SPEC
+    )
+    logger.info("Created Pinecone index", extra={"index": PINECONE_INDEX_NAME})
+
+
+if __name__ == "__main__":
+    from brand_influencer_matcher_backend.logging_setup import configure_logging
+    configure_logging()
+    create_pinecone_index()
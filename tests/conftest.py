@@ -0,0 +1,21 @@
+"""
+Tests run the backend against the offline fakes the load bench uses
+(bench/fakes.py), so they need no API keys, MongoDB or network.
+"""
+import pytest
+
+from brand_influencer_matcher_backend.bench.load import configure_environment
+
+# Read by the backend at import time
+configure_environment()
+
+
+@pytest.fixture
+def services():
+    from brand_influencer_matcher_backend.bench.fakes import PROFILES, install
+
+    services = install(PROFILES["zero"])
+    try:
+        yield services
+    finally:
+        services.uninstall()
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from brand_influencer_matcher_backend.services import freshness
+from brand_influencer_matcher_backend.services.freshness import FreshnessPolicy, serve_with_freshness
+from brand_influencer_matcher_backend.services.singleflight import SingleFlight
+
+POLICY = FreshnessPolicy(3600)
+STALE = {"analysis": "stored", "last_updated": (datetime.now() - timedelta(days=1)).isoformat()}
+
+
+def _serve(stored, flight, key, refresh, **kwargs):
+    return serve_with_freshness(stored, POLICY, flight, key, refresh, extract=lambda doc: doc["analysis"], **kwargs)
+
+
+def test_forced_refresh_does_not_join_a_regular_run():
+    async def scenario():
+        flight = SingleFlight("test")
+        release = asyncio.Event()
+        runs = []
+
+        async def refresh(label):
+            runs.append(label)
+            await release.wait()
+            return label
+
+        regular = asyncio.ensure_future(_serve(None, flight, "key", lambda: refresh("regular")))
+        await asyncio.sleep(0)
+        forced = asyncio.ensure_future(_serve(STALE, flight, "key", lambda: refresh("forced"), force_refresh=True))
+        await asyncio.sleep(0)
+        release.set()
+        assert await regular == "regular"
+        assert await forced == "forced"
+        assert runs == ["regular", "forced"]
+
+    asyncio.run(scenario())
+
+
+def test_background_refreshes_are_bounded(monkeypatch):
+    monkeypatch.setattr(freshness, "BACKGROUND_REFRESH_CONCURRENCY", 2)
+
+    async def scenario():
+        flight = SingleFlight("test")
+        release = asyncio.Event()
+        started = []
+
+        async def refresh(key):
+            started.append(key)
+            await release.wait()
+
+        for key in ("a", "b", "c", "d"):
+            assert await _serve(STALE, flight, key, lambda key=key: refresh(key)) == "stored"
+        await asyncio.sleep(0.01)
+        assert started == ["a", "b"]
+        release.set()
+        await asyncio.gather(*freshness._background)
+
+    asyncio.run(scenario())
+
+
+def test_undated_document_is_fresh():
+    async def scenario():
+        async def refresh():
+            raise AssertionError("refreshed an undated document")
+
+        assert await _serve({"analysis": "stored"}, SingleFlight("test"), "key", refresh) == "stored"
+        assert not freshness._background
+
+    asyncio.run(scenario())
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from brand_influencer_matcher_backend.config import INFLUENCER_COLLECTION
+from brand_influencer_matcher_backend.services import influencer_service
+from brand_influencer_matcher_backend.services.job_queue import FINISHED, RUNNING, SUCCEEDED, JobQueue
+
+
+def test_stale_influencer_job_waits_for_the_refresh(services, monkeypatch):
+    stale = (datetime.now() - timedelta(days=365)).isoformat()
+    refreshed = {"summary": "refreshed"}
+
+    async def scenario():
+        await services.db[INFLUENCER_COLLECTION].insert_one(
+            {"influencer": "stale", "name_key": "stale", "analysis": {"summary": "old"}, "last_updated": stale}
+        )
+        release = asyncio.Event()
+
+        async def refresh(influ, force=False):
+            await release.wait()
+            return refreshed
+
+        monkeypatch.setattr(influencer_service, "search_influ_analysis", refresh)
+        queue = JobQueue(concurrency=1, poll_interval=0.01)
+        await queue.start()
+        try:
+            job, _ = await queue.submit("influencer", "stale")
+            for _ in range(20):
+                await asyncio.sleep(0.01)
+            # The stale document is not the job's result: the job holds its slot for the refresh
+            assert (await queue.get(job["_id"]))["status"] == RUNNING
+
+            release.set()
+            async for job in queue.watch(job["_id"]):
+                if job["status"] in FINISHED:
+                    break
+            assert job["status"] == SUCCEEDED
+            assert job["result"] == refreshed
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,25 @@
+import asyncio
+import json
+
+from httpx import ASGITransport, AsyncClient
+
+from brand_influencer_matcher_backend.api.endpoints import match
+from brand_influencer_matcher_backend.main import app
+
+
+def test_batch_match_reports_a_failure_as_the_last_line(monkeypatch):
+    async def rank(brand_names, *args):
+        yield {"brand_name": brand_names[0], "matches": []}
+        raise RuntimeError("mongo unreachable")
+
+    monkeypatch.setattr(match, "rank_influencers_for_brands", rank)
+
+    async def scenario():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/v1/match-influencers/batch", json={"brand_names": ["a", "b"]})
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{"brand_name": "a", "matches": []}, {"error": "mongo unreachable"}]
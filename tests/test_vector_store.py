@@ -0,0 +1,84 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from brand_influencer_matcher_backend.services import ann_store, vector_store
+from brand_influencer_matcher_backend.services.ann_store import QuantizedVectorStore
+from brand_influencer_matcher_backend.services.vector_store import NAMESPACES, LocalVectorStore
+
+DIMENSION = 16
+
+
+def _vectors(namespace, count=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"id": f"influencer{i}_{namespace}", "values": rng.standard_normal(DIMENSION).tolist(),
+         "metadata": {"influencer": f"influencer{i}", "text": f"text {i}"}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(params=["local", "ivf"])
+def store(request):
+    if request.param == "local":
+        store = LocalVectorStore(dimension=DIMENSION)
+    else:
+        store = QuantizedVectorStore(dimension=DIMENSION, lists=4, min_train_size=20)
+    for namespace in NAMESPACES:
+        store.upsert(_vectors(namespace), namespace)
+    return store
+
+
+def test_queries_on_different_namespaces_overlap(store, monkeypatch):
+    # Every namespace's scan waits until all of them are scanning: a store-wide
+    # lock around the scan would break the barrier
+    barrier = threading.Barrier(len(NAMESPACES), timeout=5)
+    namespace_class = ann_store._IVFNamespace if isinstance(store, QuantizedVectorStore) else vector_store._Namespace
+    search_many = namespace_class.search_many
+
+    def rendezvous(self, queries, top_k):
+        barrier.wait()
+        return search_many(self, queries, top_k)
+
+    monkeypatch.setattr(namespace_class, "search_many", rendezvous)
+    query = np.ones(DIMENSION, dtype=np.float32).tolist()
+    with ThreadPoolExecutor(len(NAMESPACES)) as pool:
+        results = list(pool.map(lambda namespace: store.query_many([query], 5, namespace), NAMESPACES))
+    assert all(len(hits[0]) == 5 for hits in results)
+
+
+def test_writes_do_not_change_a_view_being_scanned(store):
+    namespace = NAMESPACES[0]
+    query = np.asarray(_vectors(namespace)[0]["values"], dtype=np.float32)
+    view = store._view(namespace)
+    before = view.search_many(query[None, :] / np.linalg.norm(query), 3)
+
+    # Overwrite the best hit, delete the rest and add new rows while the view is held
+    store.upsert([{"id": before[0][0].id, "values": (-query).tolist(), "metadata": {"influencer": "moved"}}], namespace)
+    store.delete([hit.id for hit in before[0][1:]], namespace)
+    store.upsert(_vectors(namespace, count=10, seed=1), namespace)
+
+    assert view.search_many(query[None, :] / np.linalg.norm(query), 3) == before
+    assert store.query(query.tolist(), 3, namespace)[0].id != before[0][0].id
+
+
+@pytest.mark.parametrize("store_class", [LocalVectorStore, QuantizedVectorStore])
+def test_interrupted_save_keeps_the_previous_one(store_class, tmp_path, monkeypatch):
+    namespace = NAMESPACES[0]
+    store = store_class(str(tmp_path), dimension=DIMENSION)
+    store.upsert(_vectors(namespace, count=10), namespace)
+    store.save()
+
+    store.upsert(_vectors(namespace, count=20, seed=1), namespace)
+    monkeypatch.setattr(os, "replace", lambda *args: (_ for _ in ()).throw(OSError("crashed")))
+    with pytest.raises(OSError):
+        store.save()
+    monkeypatch.undo()
+
+    assert store_class(str(tmp_path), dimension=DIMENSION).count(namespace) == 10
+    # The namespace is still dirty, so the next save writes it
+    store.save()
+    assert store_class(str(tmp_path), dimension=DIMENSION).count(namespace) == 20